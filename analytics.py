@@ -0,0 +1,93 @@
+import argparse
+import json
+import logging
+import os
+import time
+from typing import List
+from components.analytics import (
+    export_debates,
+    load_table,
+    win_rates,
+    argument_length_report,
+    research_share,
+    latency_report
+)
+from components.bots import State
+from components.debate_store import list_debates, load_debate
+from config.index import ANALYTICS_DIR
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def load_batch_results(path: str) -> List[State]:
+    """Read the debates written by batch_run.py, one state per line"""
+    with open(path, encoding="utf-8") as results_file:
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def load_store_debates(since: float) -> List[State]:
+    """Rebuild every debate persisted to the debate store since the given time"""
+    states = []
+    for debate_id, started_at in list_debates(since):
+        state = load_debate(debate_id)
+        if state:
+            state["created_at"] = started_at
+            states.append(state)
+    return states
+
+
+def export(args: argparse.Namespace):
+    for path in args.batch_results:
+        # Batch states from before created_at was recorded are dated by their results file
+        written = export_debates(load_batch_results(path), args.out, args.format,
+                                 os.path.splitext(os.path.basename(path))[0], os.path.getmtime(path))
+        logging.info(f"Exported {path}: {written}")
+    if args.store:
+        since = time.time() - args.store_days * 86400 if args.store_days else 0.0
+        written = export_debates(load_store_debates(since), args.out, args.format, "store")
+        logging.info(f"Exported debate store: {written}")
+
+
+def print_table(title: str, table):
+    print(f"\n{title}")
+    print("  ".join(table.column_names))
+    for row in table.to_pylist():
+        print("  ".join(f"{value:.3f}" if isinstance(value, float) else str(value) for value in row.values()))
+
+
+def report(args: argparse.Namespace):
+    def table(name: str):
+        return load_table(args.out, name, args.format, args.since, args.until)
+
+    debates = table("debates")
+    print_table(f"Win rate by {args.by} ({debates.num_rows} debates)", win_rates(debates, args.by))
+    print_table("Argument length by verdict", argument_length_report(table("arguments")))
+    print_table(f"Research token share by {args.by}", research_share(debates, args.by))
+    print_table("Node latency", latency_report(table("nodes")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export finished debates to columnar files and report on them")
+    parser.add_argument("--out", default=ANALYTICS_DIR, help="Dataset directory")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet", help="File format of the dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write debates into the dataset, partitioned by date")
+    export_parser.add_argument("batch_results", nargs="*", help="Result files written by batch_run.py")
+    export_parser.add_argument("--store", action="store_true", help="Also export debates persisted to the debate store")
+    export_parser.add_argument("--store-days", type=float, default=0, help="Only export store debates started in the last N days (0 for all)")
+    export_parser.set_defaults(handler=export)
+
+    report_parser = commands.add_parser("report", help="Print win rate, argument length, research share and latency reports")
+    report_parser.add_argument("--since", help="First date to include (YYYY-MM-DD)")
+    report_parser.add_argument("--until", help="Last date to include (YYYY-MM-DD)")
+    report_parser.add_argument("--by", choices=["category", "topic", "participants"], default="category", help="Grouping for win rate and research share")
+    report_parser.set_defaults(handler=report)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+import logging
+from components.api import serve
+from config.index import API_HOST, API_PORT, API_STEP_WORKERS
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the async HTTP/SSE debate API")
+    parser.add_argument("--host", default=API_HOST, help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=API_PORT, help="Port to listen on")
+    parser.add_argument("--step-workers", type=int, default=API_STEP_WORKERS, help="Threads running debate steps concurrently")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(serve(args.host, args.port, args.step_workers))
+    except KeyboardInterrupt:
+        logging.info("Stopping debate API")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,31 @@
 import streamlit as st
-from datetime import datetime
 from components.bots import (
-    generate_topic_only, 
-    generate_round_arguments, 
-    generate_final_judgment, 
     get_content,
+    get_participants,
+    is_two_sided,
+    make_participants,
+    prefetch_round,
+    rebutting_participants,
+    before_failed_round,
+    round_arguments,
     State
 )
-from typing import Dict, List, Any, cast
+from components.jobs import run_step
+from components.tools import research_progress, latency_tracker, concurrency_report
+from components.debate_store import load_debate
+from components.shared_store import list_prewarmed_prompts
+from components.transcript import TranscriptExporter
+from components.session_memory import CompactState, compact_state, expand_state, track_session, session_memory_report
+from components.usage import get_usage_report
+from components.budget import budget_fraction, budget_summary
+from components.metrics import start_metrics_server
+from components.profiling import DebateProfile, activate_profile, profiled
+from config.index import SPECULATIVE_ROUNDS, METRICS_PORT, ADAPTIVE_CONCURRENCY, PROFILE_DEBATES, PROFILE_DIR
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, cast
 import logging
+import time
+import uuid
 
 
 logging.basicConfig(level=logging.INFO)
@@ -224,6 +241,23 @@ st.markdown("""
         box-shadow: 0 0 20px rgba(255, 82, 82, 0.5);
     }
     
+    /* Multi-party participant card with violet accent */
+    .participant-card {
+        border-left: 4px solid #b388ff;
+        background: linear-gradient(135deg, rgba(179, 136, 255, 0.1) 0%, rgba(255, 255, 255, 0.05) 100%);
+    }
+    
+    .participant-card::after {
+        content: '';
+        position: absolute;
+        top: 0;
+        left: 0;
+        width: 4px;
+        height: 100%;
+        background: linear-gradient(180deg, #b388ff, #7c4dff);
+        box-shadow: 0 0 20px rgba(179, 136, 255, 0.5);
+    }
+    
     /* Judge card with gold accent */
     .judge-card {
         border-left: 4px solid #ffc107;
@@ -418,6 +452,7 @@ st.markdown(
 def get_initial_state() -> State:
     """Return a properly typed initial state"""
     return {
+        "debate_id": None,
         "topic": [],
         "rounds": [],
         "judge": [],
@@ -431,11 +466,70 @@ def get_initial_state() -> State:
     }
 
 
+@profiled("state_copy")
+def update_session_state(new_state: State):
+    """Keep the state in its compact form between reruns and account for its memory"""
+    st.session_state.debate_state = compact_state(new_state)
+    account_session_memory()
+
+
+def account_session_memory():
+    """Count this session's state and the other debate objects it keeps in the memory report"""
+    extras = [st.session_state.get("failed_round")]
+    exporter = st.session_state.get("transcript_exporter")
+    if exporter:
+        extras.append(exporter.sections)
+    speculation = st.session_state.get("speculation")
+    if speculation and speculation["future"].done() and not speculation["future"].cancelled() and speculation["future"].exception() is None:
+        extras.append(speculation["future"].result())
+    track_session(st.session_state.session_id, st.session_state.debate_state, [extra for extra in extras if extra is not None])
+
+
+@profiled("state_copy")
+def get_session_state() -> State:
+    """Rebuild this session's full state for the current rerun"""
+    return expand_state(cast(CompactState, st.session_state.debate_state))
+
+
 if "debate_state" not in st.session_state:
-    st.session_state.debate_state = get_initial_state()
+    st.session_state.session_id = uuid.uuid4().hex
+    update_session_state(get_initial_state())
     st.session_state.debate_started = False
 
 
+def get_debate_profile() -> Optional[DebateProfile]:
+    """This session's profile while profiling is on through PROFILE_DEBATES or ?profile=1"""
+    profile = st.session_state.get("debate_profile")
+    if not (PROFILE_DEBATES or st.query_params.get("profile") == "1"):
+        if profile:
+            profile.stop()
+            del st.session_state["debate_profile"]
+        return None
+    if profile is None:
+        profile = DebateProfile(f"session-{st.session_state.session_id[:12]}")
+        st.session_state.debate_profile = profile
+        logging.info(f"Profiling session {st.session_state.session_id} to {PROFILE_DIR}")
+    return profile
+
+
+debate_profile = get_debate_profile()
+activate_profile(debate_profile)
+if debate_profile:
+    debate_profile.begin_rerun(__file__)
+    st.caption(f"🔬 Profiling this session to `{PROFILE_DIR}/{debate_profile.name}.folded`")
+
+
+requested_debate = st.query_params.get("debate")
+if requested_debate and st.session_state.debate_state.debate_id != requested_debate:
+    restored_state = load_debate(requested_debate)
+    if restored_state:
+        logging.info(f"Restored debate {requested_debate} from checkpoints")
+        update_session_state(cast(State, restored_state))
+        st.session_state.debate_started = True
+    else:
+        del st.query_params["debate"]
+
+
 def show_processing_state(state: str, message: str):
     """Display processing state with animated banner"""
     st.markdown(f"""
@@ -446,11 +540,40 @@ def show_processing_state(state: str, message: str):
         """, unsafe_allow_html=True)
 
 
-def show_status_indicator(label: str, status: str):
-    """Show status indicator badge"""
+def make_research_listener():
+    """Render live web-search progress (searches, sources, streamed text) into a placeholder"""
+    placeholder = st.empty()
+    progress = {"node": "", "searches": 0, "sources": [], "chars": 0, "rendered_at": 0.0}
+    node_labels = {"research": "Research", "fact_check": "Fact-check"}
+    
+    def listener(event: Dict[str, Any]):
+        progress["node"] = node_labels.get(event["node"], event["node"])
+        if event["type"] == "search_started":
+            progress["searches"] += 1
+        elif event["type"] == "source_found" and event["url"] not in progress["sources"]:
+            progress["sources"].append(event["url"])
+        elif event["type"] == "text_delta":
+            progress["chars"] += len(event["text"])
+            if time.monotonic() - progress["rendered_at"] < 0.3:
+                return
+        
+        progress["rendered_at"] = time.monotonic()
+        latest = progress["sources"][-1] if progress["sources"] else "waiting for sources"
+        placeholder.markdown(f"""
+            <div class='processing-banner'>
+                🔎 {progress["node"]}: {progress["searches"]} searches · 📚 {len(progress["sources"])} sources · ✍️ {progress["chars"]:,} characters
+                <br><small>{latest}</small>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    return listener
+
+
+def show_status_indicator(label: str, status: str, target: Any = st):
+    """Show status indicator badge, in place when target is a placeholder"""
     status_class = f"status-{status}"
     emoji = {"ready": "⚡", "processing": "🔄", "complete": "✅", "error": "❌"}
-    st.markdown(f"""
+    target.markdown(f"""
         <span class='status-indicator {status_class}'>
             {emoji.get(status, "🔄")} {label}
         </span>
@@ -466,10 +589,318 @@ def show_error(message: str):
         """, unsafe_allow_html=True)
 
 
-def update_session_state(new_state: State):
-    """Safely update session state with proper typing"""
-    st.session_state.debate_state = cast(State, new_state)
+def show_budget(slot, state: State):
+    """Show the debate's spend, against its limits when it has any"""
+    budget = state.get("budget")
+    if not budget:
+        return
+    if budget["token_limit"] > 0 or budget["cost_limit"] > 0:
+        slot.progress(min(1.0, budget_fraction(budget)), text=f"💰 Debate budget: {budget_summary(budget)}")
+    else:
+        slot.caption(f"💰 Debate spend: {budget_summary(budget)}")
+
+
+def show_round_status(slots: List[Any], state: State):
+    """Fill one status placeholder per round"""
+    current_round = state["current_round"]
+    for i, slot in enumerate(slots):
+        if i < current_round:
+            show_status_indicator(f"Round {i+1}", "complete", slot)
+        elif i == current_round and state.get("processing_state") in ["generating_arguments", "pro_complete", "con_complete"]:
+            show_status_indicator(f"Round {i+1}", "processing", slot)
+        else:
+            show_status_indicator(f"Round {i+1}", "ready", slot)
+
+
+def show_round(slot, round_number: int, round_data: Dict[str, Any], participants: List[Dict[str, Any]]):
+    """Draw one round's argument cards into its placeholder"""
+    with slot.container():
+        st.markdown(f'<div class="round-header">🏟 Round {round_number}</div>', unsafe_allow_html=True)
+        
+        if not is_two_sided(participants):
+            arguments = round_arguments(round_data)
+            columns = st.columns(min(3, len(participants)))
+            for j, participant in enumerate(participants):
+                with columns[j % len(columns)]:
+                    st.markdown(f"""
+                        <div class='debate-card participant-card'>
+                            <div class='card-header'>
+                                <span class='emoji'>🗣️</span>{participant['label']}
+                            </div>
+                            <div class='card-content'>
+                                {arguments.get(participant['name'], '')}
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+            return
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"""
+                <div class='debate-card pro-card'>
+                    <div class='card-header'>
+                        <span class='emoji'>✅</span>PRO Argument
+                    </div>
+                    <div class='card-content'>
+                        {round_data['pro']}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+                <div class='debate-card con-card'>
+                    <div class='card-header'>
+                        <span class='emoji'>❌</span>CON Argument
+                    </div>
+                    <div class='card-content'>
+                        {round_data['con']}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+
+
+def keep_failed_round(failed_state: State):
+    """Remember a round that failed for some participants so only they are retried"""
+    st.session_state.failed_round = compact_state(failed_state)
+    st.session_state.round_failures = st.session_state.get("round_failures", 0) + 1
+    account_session_memory()
+
+
+def get_failed_round(state: State) -> Optional[State]:
+    """The failed attempt at this debate's next round, if one is waiting for a retry"""
+    failed_round = st.session_state.get("failed_round")
+    if failed_round is None:
+        return None
+    if (failed_round.debate_id, failed_round.fields.get("current_round")) != (state.get("debate_id"), state["current_round"] + 1):
+        st.session_state.failed_round = None
+        return None
+    return expand_state(failed_round)
+
+
+def show_round_retry(slot, failed_state: State) -> bool:
+    """Show which arguments of a failed round need redoing and a button to retry just those"""
+    failed = failed_state.get("failed_participants", [])
+    labels = ", ".join(participant["label"] for participant in get_participants(failed_state) if participant["name"] in failed)
+    with slot.container():
+        show_error(f"Round {failed_state['current_round']} failed for {labels}. The other arguments are kept.")
+        return st.button(f"🔁 Retry {labels}", key=f"retry_round_{failed_state['current_round']}_{st.session_state.get('round_failures', 0)}")
+
+
+def round_control(state: State) -> Optional[State]:
+    """Show the next round's button, or a retry of a failed round, and return the updated state once that round has been generated"""
+    current_round = state["current_round"]
+    failed_round = get_failed_round(state)
+    button_slot = st.empty()
+    if failed_round:
+        if not show_round_retry(button_slot, failed_round):
+            return None
+        kind, payload = "retry_round", {"state": failed_round}
+    else:
+        if state.get("processing_state") in ["topic_ready", "round_complete"]:
+            start_speculation(state)
+        if not button_slot.button(f"🥊 Start Round {current_round + 1}", key=f"round_{current_round + 1}"):
+            return None
+        kind, payload = "round", {"state": state, "prefetched": take_speculation(current_round + 1)}
+    try:
+        show_processing_state("generating_arguments", f"Generating Round {current_round + 1} Arguments")
+        
+        with st.spinner(f"🔬 Round {current_round + 1} in progress - Conducting web research..."):
+            with research_progress(make_research_listener()):
+                updated_state = run_step(kind, payload)
+            
+            if updated_state.get("processing_state") == "error":
+                if updated_state.get("failed_participants"):
+                    keep_failed_round(updated_state)
+                    show_round_retry(button_slot, updated_state)
+                else:
+                    show_error("Failed to generate round arguments. Please try again.")
+                return None
+            st.session_state.failed_round = None
+            return updated_state
+            
+    except Exception as e:
+        logging.error(f"Round generation error: {str(e)}")
+        show_error(f"Round generation failed: {str(e)}")
+        return None
+
+
+def regenerate_control(state: State):
+    """Redo one argument of a finished round along with only what was built on it"""
+    if not state["rounds"] or state.get("processing_state") not in ["round_complete", "judgment_complete"]:
+        return
+    participants = get_participants(state)
+    with st.expander("♻️ Regenerate an argument"):
+        labels = {participant["name"]: participant["label"] for participant in participants}
+        col1, col2 = st.columns(2)
+        with col1:
+            regenerate_round = st.selectbox("Round", range(1, len(state["rounds"]) + 1), index=len(state["rounds"]) - 1, key="regenerate_round")
+        with col2:
+            regenerate_name = st.selectbox("Argument", list(labels), format_func=labels.get, key="regenerate_participant")
+        redo = rebutting_participants(participants, [regenerate_name])
+        later_rounds = len(state["rounds"]) - regenerate_round
+        st.caption(
+            f"Redoes {', '.join(labels[name] for name in redo)} in round {regenerate_round}"
+            + (f", then {later_rounds} later round{'s' if later_rounds > 1 else ''}" if later_rounds else "")
+            + (" and the judgment" if state["judge"] else "") + "."
+        )
+        if st.button("♻️ Regenerate", key="regenerate_button"):
+            discard_speculation()
+            st.session_state.pop("failed_round", None)
+            with st.spinner(f"Regenerating {labels[regenerate_name]} in round {regenerate_round}..."):
+                with research_progress(make_research_listener()):
+                    updated_state = run_step("regenerate", {"state": state, "participant": regenerate_name, "round_number": regenerate_round})
+            if updated_state.get("processing_state") == "error" and not updated_state.get("failed_participants"):
+                show_error("Failed to regenerate the argument. Please try again.")
+            else:
+                if updated_state.get("failed_participants"):
+                    # Keep the rounds before the failure and offer a retry from the control panel
+                    keep_failed_round(updated_state)
+                    updated_state = before_failed_round(updated_state)
+                st.session_state.pop("transcript_exporter", None)
+                update_session_state(updated_state)
+                st.rerun()
+
+
+@st.fragment
+def debate_arena(max_rounds: int):
+    """
+    Budget, round status, round and judgment controls and the rounds, which rerun on their own when clicked
+    
+    Every placeholder the arena updates is drawn inside this fragment, as Streamlit
+    requires. Within a click, the finished round is drawn into its placeholder, the
+    status and budget placeholders are updated in place and the next button replaces
+    the clicked one, so round transitions never re-run the page or re-send the topic card.
+    """
+    state = get_session_state()
+    budget_slot = st.empty()
+    show_budget(budget_slot, state)
+    
+    status_slots = [column.empty() for column in st.columns(max_rounds)]
+    show_round_status(status_slots, state)
+    
+    controls = st.empty()
+    round_slots = [st.empty() for _ in range(max_rounds)]
+    participants = get_participants(state)
+    for i, round_data in enumerate(state["rounds"]):
+        show_round(round_slots[i], i + 1, round_data, participants)
+    regenerate_control(state)
+    processing_states = ["generating_arguments", "pro_complete", "con_complete"]
+    
+    while state["current_round"] < max_rounds and state.get("processing_state") not in processing_states:
+        with controls.container():
+            updated_state = round_control(state)
+        if updated_state is None:
+            return
+        update_session_state(updated_state)
+        show_round(round_slots[updated_state["current_round"] - 1], updated_state["current_round"],
+                   updated_state["rounds"][-1], get_participants(updated_state))
+        show_round_status(status_slots, updated_state)
+        show_budget(budget_slot, updated_state)
+        state = updated_state
+    
+    with controls.container():
+        current_round = state["current_round"]
+        if current_round < max_rounds:
+            processing_messages = {
+                "generating_arguments": f"Generating Round {current_round + 1} Arguments",
+                "pro_complete": "PRO argument complete, generating CON argument",
+                "con_complete": "Round arguments complete, updating debate"
+            }
+            current_processing = state.get("processing_state", "processing")
+            if current_processing in processing_messages:
+                show_processing_state(current_processing, processing_messages[current_processing])
+        
+        elif len(state["rounds"]) == max_rounds and len(state["judge"]) == 0:
+            if state.get("processing_state") != "generating_judgment":
+                st.markdown("### ⚖️ Ready for Final Judgment")
+                if st.button("👨‍⚖️ Generate Judge's Decision", key="judge_button"):
+                    try:
+                        show_processing_state("generating_judgment", "Judge Analyzing Arguments and Fact-Checking")
+                        
+                        with st.spinner("⚖️ Judge analyzing arguments and fact-checking claims..."):
+                            with research_progress(make_research_listener()):
+                                updated_state = run_step("judgment", {"state": state})
+                            
+                            if updated_state.get("processing_state") == "error":
+                                show_error("Failed to generate judgment. Please try again.")
+                            else:
+                                # The judgment section has its own widgets, so it is drawn by a full rerun
+                                update_session_state(updated_state)
+                                st.rerun()
+                                
+                    except Exception as e:
+                        logging.error(f"Judgment generation error: {str(e)}")
+                        show_error(f"Judgment generation failed: {str(e)}")
+            else:
+                show_processing_state("generating_judgment", "Judge Analyzing Arguments and Fact-Checking")
+
+TRANSCRIPT_LABELS = {"txt": "Text", "md": "Markdown", "json": "JSON"}
+
+
+def get_transcript_exporter(state: State) -> TranscriptExporter:
+    """Return this debate's transcript exporter, adding any sections that arrived since the last rerun"""
+    exporter = st.session_state.get("transcript_exporter")
+    debate_id = state.get("debate_id") or ""
+    if exporter is None or exporter.debate_id != debate_id:
+        exporter = TranscriptExporter(debate_id)
+        st.session_state.transcript_exporter = exporter
+    if exporter.sync(state):
+        account_session_memory()
+    return exporter
+
+
+@st.cache_resource
+def start_metrics() -> bool:
+    """Start the /metrics endpoint once per server process"""
+    return METRICS_PORT > 0 and start_metrics_server(METRICS_PORT) is not None
+
+
+@st.cache_resource
+def get_speculation_executor() -> ThreadPoolExecutor:
+    """Worker pool shared by all sessions for speculative next-round work"""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative_round")
+
+
+def discard_speculation():
+    """Drop any background work started for the next round"""
+    speculation = st.session_state.pop("speculation", None)
+    if speculation:
+        speculation["future"].cancel()
+
+
+def start_speculation(state: State):
+    """Start the next round's research in the background while the user reads"""
+    if SPECULATIVE_ROUNDS not in ("research", "pro"):
+        return
+    next_round = state["current_round"] + 1
+    speculation = st.session_state.get("speculation")
+    if speculation and speculation["round"] == next_round:
+        return
+    discard_speculation()
+    st.session_state.speculation = {
+        "round": next_round,
+        "future": get_speculation_executor().submit(prefetch_round, state, SPECULATIVE_ROUNDS == "pro")
+    }
+
+
+def take_speculation(round_number: int) -> Optional[Dict[str, Any]]:
+    """Collect the background result for a round, waiting for it if still running"""
+    speculation = st.session_state.pop("speculation", None)
+    if not speculation:
+        return None
+    if speculation["round"] != round_number:
+        speculation["future"].cancel()
+        return None
+    try:
+        return speculation["future"].result()
+    except Exception as e:
+        logging.error(f"Speculative round error: {str(e)}")
+        return None
+
 
+start_metrics()
 
 if not st.session_state.debate_started:
     with st.form("debate_form"):
@@ -478,20 +909,37 @@ if not st.session_state.debate_started:
             placeholder="E.g., 'The benefits of AI regulation outweigh the costs'",
             height=120
         )
+        prewarmed_prompts = list_prewarmed_prompts()
+        if prewarmed_prompts:
+            picked_prompt = st.selectbox("📅 Or start one of today's prepared topics instantly:", [""] + prewarmed_prompts)
+        with st.expander("👥 Multi-party debate (optional)"):
+            positions_text = st.text_area(
+                "Positions, one per line as LABEL: stance. Leave empty for a PRO vs CON debate.",
+                placeholder="REGULATE: Governments should license frontier AI models\nSELF-GOVERN: Industry standards are enough\nOPEN: Open-sourcing models is the best safeguard",
+                height=120
+            )
         submitted = st.form_submit_button("🚀 Generate Debate Topic")
 
+    if submitted and not user_prompt and prewarmed_prompts:
+        user_prompt = picked_prompt
+    
     if submitted and user_prompt:
         try:
+            positions = [line.strip() for line in positions_text.splitlines() if line.strip()]
+            participants = make_participants(positions) if positions else None
             show_processing_state("generating_topic", "Generating Debate Topic")
             
             with st.spinner("🧠 Researching topic and generating debate framework..."):
-                result_state = generate_topic_only(user_prompt)
+                debate_id = uuid.uuid4().hex
+                with research_progress(make_research_listener()):
+                    result_state = run_step("topic", {"prompt": user_prompt, "debate_id": debate_id, "participants": participants})
                 
                 if result_state.get("processing_state") == "error":
                     show_error("Failed to generate topic. Please try again.")
                 else:
                     update_session_state(result_state)
                     st.session_state.debate_started = True
+                    st.query_params["debate"] = debate_id
                     st.rerun()
                     
         except Exception as e:
@@ -500,13 +948,15 @@ if not st.session_state.debate_started:
 
 
 if st.session_state.debate_started:
-    state = cast(State, st.session_state.debate_state)
+    state = get_session_state()
     
     
     if state.get("processing_state") == "error":
         show_error("An error occurred during debate processing. Please restart.")
         if st.button("🔄 Restart Debate"):
-            st.session_state.debate_state = get_initial_state()
+            discard_speculation()
+            st.query_params.clear()
+            update_session_state(get_initial_state())
             st.session_state.debate_started = False
             st.rerun()
         st.stop()
@@ -531,104 +981,8 @@ if st.session_state.debate_started:
     
     st.markdown("### 🎮 Debate Control Panel")
     
-    current_round = state["current_round"]
     max_rounds = 3
-    
-    
-    col1, col2, col3 = st.columns(3)
-    for i in range(max_rounds):
-        with [col1, col2, col3][i]:
-            if i < current_round:
-                show_status_indicator(f"Round {i+1}", "complete")
-            elif i == current_round and state.get("processing_state") in ["generating_arguments", "pro_complete", "con_complete"]:
-                show_status_indicator(f"Round {i+1}", "processing")
-            else:
-                show_status_indicator(f"Round {i+1}", "ready")
-    
-    
-    if current_round < max_rounds:
-        processing_states = ["generating_arguments", "pro_complete", "con_complete"]
-        if state.get("processing_state") not in processing_states:
-            if st.button(f"🥊 Start Round {current_round + 1}", key=f"round_{current_round + 1}"):
-                try:
-                    show_processing_state("generating_arguments", f"Generating Round {current_round + 1} Arguments")
-                    
-                    with st.spinner(f"🔬 Round {current_round + 1} in progress - Conducting web research..."):
-                        updated_state = generate_round_arguments(state)
-                        
-                        if updated_state.get("processing_state") == "error":
-                            show_error("Failed to generate round arguments. Please try again.")
-                        else:
-                            update_session_state(updated_state)
-                            st.rerun()
-                            
-                except Exception as e:
-                    logging.error(f"Round generation error: {str(e)}")
-                    show_error(f"Round generation failed: {str(e)}")
-        else:
-            
-            processing_messages = {
-                "generating_arguments": f"Generating Round {current_round + 1} Arguments",
-                "pro_complete": "PRO argument complete, generating CON argument",
-                "con_complete": "Round arguments complete, updating debate"
-            }
-            current_processing = state.get("processing_state", "processing")
-            if current_processing in processing_messages:
-                show_processing_state(current_processing, processing_messages[current_processing])
-    
-    
-    for i, round_data in enumerate(state["rounds"]):
-        st.markdown(f'<div class="round-header">🏟 Round {i+1}</div>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown(f"""
-                <div class='debate-card pro-card'>
-                    <div class='card-header'>
-                        <span class='emoji'>✅</span>PRO Argument
-                    </div>
-                    <div class='card-content'>
-                        {round_data['pro']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-                <div class='debate-card con-card'>
-                    <div class='card-header'>
-                        <span class='emoji'>❌</span>CON Argument
-                    </div>
-                    <div class='card-content'>
-                        {round_data['con']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-    
-    
-    if current_round >= max_rounds and len(state["rounds"]) == max_rounds:
-        if len(state["judge"]) == 0:
-            if state.get("processing_state") != "generating_judgment":
-                st.markdown("### ⚖️ Ready for Final Judgment")
-                if st.button("👨‍⚖️ Generate Judge's Decision", key="judge_button"):
-                    try:
-                        show_processing_state("generating_judgment", "Judge Analyzing Arguments and Fact-Checking")
-                        
-                        with st.spinner("⚖️ Judge analyzing arguments and fact-checking claims..."):
-                            updated_state = generate_final_judgment(state)
-                            
-                            if updated_state.get("processing_state") == "error":
-                                show_error("Failed to generate judgment. Please try again.")
-                            else:
-                                update_session_state(updated_state)
-                                st.rerun()
-                                
-                    except Exception as e:
-                        logging.error(f"Judgment generation error: {str(e)}")
-                        show_error(f"Judgment generation failed: {str(e)}")
-            else:
-                show_processing_state("generating_judgment", "Judge Analyzing Arguments and Fact-Checking")
+    debate_arena(max_rounds)
     
     
     if len(state["judge"]) > 0:
@@ -648,43 +1002,47 @@ if st.session_state.debate_started:
         # Display winner banner if available
         winner = state.get("winner")
         if winner and winner != "ERROR":
-            winner_class = "pro-winner" if winner == "PRO" else "con-winner"
-            winner_emoji = "🟢" if winner == "PRO" else "🔴"
+            winner_class = "con-winner" if winner == "CON" else "pro-winner"
+            winner_emoji = {"PRO": "🟢", "CON": "🔴"}.get(winner, "🏅")
             st.markdown(f"""
                 <div class='winner-banner {winner_class}'>
                     🏆 {winner_emoji} Winner: {winner} {winner_emoji} 🏆
                 </div>
                 """, unsafe_allow_html=True)
         
+        # Per-judge verdicts when a judge panel decided the debate
+        judge_panel = state.get("judge_panel")
+        if judge_panel:
+            with st.expander(
+                f"🧑‍⚖️ Judge Panel: {' – '.join(f'{label} {count}' for label, count in judge_panel['votes'].items())} "
+                f"({judge_panel['agreement']:.0%} agreement)"
+            ):
+                if judge_panel["early_exit"]:
+                    st.caption(f"Majority reached early; {judge_panel['skipped']} of {judge_panel['panel_size']} judges were not run.")
+                for verdict in judge_panel["verdicts"]:
+                    st.markdown(f"**{verdict['judge']}** ({verdict['tier']}, {verdict['focus']} focus, {verdict['seconds']:.1f}s): {verdict['winner'] or 'no verdict'}")
+        
         # Add download button and restart option
         st.markdown("<br>", unsafe_allow_html=True)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            # Generate transcript
+            # Transcript sections are built once per debate and reused across reruns
             try:
-                topic_text = get_content(state['topic'][-1]) if state['topic'] else "No topic"
-                judge_text = get_content(state['judge'][-1]) if state['judge'] else "No judgment"
-                
-                debate_text = f"AI Debate Transcript - {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
-                debate_text += f"TOPIC: {topic_text}\n\n"
-                
-                for i, round_data in enumerate(state["rounds"]):
-                    debate_text += f"\n=== ROUND {i+1} ===\n"
-                    debate_text += f"\nPRO:\n{round_data['pro']}\n"
-                    debate_text += f"\nCON:\n{round_data['con']}\n"
-                
-                debate_text += f"\n=== JUDGMENT ===\n{judge_text}"
-                
-                if winner and winner != "ERROR":
-                    debate_text += f"\n\nWINNER: {winner}"
-                
+                exporter = get_transcript_exporter(state)
+                export_format = st.radio(
+                    "Transcript format",
+                    options=list(TRANSCRIPT_LABELS),
+                    format_func=lambda fmt: TRANSCRIPT_LABELS[fmt],
+                    horizontal=True,
+                    key="transcript_format"
+                )
                 st.download_button(
                     label="📄 Download Transcript",
-                    data=debate_text,
-                    file_name=f"debate_transcript_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-                    mime="text/plain"
+                    data=exporter.open(export_format),
+                    file_name=exporter.file_name(export_format),
+                    mime=exporter.mime(export_format)
                 )
             except Exception as e:
                 logging.error(f"Transcript generation error: {str(e)}")
@@ -693,9 +1051,56 @@ if st.session_state.debate_started:
         with col2:
             if st.button("🔄 Start New Debate"):
                 # Reset session state
-                st.session_state.debate_state = get_initial_state()
+                discard_speculation()
+                st.session_state.pop("failed_round", None)
+                st.query_params.clear()
+                update_session_state(get_initial_state())
                 st.session_state.debate_started = False
                 st.rerun()
+    
+usage_report = get_usage_report()
+if usage_report:
+    with st.expander("📊 Model Usage by Tier"):
+        st.table([
+            {
+                "Tier": tier,
+                "Models": ", ".join(entry["models"]),
+                "Calls": entry["calls"],
+                "Avg Latency (s)": entry["avg_latency"],
+                "Max Latency (s)": entry["max_latency"],
+                "Tokens In": entry["prompt_tokens"],
+                "Tokens Out": entry["completion_tokens"],
+                "Cost (USD)": f"${entry['cost']:.4f}"
+            }
+            for tier, entry in usage_report.items()
+        ])
+        memory = session_memory_report()
+        st.caption(
+            f"🧠 Debate state memory: {memory['resident_bytes'] / 1024:,.0f} KB resident across {memory['sessions']} sessions "
+            f"(largest {memory['largest_session_bytes'] / 1024:,.0f} KB), {memory['spilled_chars'] / 1024:,.0f}K characters spilled to disk"
+        )
+        if ADAPTIVE_CONCURRENCY:
+            st.caption("⚙️ Adaptive concurrency: " + ", ".join(
+                f"{endpoint} limit {limiter['limit']} ({limiter['inflight']} in flight, {limiter['rate_limited']} backoffs on 429)"
+                for endpoint, limiter in concurrency_report().items()
+            ))
+        hedge_report = latency_tracker.report()
+        if hedge_report:
+            st.markdown("**Deadlines and hedged requests by node**")
+            st.table([
+                {
+                    "Node": node,
+                    "Calls": int(stats["calls"]),
+                    "Hedge Rate": f"{stats['hedge_rate']:.1%}",
+                    "Hedge Wins": int(stats["hedge_wins"]),
+                    "Tail Time Saved (s)": stats["saved_seconds"],
+                    "Deadline Fallbacks": int(stats["deadline_exceeded"]),
+                    "p50 (s)": stats["p50"],
+                    "p95 (s)": stats["p95"],
+                    "p99 (s)": stats["p99"]
+                }
+                for node, stats in hedge_report.items()
+            ])
 
 # Footer with additional information
 st.markdown("---")
@@ -705,4 +1110,7 @@ st.markdown("""
     🎯 Manual round control for better pacing and analysis<br>
     ⚡ Advanced AI agents with current information integration
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if debate_profile:
+    debate_profile.end_rerun()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import logging
+import os
+from components.batch import run_batch_debates
+from components.budget import budget_summary
+from components.jobs import state_to_dict
+from components.usage import get_usage_report
+from config.index import BATCH_POLL_SECONDS
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def load_prompts(path: str) -> list:
+    """Read debate prompts from a text file (one per line) or JSONL with a "prompt" field"""
+    prompts = []
+    with open(path, encoding="utf-8") as prompts_file:
+        for line in prompts_file:
+            line = line.strip()
+            if not line:
+                continue
+            prompts.append(json.loads(line)["prompt"] if path.endswith(".jsonl") else line)
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many debates offline through the OpenAI Batch API")
+    parser.add_argument("prompts", help="Text file with one prompt per line, or JSONL with a \"prompt\" field")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per debate")
+    parser.add_argument("--out", default="batch_results.jsonl", help="Where to write one finished debate per line")
+    parser.add_argument("--progress", default="batch_progress.json", help="Progress file used to resume an interrupted run")
+    parser.add_argument("--poll-interval", type=float, default=BATCH_POLL_SECONDS, help="Seconds between batch status checks")
+    args = parser.parse_args()
+
+    prompts = load_prompts(args.prompts)
+    logging.info(f"Running {len(prompts)} debates with {args.rounds} rounds through the Batch API")
+    try:
+        states = run_batch_debates(prompts, args.rounds, args.poll_interval, args.progress)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with open(args.out, "w", encoding="utf-8") as out_file:
+        for state in states:
+            out_file.write(json.dumps(state_to_dict(state), ensure_ascii=False) + "\n")
+    # The run is finished and its results are written, so the next run starts fresh
+    if os.path.exists(args.progress):
+        os.remove(args.progress)
+
+    failed = sum(1 for state in states if state["processing_state"] == "error")
+    logging.info(f"Finished {len(states) - failed}/{len(states)} debates, results in {args.out}")
+    for tier, usage in get_usage_report().items():
+        logging.info(f"[{tier}] {usage['calls']} requests, ${usage['cost']:.4f}")
+    for state in states:
+        logging.info(f"{state['debate_id']}: winner {state.get('winner')} ({budget_summary(state.get('budget'))})")
+
+
+if __name__ == "__main__":
+    main()
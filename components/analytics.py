@@ -0,0 +1,263 @@
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from components.bots import State, get_content, get_participants, round_arguments
+
+FORMATS = {"parquet": "parquet", "arrow": "feather"}
+
+SCHEMAS = {
+    "debates": pa.schema([
+        ("debate_id", pa.string()),
+        ("created_at", pa.timestamp("s")),
+        ("category", pa.string()),
+        ("topic", pa.string()),
+        ("participants", pa.int32()),
+        ("rounds", pa.int32()),
+        ("winner", pa.string()),
+        ("panel_agreement", pa.float64()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("research_tokens", pa.int64()),
+        ("web_search_calls", pa.int64()),
+        ("cost", pa.float64()),
+        ("seconds", pa.float64()),
+        ("failed", pa.bool_()),
+        ("date", pa.string()),
+    ]),
+    "arguments": pa.schema([
+        ("debate_id", pa.string()),
+        ("round_number", pa.int32()),
+        ("participant", pa.string()),
+        ("argument_chars", pa.int32()),
+        ("research_chars", pa.int32()),
+        ("seconds", pa.float64()),
+        ("won", pa.bool_()),
+        ("date", pa.string()),
+    ]),
+    "nodes": pa.schema([
+        ("debate_id", pa.string()),
+        ("node", pa.string()),
+        ("round_number", pa.int32()),
+        ("seconds", pa.float64()),
+        ("date", pa.string()),
+    ]),
+    "spend": pa.schema([
+        ("debate_id", pa.string()),
+        ("node", pa.string()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("research_tokens", pa.int64()),
+        ("web_search_calls", pa.int64()),
+        ("cost", pa.float64()),
+        ("date", pa.string()),
+    ]),
+    "verdicts": pa.schema([
+        ("debate_id", pa.string()),
+        ("judge", pa.string()),
+        ("tier", pa.string()),
+        ("focus", pa.string()),
+        ("winner", pa.string()),
+        ("seconds", pa.float64()),
+        ("date", pa.string()),
+    ]),
+}
+
+
+def _step_node(step: str) -> tuple:
+    """Split a timing key such as "pro_2" into its node and round (0 for topic and judge)"""
+    node, _, round_number = step.rpartition("_")
+    return (node, int(round_number)) if node and round_number.isdigit() else (step, 0)
+
+
+def debate_columns(states: Iterable[State], created_at: Optional[float] = None) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Flatten debate states into one column dict per table
+
+    The debate's prompt is its category. A state's own "created_at" (epoch seconds)
+    is used when present, otherwise created_at or now; it also sets the date partition.
+    """
+    columns: Dict[str, Dict[str, List[Any]]] = {name: {field: [] for field in schema.names} for name, schema in SCHEMAS.items()}
+
+    def add(table: str, **row: Any):
+        for field, values in columns[table].items():
+            values.append(row.get(field))
+
+    for state in states:
+        debate_id = state.get("debate_id") or ""
+        started = datetime.fromtimestamp(state.get("created_at") or created_at or time.time())
+        date = started.strftime("%Y-%m-%d")
+        participants = get_participants(state)
+        winner = state.get("winner") if state.get("winner") != "ERROR" else None
+        budget = state.get("budget") or {}
+        timings = state.get("timings", {})
+        research = state.get("research", {})
+        panel = state.get("judge_panel")
+
+        add("debates",
+            debate_id=debate_id,
+            created_at=started,
+            category=get_content(state["prompt"][-1]) if state["prompt"] else None,
+            topic=get_content(state["topic"][-1]) if state["topic"] else None,
+            participants=len(participants),
+            rounds=len(state["rounds"]),
+            winner=winner,
+            panel_agreement=panel["agreement"] if panel else None,
+            prompt_tokens=budget.get("prompt_tokens", 0),
+            completion_tokens=budget.get("completion_tokens", 0),
+            research_tokens=budget.get("research_tokens", 0),
+            web_search_calls=budget.get("web_search_calls", 0),
+            cost=budget.get("cost", 0.0),
+            seconds=sum(timings.values()),
+            failed=state["processing_state"] == "error",
+            date=date)
+
+        for i, round_data in enumerate(state["rounds"]):
+            round_number = round_data.get("round_number") or i + 1
+            arguments = round_arguments(round_data)
+            for participant in participants:
+                key = f"{participant['name']}_{round_number}"
+                add("arguments",
+                    debate_id=debate_id,
+                    round_number=round_number,
+                    participant=participant["label"],
+                    argument_chars=len(arguments.get(participant["name"], "")),
+                    research_chars=len(research.get(key) or ""),
+                    seconds=timings.get(key),
+                    won=None if winner is None else participant["label"] == winner,
+                    date=date)
+
+        for step, seconds in timings.items():
+            node, round_number = _step_node(step)
+            add("nodes", debate_id=debate_id, node=node, round_number=round_number, seconds=seconds, date=date)
+
+        for node, spend in budget.get("nodes", {}).items():
+            add("spend", debate_id=debate_id, node=node, date=date, **{
+                field: spend.get(field, 0) for field in ("prompt_tokens", "completion_tokens", "research_tokens", "web_search_calls", "cost")
+            })
+
+        if panel:
+            for verdict in panel["verdicts"]:
+                add("verdicts", debate_id=debate_id, date=date, **{
+                    field: verdict.get(field) for field in ("judge", "tier", "focus", "winner", "seconds")
+                })
+        elif state["judge"]:
+            add("verdicts", debate_id=debate_id, judge="judge", winner=winner, seconds=timings.get("judge"), date=date)
+
+    return columns
+
+
+def debate_tables(states: Iterable[State], created_at: Optional[float] = None) -> Dict[str, pa.Table]:
+    """Arrow tables (debates, arguments, nodes, spend, verdicts) for a set of debates"""
+    return {
+        name: pa.Table.from_pydict(table_columns, schema=SCHEMAS[name])
+        for name, table_columns in debate_columns(states, created_at).items()
+    }
+
+
+def export_debates(states: Iterable[State], directory: str, fmt: str = "parquet", export_id: str = "debates",
+                   created_at: Optional[float] = None) -> Dict[str, int]:
+    """
+    Write debates as one date-partitioned dataset per table under directory
+
+    Files are laid out as <directory>/<table>/date=YYYY-MM-DD/<export_id>-<n>.<fmt>,
+    so exporting the same source again under the same export_id replaces its files
+    instead of duplicating rows. Returns the rows written per table.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    written = {}
+    for name, table in debate_tables(states, created_at).items():
+        written[name] = table.num_rows
+        if not table.num_rows:
+            continue
+        ds.write_dataset(
+            table,
+            os.path.join(directory, name),
+            format=FORMATS[fmt],
+            partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+            basename_template=f"{export_id}-{{i}}.{fmt}",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    return written
+
+
+def load_table(directory: str, name: str, fmt: str = "parquet", since: Optional[str] = None,
+               until: Optional[str] = None, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Read one exported table, pruning date partitions outside [since, until] (YYYY-MM-DD)
+
+    A table with no exported rows has no directory, so it reads as an empty table.
+    """
+    path = os.path.join(directory, name)
+    if not os.path.isdir(path):
+        schema = SCHEMAS[name]
+        return schema.empty_table().select(columns) if columns else schema.empty_table()
+    dataset = ds.dataset(path, format=FORMATS[fmt], partitioning="hive", schema=SCHEMAS[name])
+    condition = None
+    if since:
+        condition = ds.field("date") >= since
+    if until:
+        condition = ds.field("date") <= until if condition is None else condition & (ds.field("date") <= until)
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def _named(table: pa.Table, columns: Dict[str, str]) -> pa.Table:
+    """Select and rename aggregate output columns by name, whatever order group_by produced"""
+    return table.select(list(columns)).rename_columns(list(columns.values()))
+
+
+def win_rates(debates: pa.Table, by: str = "category") -> pa.Table:
+    """Debates won per winner within each group, with the share of that group's judged debates"""
+    judged = debates.filter(pc.is_valid(debates["winner"]))
+    wins = _named(judged.group_by([by, "winner"]).aggregate([("debate_id", "count")]), {by: by, "winner": "winner", "debate_id_count": "wins"})
+    totals = _named(judged.group_by(by).aggregate([("debate_id", "count")]), {by: by, "debate_id_count": "debates"})
+    report = wins.join(totals, by)
+    report = report.append_column("win_rate", pc.divide(pc.cast(report["wins"], pa.float64()), report["debates"]))
+    return report.sort_by([(by, "ascending"), ("win_rate", "descending")])
+
+
+def argument_length_report(arguments: pa.Table) -> pa.Table:
+    """Argument length for winning and losing sides, per participant"""
+    judged = arguments.filter(pc.is_valid(arguments["won"]))
+    report = judged.group_by(["participant", "won"]).aggregate([
+        ("argument_chars", "count"),
+        ("argument_chars", "mean"),
+        ("argument_chars", "approximate_median"),
+        ("research_chars", "mean"),
+    ])
+    return _named(report, {
+        "participant": "participant",
+        "won": "won",
+        "argument_chars_count": "arguments",
+        "argument_chars_mean": "mean_chars",
+        "argument_chars_approximate_median": "median_chars",
+        "research_chars_mean": "mean_research_chars",
+    }).sort_by([("participant", "ascending"), ("won", "descending")])
+
+
+def research_share(debates: pa.Table, by: str = "category") -> pa.Table:
+    """Share of each group's tokens that went to web research"""
+    totals = debates.append_column("tokens", pc.add(debates["prompt_tokens"], debates["completion_tokens"]))
+    report = totals.group_by(by).aggregate([("research_tokens", "sum"), ("tokens", "sum"), ("cost", "sum")])
+    report = _named(report, {by: by, "research_tokens_sum": "research_tokens", "tokens_sum": "tokens", "cost_sum": "cost"})
+    share = pc.divide(pc.cast(report["research_tokens"], pa.float64()), pc.max_element_wise(report["tokens"], 1))
+    return report.append_column("research_share", share).sort_by([("research_share", "descending")])
+
+
+def latency_report(nodes: pa.Table, quantiles: tuple = (0.5, 0.95, 0.99)) -> pa.Table:
+    """Count, mean and approximate latency quantiles per node"""
+    timed = nodes.filter(pc.is_valid(nodes["seconds"]))
+    report = timed.group_by("node").aggregate([
+        ("seconds", "count"),
+        ("seconds", "mean"),
+        ("seconds", "tdigest", pc.TDigestOptions(q=list(quantiles))),
+    ])
+    digest = report["seconds_tdigest"]
+    report = _named(report, {"node": "node", "seconds_count": "steps", "seconds_mean": "mean_seconds"})
+    for i, quantile in enumerate(quantiles):
+        report = report.append_column(f"p{round(quantile * 100):g}_seconds", pc.list_element(digest, i))
+    return report.sort_by([("node", "ascending")])
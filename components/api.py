@@ -0,0 +1,399 @@
+"""
+Async HTTP API for driving debates without the Streamlit UI
+
+Everything runs on one asyncio event loop, so an idle connection or Server-Sent
+Events subscriber costs a socket and a queue. Debate steps run on a thread pool,
+or on the worker queue in EXECUTION_MODE=pool.
+
+    POST /debates                  {"prompt": ..., "positions": ["LABEL: stance", ...], "rounds": 3, "wait": false}
+    GET  /debates/<id>             current state
+    POST /debates/<id>/rounds      generate the next round ({"wait": true} to respond when it is done)
+    POST /debates/<id>/judgment    generate the final judgment
+    GET  /debates/<id>/events      step progress, research text and argument/judgment tokens as Server-Sent Events
+    GET  /concurrency              adaptive concurrency limits and their history
+    GET  /health, GET /metrics
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
+from urllib.parse import parse_qs, urlsplit
+from components import metrics
+from components.bots import State, get_content, make_participants, current_arguments
+from components.debate_store import load_debate, load_node, save_node
+from components.jobs import run_step, state_to_dict, STEP_STATES
+from components.tools import research_progress, stream_tokens, concurrency_report
+from config.index import API_STEP_WORKERS, API_SESSION_IDLE_SECONDS, API_SSE_KEEPALIVE_SECONDS
+
+DEFAULT_ROUNDS = 3
+MAX_ROUNDS = 10
+MAX_BODY_BYTES = 1024 * 1024
+EVENT_HISTORY = 2000
+KEEPALIVE_TIMEOUT = 75
+
+Event = Tuple[int, str, Dict[str, Any]]
+
+
+class ApiError(Exception):
+    """A request the API refuses, answered with its status code and message"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DebateSession:
+    """A debate's latest state, its running step and its event subscribers"""
+
+    def __init__(self, state: State, rounds: int):
+        self.state = state
+        self.rounds = rounds
+        self.task: Optional[asyncio.Task] = None
+        self.events: List[Event] = []
+        self.next_event_id = 1
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.updated_at = time.time()
+
+    @property
+    def busy(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @property
+    def finished(self) -> bool:
+        return len(self.state["judge"]) > 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "debate_id": self.state.get("debate_id"),
+            "processing_state": self.state.get("processing_state"),
+            "current_round": self.state["current_round"],
+            "rounds": self.rounds,
+            "busy": self.busy,
+            "winner": self.state.get("winner"),
+        }
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """Record an event and hand it to every subscriber; must run on the event loop"""
+        entry = (self.next_event_id, event, data)
+        self.next_event_id += 1
+        self.events.append(entry)
+        del self.events[:-EVENT_HISTORY]
+        for queue in self.subscribers:
+            queue.put_nowait(entry)
+        self.updated_at = time.time()
+
+
+def _step_output(kind: str, state: State) -> Dict[str, Any]:
+    if kind == "topic":
+        return {"topic": get_content(state["topic"][-1]) if state["topic"] else ""}
+    if kind == "round":
+        return {"round": state["current_round"], "arguments": current_arguments(state)}
+    return {"winner": state.get("winner"), "judgment": get_content(state["judge"][-1]) if state["judge"] else ""}
+
+
+def _format_event(event_id: Optional[int], event: str, data: Dict[str, Any]) -> bytes:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False)}"]
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Parse one HTTP/1.1 request, or return None when the client closed the connection"""
+    line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise ApiError(400, "Malformed request line")
+
+    headers: Dict[str, str] = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise ApiError(400, "Content-Length must be a non-negative integer")
+    if length < 0:
+        raise ApiError(400, "Content-Length must be a non-negative integer")
+    if length > MAX_BODY_BYTES:
+        raise ApiError(413, f"Request body is larger than {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return {
+        "method": method.upper(),
+        "path": url.path.rstrip("/") or "/",
+        "query": {key: values[-1] for key, values in parse_qs(url.query).items()},
+        "headers": headers,
+        "body": body,
+        "keep_alive": headers.get("connection", "").lower() != "close" and version == "HTTP/1.1",
+    }
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, body: bytes, content_type: str, keep_alive: bool):
+    head = (
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class DebateAPI:
+    """Debate sessions and the HTTP handlers that drive them"""
+
+    def __init__(self, step_workers: int = API_STEP_WORKERS):
+        self.sessions: Dict[str, DebateSession] = {}
+        self.executor = ThreadPoolExecutor(max_workers=step_workers, thread_name_prefix="api_step")
+        self.connections = 0
+        self.streams = 0
+        metrics.register_collector(
+            "debate_api_connections", "Open API connections and event streams", "gauge",
+            lambda: [
+                ("debate_api_connections", {"kind": "http"}, self.connections),
+                ("debate_api_connections", {"kind": "events"}, self.streams),
+            ]
+        )
+
+    async def get_session(self, debate_id: str) -> DebateSession:
+        """Return a debate's session, restoring it from the store off the event loop if it is not in memory"""
+        session = self.sessions.get(debate_id)
+        if session is None:
+            state = await asyncio.to_thread(load_debate, debate_id)
+            if state is None:
+                raise ApiError(404, f"Unknown debate {debate_id}")
+            max_rounds = await asyncio.to_thread(load_node, debate_id, "max_rounds")
+            # Another request may have restored it while this one waited on the store
+            session = self.sessions.setdefault(debate_id, DebateSession(cast(State, state), int(max_rounds or DEFAULT_ROUNDS)))
+        return session
+
+    def evict_idle(self):
+        """Drop idle debates from memory; they are restored from the store when requested again"""
+        cutoff = time.time() - API_SESSION_IDLE_SECONDS
+        for debate_id, session in list(self.sessions.items()):
+            if not session.busy and not session.subscribers and session.updated_at < cutoff:
+                del self.sessions[debate_id]
+
+    def start_step(self, session: DebateSession, kind: str, payload: Dict[str, Any]) -> asyncio.Task:
+        """Run a debate step on the thread pool, publishing its progress to the session's subscribers"""
+        if session.busy:
+            raise ApiError(409, f"Debate is already {session.state.get('processing_state')}")
+        loop = asyncio.get_running_loop()
+
+        def listener(event: Dict[str, Any]):
+            loop.call_soon_threadsafe(session.publish, "token" if event["type"] == "token" else "research", event)
+
+        def run() -> State:
+            with research_progress(listener), stream_tokens():
+                return run_step(kind, payload)
+
+        previous = session.state
+        session.state = cast(State, {**previous, "processing_state": STEP_STATES[kind]})
+
+        async def step() -> State:
+            try:
+                result = await loop.run_in_executor(self.executor, copy_context().run, run)
+                if result.get("processing_state") == "error":
+                    raise RuntimeError(f"{kind} step failed")
+            except Exception as e:
+                logging.error(f"API {kind} step error: {str(e)}")
+                session.state = previous if previous["topic"] else cast(State, {**previous, "processing_state": "error"})
+                session.publish("step", {"kind": kind, "status": "error", "error": str(e), **session.summary()})
+                raise
+            session.state = result
+            session.publish("step", {"kind": kind, "status": "complete", **session.summary(), **_step_output(kind, result)})
+            return result
+
+        session.task = loop.create_task(step())
+        session.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        session.publish("step", {"kind": kind, "status": "started", **session.summary()})
+        return session.task
+
+    async def respond_to_step(self, session: DebateSession, task: asyncio.Task, wait: bool) -> Tuple[int, Dict[str, Any]]:
+        if not wait:
+            return 202, {**session.summary(), "events": f"/debates/{session.state.get('debate_id')}/events"}
+        try:
+            return 200, state_to_dict(await task)
+        except Exception as e:
+            raise ApiError(502, str(e))
+
+    async def create_debate(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        prompt = str(body.get("prompt") or "").strip()
+        if not prompt:
+            raise ApiError(400, "A debate needs a prompt")
+        rounds = body.get("rounds") or DEFAULT_ROUNDS
+        if not isinstance(rounds, int) or not 1 <= rounds <= MAX_ROUNDS:
+            raise ApiError(400, f"rounds must be between 1 and {MAX_ROUNDS}")
+        try:
+            participants = make_participants(body["positions"]) if body.get("positions") else None
+        except ValueError as e:
+            raise ApiError(400, str(e))
+
+        debate_id = str(body.get("debate_id") or uuid.uuid4().hex)
+        stored = await asyncio.to_thread(load_node, debate_id, "topic")
+        session = self.sessions.get(debate_id)
+        if (session and session.state["topic"]) or stored:
+            raise ApiError(409, f"Debate {debate_id} already exists")
+        if session is None:
+            state = cast(State, {
+                "debate_id": debate_id,
+                "topic": [],
+                "rounds": [],
+                "judge": [],
+                "prompt": [{"role": "user", "content": prompt}],
+                "current_round": 0,
+                "winner": None,
+                "pro_argument": [],
+                "con_argument": [],
+                "processing_state": "ready",
+                "ready_for_next_round": False
+            })
+            session = self.sessions[debate_id] = DebateSession(state, rounds)
+        await asyncio.to_thread(save_node, debate_id, "max_rounds", 0, str(rounds))
+        task = self.start_step(session, "topic", {"prompt": prompt, "debate_id": debate_id, "participants": participants})
+        return await self.respond_to_step(session, task, bool(body.get("wait")))
+
+    async def advance_round(self, session: DebateSession, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if not session.state["topic"]:
+            raise ApiError(409, "Debate has no topic yet")
+        if session.state["current_round"] >= session.rounds:
+            raise ApiError(409, f"All {session.rounds} rounds are done; request the judgment")
+        task = self.start_step(session, "round", {"state": session.state})
+        return await self.respond_to_step(session, task, bool(body.get("wait")))
+
+    async def request_judgment(self, session: DebateSession, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if session.finished:
+            raise ApiError(409, "Debate has already been judged")
+        if session.state["current_round"] < session.rounds:
+            raise ApiError(409, f"Only {session.state['current_round']} of {session.rounds} rounds are done")
+        task = self.start_step(session, "judgment", {"state": session.state})
+        return await self.respond_to_step(session, task, bool(body.get("wait")))
+
+    async def stream_events(self, writer: asyncio.StreamWriter, session: DebateSession, last_event_id: Optional[str]):
+        """Send the current state, missed events after Last-Event-ID, then live events until the client leaves"""
+        queue: asyncio.Queue = asyncio.Queue()
+        session.subscribers.add(queue)
+        self.streams += 1
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n"
+            )
+            writer.write(_format_event(None, "state", session.summary()))
+            if last_event_id and last_event_id.isdigit():
+                for entry in session.events:
+                    if entry[0] > int(last_event_id):
+                        writer.write(_format_event(*entry))
+            await writer.drain()
+
+            while not (session.finished and queue.empty()):
+                try:
+                    entry = await asyncio.wait_for(queue.get(), API_SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    writer.write(_format_event(*entry))
+                await writer.drain()
+            writer.write(_format_event(None, "done", session.summary()))
+            await writer.drain()
+        finally:
+            self.streams -= 1
+            session.subscribers.discard(queue)
+
+    async def dispatch(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; returns whether the connection can serve another"""
+        method, parts = request["method"], [part for part in request["path"].split("/") if part]
+        keep_alive = request["keep_alive"]
+        try:
+            if method == "GET" and parts == ["health"]:
+                status, data = 200, {"status": "ok", "debates": len(self.sessions), "connections": self.connections}
+            elif method == "GET" and parts == ["concurrency"]:
+                status, data = 200, concurrency_report()
+            elif method == "GET" and parts == ["metrics"]:
+                write_response(writer, 200, metrics.render_metrics().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8", keep_alive)
+                return keep_alive
+            elif parts[:1] == ["debates"]:
+                body: Dict[str, Any] = {}
+                if request["body"]:
+                    try:
+                        body = json.loads(request["body"])
+                    except ValueError:
+                        raise ApiError(400, "Request body must be JSON")
+                    if not isinstance(body, dict):
+                        raise ApiError(400, "Request body must be a JSON object")
+
+                if method == "POST" and len(parts) == 1:
+                    status, data = await self.create_debate(body)
+                elif len(parts) < 2:
+                    raise ApiError(405, f"{method} is not allowed on /debates")
+                else:
+                    session = await self.get_session(parts[1])
+                    if method == "GET" and len(parts) == 2:
+                        status, data = 200, {**state_to_dict(session.state), "busy": session.busy, "max_rounds": session.rounds}
+                    elif method == "GET" and parts[2:] == ["events"]:
+                        await self.stream_events(writer, session, request["headers"].get("last-event-id") or request["query"].get("last_event_id"))
+                        return False
+                    elif method == "POST" and parts[2:] == ["rounds"]:
+                        status, data = await self.advance_round(session, body)
+                    elif method == "POST" and parts[2:] == ["judgment"]:
+                        status, data = await self.request_judgment(session, body)
+                    else:
+                        raise ApiError(404, f"No route for {method} {request['path']}")
+            else:
+                raise ApiError(404, f"No route for {method} {request['path']}")
+        except ApiError as e:
+            status, data = e.status, {"error": str(e)}
+
+        write_response(writer, status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json", keep_alive)
+        await writer.drain()
+        return keep_alive
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except ApiError as e:
+                    write_response(writer, e.status, json.dumps({"error": str(e)}).encode("utf-8"), "application/json", False)
+                    await writer.drain()
+                    break
+                if request is None or not await self.dispatch(request, writer):
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logging.error(f"API connection error: {str(e)}")
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def evict_forever(self, interval: float = 60.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+
+async def serve(host: str, port: int, step_workers: int = API_STEP_WORKERS):
+    """Serve the debate API until cancelled"""
+    api = DebateAPI(step_workers)
+    server = await asyncio.start_server(api.handle_connection, host, port, limit=MAX_BODY_BYTES)
+    eviction = asyncio.create_task(api.evict_forever())
+    logging.info(f"Debate API listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        eviction.cancel()
+        api.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,313 @@
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, cast
+from components.bots import (
+    State,
+    get_content,
+    get_debate_history,
+    topic_messages,
+    pro_messages,
+    con_messages,
+    judge_messages,
+    pro_research_args,
+    con_research_args,
+    fact_check_context,
+    parse_winner,
+    update_rounds,
+    checkpoint_node,
+    checkpoint_metrics,
+    TOPIC_RESEARCH_CONTEXT
+)
+from components.budget import new_budget, charge_budget
+from components.jobs import state_to_dict
+from components.tools import client as api_client, build_research_request, build_chat_request
+from components.usage import record_call
+from config.index import get_node_config, BATCH_PRICE_MULTIPLIER, BATCH_MAX_REQUESTS
+
+# Batch files and jobs are not behind the adaptive limits, so keep the SDK's default retries
+client = api_client.with_options(max_retries=2)
+
+ENDPOINTS = {"research": "/v1/responses", "chat": "/v1/chat/completions"}
+FINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _research_stage(name: str, node: str, args: Callable[[State], Dict[str, str]], key: Callable[[State], str]) -> Dict[str, Any]:
+    def build(state: State) -> Dict[str, Any]:
+        search = args(state)
+        return build_research_request(search["query"], search.get("perspective", ""), search.get("context", ""), get_node_config(node))[1]
+
+    def apply(state: State, text: str):
+        state["research"] = {**state.get("research", {}), key(state): text}
+
+    return {"name": name, "kind": "research", "node": node, "build": build, "apply": apply, "step": key}
+
+
+def _chat_stage(name: str, node: str, messages: Callable[[State], List[Dict[str, str]]], apply: Callable[[State, str], None],
+                step: Callable[[State], str]) -> Dict[str, Any]:
+    def build(state: State) -> Dict[str, Any]:
+        return build_chat_request(messages(state), get_node_config(node))
+
+    return {"name": name, "kind": "chat", "node": node, "build": build, "apply": apply, "step": step}
+
+
+def _topic(state: State) -> str:
+    return get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
+
+
+def _prompt(state: State) -> str:
+    return get_content(state["prompt"][-1]) if state["prompt"] else "General debate topic"
+
+
+def _pro_current(state: State) -> str:
+    return get_content(state["pro_argument"][-1]) if state["pro_argument"] else ""
+
+
+def _apply_topic(state: State, text: str):
+    state["topic"] = [{"role": "assistant", "content": text}]
+    state["processing_state"] = "topic_ready"
+    checkpoint_node(state, "prompt", 0, _prompt(state))
+    checkpoint_node(state, "topic", 0, text)
+
+
+def _start_round(round_number: int) -> Callable[[State], Dict[str, str]]:
+    def args(state: State) -> Dict[str, str]:
+        state["current_round"] = round_number
+        state["processing_state"] = "generating_arguments"
+        # The interactive PRO bot numbers its research one ahead of the round counter
+        return pro_research_args(_topic(state), round_number + 1)
+    return args
+
+
+def _apply_pro(state: State, text: str):
+    state["pro_argument"] = [{"role": "assistant", "content": text}]
+    state["processing_state"] = "pro_complete"
+    checkpoint_node(state, "pro", state["current_round"], text)
+
+
+def _apply_con(state: State, text: str):
+    state["con_argument"] = [{"role": "assistant", "content": text}]
+    checkpoint_node(state, "con", state["current_round"], text)
+    state.update(update_rounds(state))
+
+
+def _apply_judge(state: State, text: str):
+    winner = parse_winner(text)
+    state["judge"] = [{"role": "assistant", "content": text}]
+    state["winner"] = winner
+    state["processing_state"] = "judgment_complete"
+    checkpoint_node(state, "winner", 0, winner)
+    checkpoint_node(state, "judge", 0, text)
+
+
+def plan_stages(rounds: int = 3) -> List[Dict[str, Any]]:
+    """The debate pipeline as a list of same-kind stages that can each run as one batch"""
+    stages = [
+        _research_stage("topic_research", "research", lambda state: {"query": _prompt(state), "context": TOPIC_RESEARCH_CONTEXT}, lambda state: "topic"),
+        _chat_stage("topic", "topic", lambda state: topic_messages(_prompt(state), state["research"]["topic"]), _apply_topic, lambda state: "topic"),
+    ]
+    for round_number in range(1, rounds + 1):
+        stages += [
+            _research_stage(f"pro_research_{round_number}", "research", _start_round(round_number), lambda state: f"pro_{state['current_round']}"),
+            _chat_stage(
+                f"pro_{round_number}", "pro",
+                lambda state: pro_messages(_topic(state), state["current_round"] + 1, get_debate_history(state), state["research"][f"pro_{state['current_round']}"]),
+                _apply_pro, lambda state: f"pro_{state['current_round']}"
+            ),
+            _research_stage(
+                f"con_research_{round_number}", "research",
+                lambda state: con_research_args(_topic(state), state["current_round"], _pro_current(state)),
+                lambda state: f"con_{state['current_round']}"
+            ),
+            _chat_stage(
+                f"con_{round_number}", "con",
+                lambda state: con_messages(_topic(state), state["current_round"], get_debate_history(state), state["research"][f"con_{state['current_round']}"], _pro_current(state)),
+                _apply_con, lambda state: f"con_{state['current_round']}"
+            ),
+        ]
+    stages += [
+        _research_stage("fact_check", "fact_check", lambda state: {"query": _topic(state), "context": fact_check_context(state)}, lambda state: "judge"),
+        _chat_stage("judge", "judge", lambda state: judge_messages(_topic(state), get_debate_history(state), state["research"]["judge"]), _apply_judge, lambda state: "judge"),
+    ]
+    return stages
+
+
+def new_batch_state(prompt: str) -> State:
+    """Initial state for one debate in a batch run"""
+    return cast(State, {
+        "debate_id": uuid.uuid4().hex,
+        "topic": [],
+        "rounds": [],
+        "judge": [],
+        "prompt": [{"role": "user", "content": prompt}],
+        "current_round": 0,
+        "winner": None,
+        "pro_argument": [],
+        "con_argument": [],
+        "processing_state": "generating_topic",
+        "ready_for_next_round": False,
+        "research": {},
+        "budget": new_budget(),
+        "created_at": time.time()
+    })
+
+
+def extract_output(kind: str, body: Dict[str, Any]) -> str:
+    """Pull the generated text out of a batch result body"""
+    if kind == "chat":
+        return body["choices"][0]["message"]["content"]
+    texts = []
+    for item in body.get("output", []):
+        if item.get("type") == "message":
+            texts += [part.get("text", "") for part in item.get("content", []) if part.get("type") == "output_text"]
+    return "".join(texts) or "Research completed but no specific data retrieved."
+
+
+def submit_batch(lines: List[Dict[str, Any]], endpoint: str, stage: str) -> str:
+    """Upload one JSONL request file and start a batch job for it"""
+    data = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+    batch_file = client.files.create(file=(f"{stage}.jsonl", io.BytesIO(data)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint=endpoint,
+        completion_window="24h",
+        metadata={"stage": stage}
+    )
+    logging.info(f"Submitted batch {batch.id} for stage {stage} with {len(lines)} requests")
+    return batch.id
+
+
+def wait_for_batches(batch_ids: List[str], poll_interval: float) -> Dict[str, Dict[str, Any]]:
+    """Poll batch jobs until all finish and return their result lines by custom_id"""
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = list(batch_ids)
+    while pending:
+        for batch_id in list(pending):
+            batch = client.batches.retrieve(batch_id)
+            if batch.status not in FINAL_BATCH_STATUSES:
+                continue
+            pending.remove(batch_id)
+            logging.info(f"Batch {batch_id} {batch.status}: {batch.request_counts}")
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                for line in client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        result = json.loads(line)
+                        results[result["custom_id"]] = result
+        if pending:
+            time.sleep(poll_interval)
+    return results
+
+
+def _save_progress(path: Optional[str], prompts: List[str], rounds: int, stage_index: int, states: List[State],
+                   pending_batches: List[str], stage_started: Optional[float] = None):
+    if not path:
+        return
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as progress_file:
+        json.dump({
+            "prompts": prompts,
+            "rounds": rounds,
+            "stage_index": stage_index,
+            "pending_batches": pending_batches,
+            "stage_started": stage_started,
+            "states": [state_to_dict(state) for state in states]
+        }, progress_file)
+    os.replace(temp_path, path)
+
+
+def run_batch_debates(prompts: List[str], rounds: int = 3, poll_interval: float = 30.0,
+                      progress_path: Optional[str] = None) -> List[State]:
+    """
+    Run many debates through the Batch API, one batch per pipeline stage
+
+    Every debate's request for a stage goes into the same batch (split at
+    BATCH_MAX_REQUESTS). When a stage's batches finish, each debate advances to the
+    next stage. With progress_path set, the run can be restarted and continues from
+    the stage in progress, re-polling submitted batches instead of resubmitting.
+    The caller deletes the progress file once the results are safe. A progress file
+    left by a run with other prompts or rounds raises ValueError rather than being
+    resumed or overwritten.
+    """
+    stages = plan_stages(rounds)
+    stage_index, pending_batches, stage_started = 0, [], time.time()
+    if progress_path and os.path.exists(progress_path):
+        with open(progress_path, encoding="utf-8") as progress_file:
+            progress = json.load(progress_file)
+        if progress.get("prompts") != prompts or progress.get("rounds") != rounds:
+            raise ValueError(
+                f"{progress_path} is the progress of a run with different prompts or rounds; "
+                f"finish that run with its original arguments, or delete the file to start a new one"
+            )
+        stage_index, pending_batches = progress["stage_index"], progress["pending_batches"]
+        stage_started = progress.get("stage_started") or time.time()
+        states = [cast(State, state) for state in progress["states"]]
+        logging.info(f"Resuming batch run at stage {stages[stage_index]['name'] if stage_index < len(stages) else 'done'}")
+    else:
+        states = [new_batch_state(prompt) for prompt in prompts]
+
+    while stage_index < len(stages):
+        stage = stages[stage_index]
+        endpoint = ENDPOINTS[stage["kind"]]
+        active = [state for state in states if state["processing_state"] != "error"]
+
+        if not pending_batches:
+            stage_started = time.time()
+            lines = []
+            for state in active:
+                lines.append({
+                    "custom_id": f"{state['debate_id']}|{stage['name']}",
+                    "method": "POST",
+                    "url": endpoint,
+                    "body": stage["build"](state)
+                })
+            pending_batches = [
+                submit_batch(lines[start:start + BATCH_MAX_REQUESTS], endpoint, stage["name"])
+                for start in range(0, len(lines), BATCH_MAX_REQUESTS)
+            ]
+            _save_progress(progress_path, prompts, rounds, stage_index, states, pending_batches, stage_started)
+
+        results = wait_for_batches(pending_batches, poll_interval)
+        # Batch turnaround since submission, so a resumed run still counts the time before the restart
+        elapsed = time.time() - stage_started
+        node_config = get_node_config(stage["node"])
+
+        for state in active:
+            result = results.get(f"{state['debate_id']}|{stage['name']}")
+            response = (result or {}).get("response") or {}
+            if not result or result.get("error") or response.get("status_code") != 200:
+                error = (result or {}).get("error") or response.get("body") or "missing from batch output"
+                logging.error(f"Debate {state['debate_id']} failed at {stage['name']}: {error}")
+                state["processing_state"] = "error"
+                continue
+
+            body = response["body"]
+            usage = body.get("usage") or {}
+            prompt_tokens = usage.get("prompt_tokens") or usage.get("input_tokens") or 0
+            completion_tokens = usage.get("completion_tokens") or usage.get("output_tokens") or 0
+            cost = record_call(
+                stage["node"], node_config["tier"], node_config["model"], elapsed,
+                prompt_tokens, completion_tokens,
+                web_search_calls=1 if stage["kind"] == "research" else 0,
+                price_multiplier=BATCH_PRICE_MULTIPLIER
+            )
+            state["budget"] = charge_budget(state.get("budget"), stage["node"], [{
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "web_search_calls": 1 if stage["kind"] == "research" else 0,
+                "cost": cost
+            }])
+            # A node's research and chat stages add up to its timing, as record_step times both interactively
+            step = stage["step"](state)
+            state["timings"] = {**state.get("timings", {}), step: round(state.get("timings", {}).get(step, 0.0) + elapsed, 3)}
+            stage["apply"](state, extract_output(stage["kind"], body))
+            checkpoint_metrics(state)
+
+        stage_index, pending_batches = stage_index + 1, []
+        _save_progress(progress_path, prompts, rounds, stage_index, states, pending_batches)
+
+    return states
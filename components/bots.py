@@ -1,9 +1,43 @@
-from typing import TypedDict, List, Dict, Any, Annotated, Union, Optional, cast
+from typing import TypedDict, NotRequired, List, Dict, Any, Annotated, Callable, Union, Optional, Sequence, Tuple, cast
 from langgraph.graph.message import add_messages
 from langgraph.graph import StateGraph
-from bot_instructions import topic_bot_prompt, pro_bot_prompt, con_bot_prompt, judge_bot_prompt
-from components.tools import openai_web_search, get_simple_llm_response
+from bot_instructions import (
+    topic_bot_prompt,
+    pro_bot_prompt,
+    con_bot_prompt,
+    judge_bot_prompt,
+    judge_focus_prompts,
+    participant_bot_prompt,
+    judge_participants_prompt
+)
+from components import metrics
+from components.profiling import span, profiled
+from components.tools import (
+    openai_web_search,
+    get_simple_llm_response,
+    is_failed_response,
+    is_failed_research,
+    research_progress,
+    research_relay,
+    normalize_query,
+    fresh_completions,
+    SingleFlight
+)
+from components.debate_store import save_node, load_node, load_debate, delete_node
+from components.shared_store import get_prewarmed_topic
+from components.usage import track_calls
+from components.budget import new_budget, charge_budget, is_degraded, trim_research
+from config.index import JUDGE_PANEL, JUDGE_PANEL_SIZE, MAX_PARTICIPANTS, SINGLEFLIGHT_DB, SINGLEFLIGHT_LEASE_SECONDS
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextvars import copy_context
+from itertools import islice
+import functools
+import json
 import logging
+import threading
+import time
+
+COMPACT_ARGUMENT_CHARS = 400
 
 def get_content(message: Union[Dict[str, Any], Any]) -> str:
     """Safely extract content from either a message object or dictionary"""
@@ -14,12 +48,20 @@ def get_content(message: Union[Dict[str, Any], Any]) -> str:
     else:
         return str(message)
 
+class Participant(TypedDict):
+    name: str
+    label: str
+    stance: str
+    rebuts: List[str]
+
 class DebateRound(TypedDict):
-    pro: str
-    con: str
+    pro: NotRequired[str]
+    con: NotRequired[str]
+    arguments: NotRequired[Dict[str, str]]
     round_number: int
 
 class State(TypedDict):
+    debate_id: Optional[str]
     topic: Annotated[List[Dict[str, str]], add_messages]
     rounds: List[DebateRound]
     judge: Annotated[List[Dict[str, str]], add_messages]
@@ -30,41 +72,397 @@ class State(TypedDict):
     con_argument: Annotated[List[Dict[str, str]], add_messages]
     processing_state: str
     ready_for_next_round: bool
+    research: NotRequired[Dict[str, str]]
+    timings: NotRequired[Dict[str, float]]
+    budget: NotRequired[Dict[str, Any]]
+    judge_panel: NotRequired[Dict[str, Any]]
+    participants: NotRequired[List[Participant]]
+    arguments: NotRequired[Dict[str, str]]
+    created_at: NotRequired[float]
+    failed_participants: NotRequired[List[str]]
+
+# The classic two-sided debate: CON answers PRO's argument from the same round
+DEFAULT_PARTICIPANTS: List[Participant] = [
+    {"name": "pro", "label": "PRO", "stance": "in favor of the topic", "rebuts": []},
+    {"name": "con", "label": "CON", "stance": "against the topic", "rebuts": ["pro"]},
+]
+
+def get_participants(state: State) -> List[Participant]:
+    """The debate's participants, PRO and CON unless the debate was started with its own"""
+    return state.get("participants") or DEFAULT_PARTICIPANTS
+
+def is_two_sided(participants: List[Participant]) -> bool:
+    return [participant["name"] for participant in participants] == ["pro", "con"]
 
+def make_participants(positions: List[str]) -> List[Participant]:
+    """Participants for a multi-party debate from "LABEL: stance" lines, one position per line"""
+    if not 2 <= len(positions) <= MAX_PARTICIPANTS:
+        raise ValueError(f"A debate needs between 2 and {MAX_PARTICIPANTS} positions, got {len(positions)}")
+    
+    participants: List[Participant] = []
+    for i, position in enumerate(positions):
+        label, _, stance = position.partition(":")
+        if not stance.strip():
+            label, stance = f"POSITION {i + 1}", position
+        participants.append({"name": f"p{i + 1}", "label": label.strip().upper(), "stance": stance.strip(), "rebuts": []})
+    
+    labels = [participant["label"] for participant in participants]
+    if len(set(labels)) != len(labels):
+        raise ValueError("Each position needs a distinct label")
+    return participants
+
+def rebuttal_order(participants: List[Participant]) -> List[Participant]:
+    """
+    Order participants so everyone comes after the participants they rebut
+    
+    A participant's "rebuts" lists the participants whose argument from the same round
+    it answers; together they must form a DAG.
+    """
+    names = {participant["name"] for participant in participants}
+    for participant in participants:
+        unknown = set(participant["rebuts"]) - names
+        if unknown:
+            raise ValueError(f"{participant['label']} rebuts unknown participants: {', '.join(sorted(unknown))}")
+    
+    ordered: List[Participant] = []
+    done: set = set()
+    remaining = list(participants)
+    while remaining:
+        ready = [participant for participant in remaining if set(participant["rebuts"]) <= done]
+        if not ready:
+            raise ValueError("Participant rebuttals form a cycle")
+        for participant in ready:
+            ordered.append(participant)
+            done.add(participant["name"])
+            remaining.remove(participant)
+    return ordered
+
+def round_arguments(round_data: DebateRound) -> Dict[str, str]:
+    """A round's arguments by participant name"""
+    if "arguments" in round_data:
+        return round_data["arguments"]
+    return {"pro": round_data.get("pro", ""), "con": round_data.get("con", "")}
+
+def current_arguments(state: State) -> Dict[str, str]:
+    """The current round's arguments by participant name, including the PRO and CON fields"""
+    arguments = dict(state.get("arguments", {}))
+    if "pro" not in arguments and state.get("pro_argument"):
+        arguments["pro"] = get_content(state["pro_argument"][-1])
+    if "con" not in arguments and state.get("con_argument"):
+        arguments["con"] = get_content(state["con_argument"][-1])
+    return arguments
+
+def set_argument(state: State, participant: Participant, content: str):
+    """Store a participant's argument for the current round"""
+    state["arguments"] = {**state.get("arguments", {}), participant["name"]: content}
+    if participant["name"] == "pro":
+        state["pro_argument"] = [{"role": "assistant", "content": content}]
+    elif participant["name"] == "con":
+        state["con_argument"] = [{"role": "assistant", "content": content}]
+
+@profiled("prompt_formatting")
 def get_debate_history(state: State) -> str:
-    """Compiles the debate history for context"""
+    """Compiles the debate history for context, shortening older rounds when the budget requires it"""
+    compact = is_degraded(state.get("budget"), "compact_history")
+    participants = get_participants(state)
+    last_round = len(state["rounds"]) - 1
     history = []
     for i, round_data in enumerate(state["rounds"]):
+        arguments = round_arguments(round_data)
         history.append(f"\nROUND {i+1}:")
-        history.append(f"PRO: {round_data['pro']}")
-        history.append(f"CON: {round_data['con']}")
+        for participant in participants:
+            argument = arguments.get(participant["name"], "")
+            if compact and i < last_round:
+                argument = argument[:COMPACT_ARGUMENT_CHARS]
+            history.append(f"{participant['label']}: {argument}")
     return "\n".join(history)
 
+def charged(node: str):
+    """Charge the API calls a bot makes to the debate budget on the state it returns"""
+    def decorator(bot):
+        @functools.wraps(bot)
+        def wrapper(state: State, *args, **kwargs) -> State:
+            with track_calls() as calls:
+                updated_state = bot(state, *args, **kwargs)
+            updated_state["budget"] = charge_budget(state.get("budget"), node, calls)
+            return updated_state
+        return wrapper
+    return decorator
+
+def model_tier(state: State) -> Optional[str]:
+    """Force the fast tier once the debate budget calls for a smaller model"""
+    return "fast" if is_degraded(state.get("budget"), "small_model") else None
+
+def checkpoint_node(state: State, node: str, round_number: int, content: str):
+    """Persist a finished node output so the debate can be resumed"""
+    if not is_failed_response(content):
+        save_node(state.get("debate_id"), node, round_number, content)
+
+def checkpoint_metrics(state: State):
+    """Persist the debate's step timings and spend so far, so the debate store keeps them with its outputs"""
+    save_node(state.get("debate_id"), "timings", 0, json.dumps(state.get("timings", {})))
+    if state.get("budget"):
+        save_node(state.get("debate_id"), "budget", 0, json.dumps(state["budget"]))
+
+def record_step(state: State, key: str, started: float, research_data: Optional[str] = None, finished: Optional[float] = None):
+    """Attach a node's wall time, and the research it used, to the state"""
+    state["timings"] = {**state.get("timings", {}), key: round((finished or time.perf_counter()) - started, 3)}
+    if research_data is not None:
+        state["research"] = {**state.get("research", {}), key: research_data}
+
+node_flight = SingleFlight(lease_db=SINGLEFLIGHT_DB, lease_seconds=SINGLEFLIGHT_LEASE_SECONDS)
+_duplicates_avoided = {"in_flight": 0, "stored": 0}
+_duplicates_lock = threading.Lock()
+
+def avoided_duplicate(node: str, reason: str):
+    """Count and log a node run skipped because the same work was in flight ("in_flight") or done ("stored")"""
+    with _duplicates_lock:
+        _duplicates_avoided[reason] += 1
+        total = sum(_duplicates_avoided.values())
+    metrics.duplicates_avoided.inc(node=node, reason=reason)
+    logging.info(f"Idempotency: reused {reason.replace('_', '-')} {node} result ({total} duplicate runs avoided in this process)")
+
+def duplicates_avoided_report() -> Dict[str, int]:
+    with _duplicates_lock:
+        return dict(_duplicates_avoided)
+
+def run_once(debate_id: Optional[str], node: str, round_number: int, work: Callable[[], Any]) -> Tuple[Any, bool]:
+    """
+    Run a node's work at most once at a time per (debate, round, node) idempotency key
+    
+    A duplicate request made while the work is in flight, in this process or (with
+    SINGLEFLIGHT_DB) another one, waits for it and shares its result. work should
+    return the stored result itself when the node has already finished. Returns the
+    result and whether it was shared.
+    """
+    if not debate_id:
+        return work(), False
+    ran = []
+    
+    def lead() -> Any:
+        ran.append(True)
+        return work()
+    
+    result = node_flight.do(f"node:{debate_id}:{round_number}:{node}", lead)
+    if not ran:
+        avoided_duplicate(node, "in_flight")
+    return result, not ran
+
+TOPIC_RESEARCH_CONTEXT = "current trends developments challenges issues recent news"
+
+@profiled("prompt_formatting")
+def topic_messages(user_input: str, research_data: str) -> List[Dict[str, str]]:
+    """Build the topic generation prompt"""
+    return [
+        {
+            "role": "system", 
+            "content": topic_bot_prompt.format(research_data=research_data)
+        },
+        {
+            "role": "user", 
+            "content": f"User Topic Request: {user_input}\n\nCreate a debate topic that incorporates the latest developments and current context from the research data."
+        }
+    ]
+
+def pro_messages(topic: str, current_round: int, history: str, research_data: str) -> List[Dict[str, str]]:
+    """Build the PRO argument prompt"""
+    return [
+        {
+            "role": "system", 
+            "content": pro_bot_prompt.format(
+                current_round=current_round,
+                history=history,
+                research_data=research_data
+            )
+        },
+        {
+            "role": "user", 
+            "content": f"Debate Topic: {topic}\n\nUse the research data provided to strengthen your PRO argument with current facts, statistics, and evidence."
+        }
+    ]
+
+def con_messages(topic: str, current_round: int, history: str, research_data: str, pro_current: str) -> List[Dict[str, str]]:
+    """Build the CON argument prompt"""
+    return [
+        {
+            "role": "system", 
+            "content": con_bot_prompt.format(
+                current_round=current_round,
+                history=history,
+                research_data=research_data
+            )
+        },
+        {
+            "role": "user", 
+            "content": f"Debate Topic: {topic}\n\nPRO's Current Argument: {pro_current}\n\nUse the research data provided to strengthen your CON argument with current facts, statistics, and counterevidence."
+        }
+    ]
+
+@profiled("prompt_formatting")
+def participant_messages(participant: Participant, participants: List[Participant], topic: str, current_round: int,
+                         history: str, research_data: str, rebuttals: Dict[str, str]) -> List[Dict[str, str]]:
+    """Build a participant's argument prompt; PRO and CON keep their own prompts"""
+    if participant["name"] == "pro":
+        return pro_messages(topic, current_round + 1, history, research_data)
+    if participant["name"] == "con":
+        return con_messages(topic, current_round, history, research_data, rebuttals.get("pro", ""))
+    
+    labels = {other["name"]: other["label"] for other in participants}
+    others = "; ".join(f"{other['label']} ({other['stance']})" for other in participants if other["name"] != participant["name"])
+    request = f"Debate Topic: {topic}"
+    for name, argument in rebuttals.items():
+        request += f"\n\n{labels[name]}'s Current Argument: {argument}"
+    return [
+        {
+            "role": "system", 
+            "content": participant_bot_prompt.format(
+                label=participant["label"],
+                stance=participant["stance"],
+                others=others,
+                current_round=current_round,
+                history=history,
+                research_data=research_data
+            )
+        },
+        {
+            "role": "user", 
+            "content": f"{request}\n\nUse the research data provided to make the strongest case for the {participant['label']} position with current facts, statistics, and evidence."
+        }
+    ]
+
+@profiled("prompt_formatting")
+def judge_messages(topic: str, history: str, verification_data: str,
+                   participants: List[Participant] = DEFAULT_PARTICIPANTS) -> List[Dict[str, str]]:
+    """Build the judgment prompt"""
+    system_prompt = judge_bot_prompt
+    if not is_two_sided(participants):
+        system_prompt += judge_participants_prompt.format(
+            count=len(participants),
+            positions="\n".join(f"- {participant['label']}: {participant['stance']}" for participant in participants),
+            example=participants[0]["label"]
+        )
+    return [
+        {
+            "role": "system", 
+            "content": system_prompt
+        },
+        {
+            "role": "user", 
+            "content": f"Debate Topic: {topic}"
+        },
+        {
+            "role": "user", 
+            "content": f"Complete Debate Transcript:\n{history}\n\nFact-Check and Verification Data:\n{verification_data}\n\nEvaluate this debate focusing on factual accuracy, evidence quality, logical reasoning, and overall argument strength. Use the verification data to assess the credibility of claims made by both sides."
+        }
+    ]
+
+def fact_check_context(state: State) -> str:
+    """Search context the judge uses to fact-check every participant's claims"""
+    claims = []
+    for participant in get_participants(state):
+        participant_claims = [round_arguments(round_data).get(participant["name"], "")[:300] for round_data in state["rounds"]]
+        claims.append(f"{participant['label']}: {' '.join(participant_claims[:200])}")
+    
+    return f"fact check verify claims evidence {' '.join(claims)}"
+
+def previous_research(state: State, side: str) -> Optional[str]:
+    """Most recent research a side used in an earlier round, as a deadline fallback"""
+    research = state.get("research", {})
+    for round_number in range(state["current_round"] - 1, 0, -1):
+        if f"{side}_{round_number}" in research:
+            return research[f"{side}_{round_number}"]
+    return None
+
+def pro_research_args(topic: str, current_round: int) -> Dict[str, str]:
+    """Search arguments for the PRO side's research in a round"""
+    return {
+        "query": topic,
+        "perspective": "PRO benefits advantages positive outcomes",
+        "context": f"round {current_round} evidence statistics success stories"
+    }
+
+def con_research_args(topic: str, current_round: int, pro_current: str) -> Dict[str, str]:
+    """Search arguments for the CON side's research in a round, aimed at the PRO argument"""
+    return {
+        "query": topic,
+        "perspective": "CON risks disadvantages negative outcomes criticism",
+        "context": f"round {current_round} counterevidence problems failures rebuttal to: {pro_current[:200]}"
+    }
+
+def participant_research_args(participant: Participant, topic: str, current_round: int, rebuttals: Dict[str, str]) -> Dict[str, str]:
+    """Search arguments for a participant's research in a round, aimed at the arguments it rebuts"""
+    if participant["name"] == "pro":
+        return pro_research_args(topic, current_round + 1)
+    if participant["name"] == "con":
+        return con_research_args(topic, current_round, rebuttals.get("pro", ""))
+    
+    context = f"round {current_round} evidence statistics case studies"
+    if rebuttals:
+        context += f" rebuttal to: {' '.join(argument[:200] for argument in rebuttals.values())}"
+    return {
+        "query": topic,
+        "perspective": f"{participant['label']} {participant['stance']}",
+        "context": context
+    }
+
+def research_participant(participant: Participant, topic: str, current_round: int, rebuttals: Dict[str, str],
+                         fallback: Optional[str] = None) -> str:
+    """Run a participant's web research for a round"""
+    return openai_web_search(**participant_research_args(participant, topic, current_round, rebuttals), fallback=fallback)
+
+def participant_node(participant: Participant) -> str:
+    """Pipeline node whose model settings a participant uses"""
+    return participant["name"] if participant["name"] in ("pro", "con") else "participant"
+
+def write_argument(state: State, participant: Participant, rebuttals: Dict[str, str],
+                   research_data: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Research and write one participant's argument for the current round, returning (argument, research)
+    
+    Raises RuntimeError when the research or the argument is a failure fallback, so
+    no argument is written from, or checkpointed as, an error message.
+    """
+    with span(f"argument:{participant['name']}"):
+        topic = get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
+        current_round = state["current_round"]
+        history = get_debate_history(state)
+        
+        if research_data is None:
+            research_data = research_participant(
+                participant, topic, current_round, rebuttals, fallback=previous_research(state, participant["name"])
+            )
+        if is_failed_research(research_data):
+            raise RuntimeError(research_data)
+        research_data = trim_research(state.get("budget"), research_data)
+        
+        messages = participant_messages(participant, get_participants(state), topic, current_round, history, research_data, rebuttals)
+        
+        argument = get_simple_llm_response(messages, node=participant_node(participant), tier=model_tier(state))
+        if is_failed_response(argument):
+            raise RuntimeError(argument)
+        return argument, research_data
+
+@profiled("topic")
+@charged("topic")
 def topic_generation_bot(state: State) -> State:
     """Generate debate topic with OpenAI web search integration"""
     try:
+        started = time.perf_counter()
         user_input = get_content(state["prompt"][-1]) if state["prompt"] else "General debate topic"
         
         research_data = openai_web_search(
             query=user_input,
-            context="current trends developments challenges issues recent news"
+            context=TOPIC_RESEARCH_CONTEXT
         )
         
-        messages = [
-            {
-                "role": "system", 
-                "content": topic_bot_prompt.format(research_data=research_data)
-            },
-            {
-                "role": "user", 
-                "content": f"User Topic Request: {user_input}\n\nCreate a debate topic that incorporates the latest developments and current context from the research data."
-            }
-        ]
+        messages = topic_messages(user_input, research_data)
         
-        response_content = get_simple_llm_response(messages)
+        response_content = get_simple_llm_response(messages, node="topic", tier=model_tier(state))
         
         updated_state = cast(State, state.copy())
         updated_state["topic"] = [{"role": "assistant", "content": response_content}]
+        checkpoint_node(updated_state, "topic", 0, response_content)
+        record_step(updated_state, "topic", started, research_data)
         updated_state["processing_state"] = "topic_ready"
         
         return updated_state
@@ -76,145 +474,171 @@ def topic_generation_bot(state: State) -> State:
         updated_state["processing_state"] = "error"
         return updated_state
 
-def pro_debater_bot(state: State) -> State:
-    """Generate PRO argument with OpenAI web search integration"""
+def debater_bot(state: State, participant: Participant, research_data: Optional[str] = None) -> State:
+    """Generate one participant's argument with OpenAI web search integration"""
     try:
-        topic = get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
-        current_round = state["current_round"] + 1
-        history = get_debate_history(state)
-        
-        research_data = openai_web_search(
-            query=topic,
-            perspective="PRO benefits advantages positive outcomes",
-            context=f"round {current_round} evidence statistics success stories"
-        )
-        
-        messages = [
-            {
-                "role": "system", 
-                "content": pro_bot_prompt.format(
-                    current_round=current_round,
-                    history=history,
-                    research_data=research_data
-                )
-            },
-            {
-                "role": "user", 
-                "content": f"Debate Topic: {topic}\n\nUse the research data provided to strengthen your PRO argument with current facts, statistics, and evidence."
-            }
-        ]
+        started = time.perf_counter()
+        arguments = current_arguments(state)
+        rebuttals = {name: arguments.get(name, "") for name in participant["rebuts"]}
         
-        response_content = get_simple_llm_response(messages)
+        response_content, research_data = write_argument(state, participant, rebuttals, research_data)
         
         updated_state = cast(State, state.copy())
-        updated_state["pro_argument"] = [{"role": "assistant", "content": response_content}]
-        updated_state["processing_state"] = "pro_ready"
+        set_argument(updated_state, participant, response_content)
+        checkpoint_node(updated_state, participant["name"], state["current_round"], response_content)
+        record_step(updated_state, f"{participant['name']}_{state['current_round']}", started, research_data)
+        updated_state["processing_state"] = f"{participant['name']}_ready"
         
         return updated_state
         
     except Exception as e:
-        logging.error(f"PRO argument generation error: {str(e)}")
+        logging.error(f"{participant['label']} argument generation error: {str(e)}")
         updated_state = cast(State, state.copy())
-        updated_state["pro_argument"] = [{"role": "assistant", "content": f"Error generating PRO argument: {str(e)}"}]
+        set_argument(updated_state, participant, f"Error generating {participant['label']} argument: {str(e)}")
         updated_state["processing_state"] = "error"
         return updated_state
 
-def con_debater_bot(state: State) -> State:
+@charged("pro")
+def pro_debater_bot(state: State, research_data: Optional[str] = None) -> State:
+    """Generate PRO argument with OpenAI web search integration"""
+    return debater_bot(state, DEFAULT_PARTICIPANTS[0], research_data)
+
+@charged("con")
+def con_debater_bot(state: State, research_data: Optional[str] = None) -> State:
     """Generate CON argument with OpenAI web search integration"""
-    try:
-        topic = get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
-        current_round = state["current_round"]
-        history = get_debate_history(state)
-        
-        pro_current = ""
-        if state.get("pro_argument") and len(state["pro_argument"]) > 0:
-            pro_current = get_content(state["pro_argument"][-1])
-        
-        research_data = openai_web_search(
-            query=topic,
-            perspective="CON risks disadvantages negative outcomes criticism",
-            context=f"round {current_round} counterevidence problems failures rebuttal to: {pro_current[:200]}"
+    return debater_bot(state, DEFAULT_PARTICIPANTS[1], research_data)
+
+def parse_winner(response_content: str, labels: Sequence[str] = ("PRO", "CON")) -> str:
+    """Read the declared winner from a judgment, falling back to keyword counts"""
+    for label in sorted(labels, key=len, reverse=True):
+        if f"WINNER: {label}" in response_content.upper():
+            return label
+    if list(labels) != ["PRO", "CON"]:
+        mentions = {label: response_content.upper().count(label) for label in labels}
+        return max(labels, key=lambda label: mentions[label])
+    pro_indicators = response_content.upper().count("PRO") + response_content.upper().count("STRONGER") if "PRO" in response_content.upper() else 0
+    con_indicators = response_content.upper().count("CON") + response_content.upper().count("STRONGER") if "CON" in response_content.upper() else 0
+    return "CON" if con_indicators > pro_indicators else "PRO"
+
+def run_judge_panel(messages: List[Dict[str, str]], panel: List[Dict[str, Any]], forced_tier: Optional[str] = None,
+                    labels: Sequence[str] = ("PRO", "CON")) -> Dict[str, Any]:
+    """
+    Run a panel of judges concurrently on the same messages and decide by majority
+    
+    At most a majority of the panel runs at once, and the next judge starts only when
+    one finishes. As soon as one participant has more than half of the panel's votes,
+    judges that have not started are cancelled, so a panel that agrees from the start
+    makes only a majority of its calls. Judges already running are waited for, so
+    their calls are charged to the debate, and their verdicts are counted.
+    """
+    def judge(member: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        member_messages = [dict(message) for message in messages]
+        member_messages[0]["content"] += judge_focus_prompts.get(member["focus"], "")
+        content = get_simple_llm_response(
+            member_messages, node="judge", tier=forced_tier or member["tier"], temperature=member["temperature"]
         )
+        return {
+            "judge": member["name"],
+            "tier": forced_tier or member["tier"],
+            "focus": member["focus"],
+            "winner": None if is_failed_response(content) else parse_winner(content, labels),
+            "seconds": round(time.perf_counter() - started, 3),
+            "content": content
+        }
+    
+    majority = len(panel) // 2 + 1
+    votes = {label: 0 for label in labels}
+    verdicts: List[Dict[str, Any]] = []
+    waiting = iter(panel)
+    
+    def count(future: Any):
+        verdict = future.result()
+        verdicts.append(verdict)
+        if verdict["winner"]:
+            votes[verdict["winner"]] += 1
+    
+    with ThreadPoolExecutor(max_workers=majority, thread_name_prefix="judge_panel") as executor:
+        running = {executor.submit(copy_context().run, judge, member) for member in islice(waiting, majority)}
+        while running:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                count(future)
+            if max(votes.values()) >= majority:
+                break
+            running |= {executor.submit(copy_context().run, judge, member) for member in islice(waiting, len(finished))}
         
-        messages = [
-            {
-                "role": "system", 
-                "content": con_bot_prompt.format(
-                    current_round=current_round,
-                    history=history,
-                    research_data=research_data
-                )
-            },
-            {
-                "role": "user", 
-                "content": f"Debate Topic: {topic}\n\nPRO's Current Argument: {pro_current}\n\nUse the research data provided to strengthen your CON argument with current facts, statistics, and counterevidence."
-            }
-        ]
-        
-        response_content = get_simple_llm_response(messages)
-        
-        updated_state = cast(State, state.copy())
-        updated_state["con_argument"] = [{"role": "assistant", "content": response_content}]
-        updated_state["processing_state"] = "con_ready"
-        
-        return updated_state
-        
-    except Exception as e:
-        logging.error(f"CON argument generation error: {str(e)}")
-        updated_state = cast(State, state.copy())
-        updated_state["con_argument"] = [{"role": "assistant", "content": f"Error generating CON argument: {str(e)}"}]
-        updated_state["processing_state"] = "error"
-        return updated_state
+        # Judges already running when the majority was reached finish, so their calls are charged
+        for future in running:
+            count(future)
+    
+    decided = [verdict for verdict in verdicts if verdict["winner"]]
+    if not decided:
+        raise RuntimeError("No judge on the panel returned a verdict")
+    
+    # Ties go to the verdict of the highest-ranked judge; that judge's text is also the one shown
+    order = [member["name"] for member in panel]
+    decided.sort(key=lambda verdict: order.index(verdict["judge"]))
+    leaders = [label for label, count in votes.items() if count == max(votes.values())]
+    if len(leaders) == 1:
+        winner = leaders[0]
+    else:
+        winner = next(verdict["winner"] for verdict in decided if verdict["winner"] in leaders)
+    lead = next(verdict for verdict in decided if verdict["winner"] == winner)
+    early_exit = len(verdicts) < len(panel)
+    if early_exit:
+        logging.info(f"Judge panel reached a {winner} majority after {len(verdicts)} of {len(panel)} judges; the rest were not run")
+    
+    return {
+        "judgment": lead["content"],
+        "winner": winner,
+        "votes": votes,
+        "verdicts": verdicts,
+        "panel_size": len(panel),
+        "agreement": round(votes[winner] / len(decided), 3),
+        "unanimous": votes[winner] == len(decided),
+        "early_exit": early_exit,
+        "skipped": len(panel) - len(verdicts)
+    }
 
+@profiled("judge")
+@charged("judge")
 def judge_bot(state: State) -> State:
     """Generate final judgment with fact-checking via OpenAI web search"""
     try:
+        started = time.perf_counter()
         topic = get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
         history = get_debate_history(state)
         
-        pro_claims = []
-        con_claims = []
-        
-        for round_data in state["rounds"]:
-            pro_claims.append(round_data["pro"][:300])  
-            con_claims.append(round_data["con"][:300])
-        
-        verification_data = openai_web_search(
-            query=topic,
-            context=f"fact check verify claims evidence PRO: {' '.join(pro_claims[:200])} CON: {' '.join(con_claims[:200])}"
-        )
-        
-        messages = [
-            {
-                "role": "system", 
-                "content": judge_bot_prompt
-            },
-            {
-                "role": "user", 
-                "content": f"Debate Topic: {topic}"
-            },
-            {
-                "role": "user", 
-                "content": f"Complete Debate Transcript:\n{history}\n\nFact-Check and Verification Data:\n{verification_data}\n\nEvaluate this debate focusing on factual accuracy, evidence quality, logical reasoning, and overall argument strength. Use the verification data to assess the credibility of claims made by both sides."
-            }
-        ]
+        if is_degraded(state.get("budget"), "skip_fact_check"):
+            verification_data = "Fact-check search skipped to stay within the debate budget. Judge the claims on the evidence cited in the transcript."
+        else:
+            verification_data = openai_web_search(
+                query=topic,
+                context=fact_check_context(state),
+                node="fact_check"
+            )
+            verification_data = trim_research(state.get("budget"), verification_data)
         
-        response_content = get_simple_llm_response(messages)
+        participants = get_participants(state)
+        labels = [participant["label"] for participant in participants]
+        messages = judge_messages(topic, history, verification_data, participants)
         
-        winner = None
-        if "WINNER: PRO" in response_content.upper():
-            winner = "PRO"
-        elif "WINNER: CON" in response_content.upper():
-            winner = "CON"
+        updated_state = cast(State, state.copy())
+        if JUDGE_PANEL_SIZE > 1:
+            panel = run_judge_panel(messages, JUDGE_PANEL[:JUDGE_PANEL_SIZE], model_tier(state), labels)
+            response_content, winner = panel.pop("judgment"), panel["winner"]
+            updated_state["judge_panel"] = panel
         else:
-            pro_indicators = response_content.upper().count("PRO") + response_content.upper().count("STRONGER") if "PRO" in response_content.upper() else 0
-            con_indicators = response_content.upper().count("CON") + response_content.upper().count("STRONGER") if "CON" in response_content.upper() else 0
-            winner = "CON" if con_indicators > pro_indicators else "PRO"
+            response_content = get_simple_llm_response(messages, node="judge", tier=model_tier(state))
+            winner = parse_winner(response_content, labels)
         
-        updated_state = cast(State, state.copy())
         updated_state["judge"] = [{"role": "assistant", "content": response_content}]
         updated_state["winner"] = winner
         updated_state["processing_state"] = "judgment_complete"
+        checkpoint_node(updated_state, "winner", 0, winner)
+        checkpoint_node(updated_state, "judge", 0, response_content)
+        record_step(updated_state, "judge", started, verification_data)
         
         return updated_state
         
@@ -227,17 +651,20 @@ def judge_bot(state: State) -> State:
         return updated_state
     
 def update_rounds(state: State) -> State:
-    """Update rounds after both sides have spoken"""
+    """Update rounds after every participant has spoken"""
     try:
-        pro_arg = state.get("pro_argument", [])
-        con_arg = state.get("con_argument", [])
+        arguments = current_arguments(state)
+        participants = get_participants(state)
         
-        if pro_arg and con_arg and len(pro_arg) > 0 and len(con_arg) > 0:
+        if all(arguments.get(participant["name"]) for participant in participants):
             new_round: DebateRound = {
-                "pro": get_content(pro_arg[-1]),
-                "con": get_content(con_arg[-1]),
+                "arguments": {participant["name"]: arguments[participant["name"]] for participant in participants},
                 "round_number": state["current_round"]
             }
+            if "pro" in new_round["arguments"]:
+                new_round["pro"] = new_round["arguments"]["pro"]
+            if "con" in new_round["arguments"]:
+                new_round["con"] = new_round["arguments"]["con"]
             
             updated_state = cast(State, state.copy())
             updated_state["rounds"] = state["rounds"].copy()
@@ -282,9 +709,29 @@ def build_debate_flow():
     
     return builder.compile()
 
-def generate_topic_only(prompt: str) -> State:
+def generate_topic_only(prompt: str, debate_id: Optional[str] = None, participants: Optional[List[Participant]] = None) -> State:
     """Generate only the topic"""
+    def generate() -> State:
+        if debate_id and load_node(debate_id, "topic"):
+            avoided_duplicate("topic", "stored")
+            return cast(State, load_debate(debate_id))
+        prewarmed = None if participants else get_prewarmed_topic(normalize_query(prompt))
+        if prewarmed:
+            logging.info("Starting debate from a prewarmed topic")
+            input_state = new_debate_state(prompt, debate_id, None)
+            input_state["topic"] = [{"role": "assistant", "content": prewarmed["topic"]}]
+            input_state["processing_state"] = "topic_ready"
+            checkpoint_node(input_state, "topic", 0, prewarmed["topic"])
+            return input_state
+        return topic_generation_bot(new_debate_state(prompt, debate_id, participants))
+    
+    topic_state, _ = run_once(debate_id, "topic", 0, generate)
+    return cast(State, topic_state.copy())
+
+def new_debate_state(prompt: str, debate_id: Optional[str], participants: Optional[List[Participant]]) -> State:
+    """A debate's initial state, saving its prompt and participants"""
     input_state: State = {
+        "debate_id": debate_id,
         "topic": [],
         "rounds": [],
         "judge": [],
@@ -294,26 +741,197 @@ def generate_topic_only(prompt: str) -> State:
         "pro_argument": [],
         "con_argument": [],
         "processing_state": "generating_topic",
-        "ready_for_next_round": False
+        "ready_for_next_round": False,
+        "budget": new_budget(),
+        "created_at": time.time()
     }
+    if participants:
+        rebuttal_order(participants)
+        input_state["participants"] = participants
+        save_node(debate_id, "participants", 0, json.dumps(participants))
     
-    return topic_generation_bot(input_state)
+    save_node(debate_id, "prompt", 0, prompt)
+    return input_state
 
-def generate_round_arguments(state: State) -> State:
-    """Generate PRO and CON arguments for current round"""
+@profiled("prefetch_round")
+def prefetch_round(state: State, include_pro: bool = False) -> Dict[str, Any]:
+    """
+    Speculatively run the next round's research for the opening participants
+    
+    Opening participants are those who rebut no one in the same round (PRO in a
+    two-sided debate). With include_pro, their arguments are written too, along
+    with the research of participants who only rebut them.
+    """
+    next_state = cast(State, state.copy())
+    next_state["current_round"] += 1
+    topic = get_content(next_state["topic"][-1]) if next_state["topic"] else "Unknown topic"
+    participants = get_participants(next_state)
+    openers = [participant for participant in participants if not participant["rebuts"]]
+    
+    def open_round(participant: Participant) -> Tuple[str, Optional[str]]:
+        research_data = research_participant(participant, topic, next_state["current_round"], {})
+        if not include_pro:
+            return research_data, None
+        try:
+            return research_data, write_argument(next_state, participant, {}, research_data)[0]
+        except Exception as e:
+            logging.error(f"Speculative {participant['label']} argument error: {str(e)}")
+            return research_data, None
+    
+    with track_calls() as calls:
+        prefetched: Dict[str, Any] = {
+            "round": next_state["current_round"],
+            "topic": topic,
+            "research": {},
+            "arguments": {}
+        }
+        with ThreadPoolExecutor(max_workers=len(participants), thread_name_prefix="prefetch_round") as executor:
+            futures = {participant["name"]: executor.submit(copy_context().run, open_round, participant) for participant in openers}
+            for name, future in futures.items():
+                prefetched["research"][name], argument = future.result()
+                if argument and not is_failed_response(argument):
+                    prefetched["arguments"][name] = argument
+            
+            if include_pro:
+                answering = [
+                    participant for participant in participants
+                    if participant["rebuts"] and set(participant["rebuts"]) <= set(prefetched["arguments"])
+                ]
+                futures = {
+                    participant["name"]: executor.submit(
+                        copy_context().run, research_participant, participant, topic, next_state["current_round"],
+                        {name: prefetched["arguments"][name] for name in participant["rebuts"]}
+                    )
+                    for participant in answering
+                }
+                for name, future in futures.items():
+                    prefetched["research"][name] = future.result()
+    
+    prefetched["calls"] = calls
+    return prefetched
+
+def prewarmed_round(state: State) -> Optional[Dict[str, Any]]:
+    """First-round research the prewarm job prepared for this debate's prompt, already paid for"""
+    if state.get("participants") or not state["prompt"]:
+        return None
+    prewarmed = get_prewarmed_topic(normalize_query(get_content(state["prompt"][-1])))
+    if prewarmed is None:
+        return None
+    logging.info("Using prewarmed first-round research")
+    return {**prewarmed["prefetched"], "calls": []}
+
+def run_round_participants(state: State, participants: List[Participant], stored: Dict[str, Optional[str]],
+                           prefetched: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Research and write every participant's argument for the current round concurrently
+    
+    Each participant starts as soon as the participants it rebuts have finished, so a
+    round without same-round rebuttals takes about as long as its slowest participant.
+    Stored checkpoints and prefetched arguments are reused instead of regenerated.
+    """
+    relay, drain = research_relay()
+    futures: Dict[str, Any] = {}
+    
+    def argue(participant: Participant) -> Dict[str, Any]:
+        rebutted = {name: futures[name].result() for name in participant["rebuts"]}
+        name = participant["name"]
+        failed = [rebutted_name for rebutted_name, result in rebutted.items() if result.get("error") is not None]
+        if failed:
+            # Nothing to rebut, so no call is made for an argument that would be redone anyway
+            error = f"rebutted argument failed: {', '.join(failed)}"
+            return {"content": f"Skipped {participant['label']} argument: {error}", "source": "skipped", "calls": [], "error": error}
+        rebuttals = {rebutted_name: result["content"] for rebutted_name, result in rebutted.items()}
+        if stored.get(name):
+            return {"content": stored[name], "source": "stored", "calls": []}
+        if name in prefetched.get("arguments", {}):
+            return {"content": prefetched["arguments"][name], "source": "prefetched", "calls": []}
+        
+        def generate() -> Dict[str, Any]:
+            checkpoint = load_node(state.get("debate_id"), name, state["current_round"])
+            if checkpoint:
+                return {"content": checkpoint, "source": "stored", "calls": []}
+            started = time.perf_counter()
+            research_data, error = None, None
+            with research_progress(relay), track_calls() as calls:
+                try:
+                    content, research_data = write_argument(state, participant, rebuttals, prefetched.get("research", {}).get(name))
+                except Exception as e:
+                    logging.error(f"{participant['label']} argument generation error: {str(e)}")
+                    content, error = f"Error generating {participant['label']} argument: {str(e)}", str(e)
+            return {
+                "content": content,
+                "source": "generated",
+                "research": research_data,
+                "started": started,
+                "finished": time.perf_counter(),
+                "calls": calls,
+                "error": error
+            }
+        
+        result, shared = run_once(state.get("debate_id"), name, state["current_round"], generate)
+        return {**result, "source": "shared"} if shared else result
+    
+    with ThreadPoolExecutor(max_workers=len(participants), thread_name_prefix="round_participants") as executor:
+        for participant in rebuttal_order(participants):
+            futures[participant["name"]] = executor.submit(copy_context().run, argue, participant)
+        pending = set(futures.values())
+        while pending:
+            _, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            drain()
+    
+    return {name: future.result() for name, future in futures.items()}
+
+@profiled("round")
+def generate_round_arguments(state: State, prefetched: Optional[Dict[str, Any]] = None) -> State:
+    """Generate every participant's argument for the current round"""
     try:
         updated_state = cast(State, state.copy())
         updated_state["current_round"] += 1
         updated_state["processing_state"] = "generating_arguments"
+        updated_state["arguments"] = {}
         
-        updated_state = pro_debater_bot(updated_state)
-        updated_state["processing_state"] = "pro_complete"
+        topic = get_content(updated_state["topic"][-1]) if updated_state["topic"] else "Unknown topic"
+        if not prefetched and updated_state["current_round"] == 1:
+            prefetched = prewarmed_round(updated_state)
+        if prefetched and prefetched.get("calls"):
+            updated_state["budget"] = charge_budget(updated_state.get("budget"), "speculative", prefetched["calls"])
+        if prefetched and (prefetched.get("round") != updated_state["current_round"] or prefetched.get("topic") != topic):
+            logging.info("Discarding stale prefetched round")
+            prefetched = None
+        prefetched = prefetched or {}
         
+        round_number = updated_state["current_round"]
+        participants = get_participants(updated_state)
+        stored = {participant["name"]: load_node(updated_state.get("debate_id"), participant["name"], round_number) for participant in participants}
+        results = run_round_participants(updated_state, participants, stored, prefetched)
         
-        updated_state = con_debater_bot(updated_state)
-        updated_state["processing_state"] = "con_complete"
+        failed: List[str] = []
+        for participant in rebuttal_order(participants):
+            result = results[participant["name"]]
+            set_argument(updated_state, participant, result["content"])
+            if result["source"] in ("shared", "generated"):
+                updated_state["budget"] = charge_budget(updated_state.get("budget"), participant["name"], result["calls"])
+            if result.get("error") is not None or set(participant["rebuts"]) & set(failed):
+                # An argument written against a failed one is redone with it rather than checkpointed
+                failed.append(participant["name"])
+                continue
+            if result["source"] == "stored":
+                logging.info(f"Resuming round {round_number} from stored {participant['label']} argument")
+                avoided_duplicate(participant["name"], "stored")
+                continue
+            if result["source"] == "shared":
+                continue
+            if result["source"] == "generated":
+                record_step(updated_state, f"{participant['name']}_{round_number}", result["started"], result["research"], result["finished"])
+            checkpoint_node(updated_state, participant["name"], round_number, result["content"])
         
+        if failed:
+            updated_state["failed_participants"] = failed
+            updated_state["processing_state"] = "error"
+            return updated_state
         
+        updated_state.pop("failed_participants", None)
+        updated_state["processing_state"] = "arguments_complete"
         updated_state = update_rounds(updated_state)
         
         return updated_state
@@ -324,11 +942,129 @@ def generate_round_arguments(state: State) -> State:
         updated_state["processing_state"] = "error"
         return updated_state
 
+def rebutting_participants(participants: List[Participant], names: List[str]) -> List[str]:
+    """names plus every participant who rebuts one of them in the same round, directly or through another"""
+    affected = list(names)
+    for participant in rebuttal_order(participants):
+        if participant["name"] not in affected and set(participant["rebuts"]) & set(affected):
+            affected.append(participant["name"])
+    return affected
+
+def before_failed_round(failed_state: State) -> State:
+    """The debate as it was before the round failed_state stopped at, keeping that round's spend"""
+    state = cast(State, failed_state.copy())
+    state.pop("failed_participants", None)
+    state["current_round"] -= 1
+    state["processing_state"] = "round_complete" if state["rounds"] else "topic_ready"
+    return state
+
+def retry_failed_round(failed_state: State) -> State:
+    """
+    Regenerate only the arguments that failed in the round failed_state stopped at
+    
+    failed_state is the error state generate_round_arguments returned. Arguments that
+    succeeded are reused with their research, as if prefetched, so their calls are not
+    repeated or charged again.
+    """
+    failed = failed_state.get("failed_participants")
+    if not failed:
+        raise ValueError("The state has no failed round to retry")
+    round_number = failed_state["current_round"]
+    research = failed_state.get("research", {})
+    kept = {name: argument for name, argument in failed_state.get("arguments", {}).items() if name not in failed}
+    
+    state = before_failed_round(failed_state)
+    logging.info(f"Retrying round {round_number} for {', '.join(failed)}, keeping {', '.join(kept) or 'nothing'}")
+    return generate_round_arguments(state, {
+        "round": round_number,
+        "topic": get_content(state["topic"][-1]) if state["topic"] else "Unknown topic",
+        "arguments": kept,
+        "research": {name: research[f"{name}_{round_number}"] for name in kept if f"{name}_{round_number}" in research},
+        "calls": []
+    })
+
+def regenerate_argument(state: State, name: str, round_number: int) -> State:
+    """
+    Regenerate one argument of a finished round and only the steps that depend on it
+    
+    Those are the same-round arguments that rebut it, every argument of later rounds
+    and the judgment, if the debate was judged. Later-round research of participants
+    who rebut no one depends only on the topic and round, so it is reused.
+    """
+    participants = get_participants(state)
+    if name not in [participant["name"] for participant in participants]:
+        raise ValueError(f"Unknown participant {name}")
+    if not 1 <= round_number <= len(state["rounds"]):
+        raise ValueError(f"Round {round_number} has not been played")
+    
+    debate_id = state.get("debate_id")
+    redo = rebutting_participants(participants, [name])
+    last_round = len(state["rounds"])
+    judged = bool(state["judge"])
+    for participant in participants:
+        if participant["name"] in redo:
+            delete_node(debate_id, participant["name"], round_number)
+        for later_round in range(round_number + 1, last_round + 1):
+            delete_node(debate_id, participant["name"], later_round)
+    delete_node(debate_id, "judge")
+    delete_node(debate_id, "winner")
+    
+    topic = get_content(state["topic"][-1]) if state["topic"] else "Unknown topic"
+    research = state.get("research", {})
+    kept = {key: argument for key, argument in round_arguments(state["rounds"][round_number - 1]).items() if key not in redo}
+    logging.info(f"Regenerating {', '.join(redo)} in round {round_number}, then rounds {round_number + 1}-{last_round}")
+    
+    updated_state = cast(State, state.copy())
+    updated_state["rounds"] = state["rounds"][:round_number - 1]
+    updated_state["current_round"] = round_number - 1
+    updated_state["judge"] = []
+    updated_state["winner"] = None
+    updated_state.pop("judge_panel", None)
+    with fresh_completions():
+        updated_state = generate_round_arguments(updated_state, {
+            "round": round_number,
+            "topic": topic,
+            "arguments": kept,
+            "research": {key: research[f"{key}_{round_number}"] for key in kept if f"{key}_{round_number}" in research},
+            "calls": []
+        })
+    
+    for later_round in range(round_number + 1, last_round + 1):
+        if updated_state["processing_state"] == "error":
+            return updated_state
+        updated_state = generate_round_arguments(updated_state, {
+            "round": later_round,
+            "topic": topic,
+            "arguments": {},
+            "research": {
+                participant["name"]: research[f"{participant['name']}_{later_round}"]
+                for participant in participants
+                if not participant["rebuts"] and f"{participant['name']}_{later_round}" in research
+            },
+            "calls": []
+        })
+    
+    if judged and updated_state["processing_state"] != "error":
+        updated_state = generate_final_judgment(updated_state)
+    return updated_state
+
 def generate_final_judgment(state: State) -> State:
     """Generate final judgment"""
-    updated_state = cast(State, state.copy())
-    updated_state["processing_state"] = "generating_judgment"
-    return judge_bot(updated_state)
+    def generate() -> State:
+        updated_state = cast(State, state.copy())
+        stored_judge = load_node(state.get("debate_id"), "judge")
+        if stored_judge:
+            avoided_duplicate("judge", "stored")
+            updated_state["judge"] = [{"role": "assistant", "content": stored_judge}]
+            updated_state["winner"] = load_node(state.get("debate_id"), "winner")
+            updated_state["processing_state"] = "judgment_complete"
+            return updated_state
+        
+        updated_state["processing_state"] = "generating_judgment"
+        return judge_bot(updated_state)
+    
+    judged_state, _ = run_once(state.get("debate_id"), "judge", 0, generate)
+    return cast(State, judged_state.copy())
 
 
 debate_flow = build_debate_flow()
\ No newline at end of file
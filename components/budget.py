@@ -0,0 +1,93 @@
+import logging
+from typing import Dict, Any, List, Optional
+from config.index import (
+    DEBATE_TOKEN_BUDGET,
+    DEBATE_COST_BUDGET,
+    BUDGET_DEGRADATION_STEPS,
+    BUDGET_TRIMMED_RESEARCH_CHARS
+)
+
+
+def new_budget(token_limit: int = DEBATE_TOKEN_BUDGET, cost_limit: float = DEBATE_COST_BUDGET) -> Dict[str, Any]:
+    """Create an empty spend record for one debate"""
+    return {
+        "token_limit": token_limit,
+        "cost_limit": cost_limit,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "web_search_calls": 0,
+        "research_tokens": 0,
+        "cost": 0.0,
+        "nodes": {},
+        "degradations": [],
+    }
+
+
+def budget_fraction(budget: Optional[Dict[str, Any]]) -> float:
+    """Return how much of the tightest configured limit has been spent (0 when unlimited)"""
+    if not budget:
+        return 0.0
+    fractions = [0.0]
+    if budget["token_limit"] > 0:
+        fractions.append((budget["prompt_tokens"] + budget["completion_tokens"]) / budget["token_limit"])
+    if budget["cost_limit"] > 0:
+        fractions.append(budget["cost"] / budget["cost_limit"])
+    return max(fractions)
+
+
+def charge_budget(budget: Optional[Dict[str, Any]], node: str, calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return a copy of the budget with a node's API calls added and degradation steps updated"""
+    updated = dict(budget) if budget else new_budget()
+    updated["nodes"] = {name: dict(spend) for name, spend in updated["nodes"].items()}
+    node_spend = updated["nodes"].setdefault(node, {
+        "prompt_tokens": 0, "completion_tokens": 0, "web_search_calls": 0, "research_tokens": 0, "cost": 0.0
+    })
+    for call in calls:
+        for field in ("prompt_tokens", "completion_tokens", "web_search_calls", "cost"):
+            updated[field] += call[field]
+            node_spend[field] += call[field]
+        # Tokens spent on web research, for the research share in analytics exports
+        if call["web_search_calls"]:
+            research_tokens = call["prompt_tokens"] + call["completion_tokens"]
+            updated["research_tokens"] = updated.get("research_tokens", 0) + research_tokens
+            node_spend["research_tokens"] = node_spend.get("research_tokens", 0) + research_tokens
+    
+    fraction = budget_fraction(updated)
+    degradations = [step for threshold, step in BUDGET_DEGRADATION_STEPS if fraction >= threshold]
+    for step in degradations:
+        if step not in updated["degradations"]:
+            logging.info(f"Debate budget at {fraction:.0%}: enabling {step}")
+    updated["degradations"] = degradations
+    return updated
+
+
+def is_degraded(budget: Optional[Dict[str, Any]], step: str) -> bool:
+    """Check whether a degradation step is active for this debate"""
+    return bool(budget) and step in budget["degradations"]
+
+
+def trim_research(budget: Optional[Dict[str, Any]], research_data: str) -> str:
+    """Shorten injected research once the debate is trimming research"""
+    if is_degraded(budget, "trim_research") and len(research_data) > BUDGET_TRIMMED_RESEARCH_CHARS:
+        return research_data[:BUDGET_TRIMMED_RESEARCH_CHARS] + "\n[Research trimmed to stay within the debate budget]"
+    return research_data
+
+
+def budget_summary(budget: Optional[Dict[str, Any]]) -> str:
+    """One-line description of spend against the limits"""
+    if not budget:
+        return "no spend recorded"
+    tokens = budget["prompt_tokens"] + budget["completion_tokens"]
+    limits = []
+    if budget["token_limit"] > 0:
+        limits.append(f"{tokens:,}/{budget['token_limit']:,} tokens")
+    else:
+        limits.append(f"{tokens:,} tokens")
+    if budget["cost_limit"] > 0:
+        limits.append(f"${budget['cost']:.4f}/${budget['cost_limit']:.2f}")
+    else:
+        limits.append(f"${budget['cost']:.4f}")
+    limits.append(f"{budget['web_search_calls']} searches")
+    if budget["degradations"]:
+        limits.append("degraded: " + ", ".join(budget["degradations"]))
+    return ", ".join(limits)
@@ -0,0 +1,118 @@
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from components.shared_store import get_connection
+from config.index import PERSIST_DEBATES
+
+
+def save_node(debate_id: Optional[str], node: str, round_number: int, content: str):
+    """Persist the finished output of one node (prompt, participants, topic, pro, con or another participant, judge, winner, timings, budget)"""
+    if not debate_id or not PERSIST_DEBATES:
+        return
+    try:
+        get_connection().execute(
+            "INSERT OR REPLACE INTO debate_nodes (debate_id, node, round_number, content, created_at) VALUES (?, ?, ?, ?, ?)",
+            (debate_id, node, round_number, content, time.time())
+        )
+    except sqlite3.Error as e:
+        logging.error(f"Debate checkpoint error: {str(e)}")
+
+
+def load_node(debate_id: Optional[str], node: str, round_number: int = 0) -> Optional[str]:
+    """Return a persisted node output, if this debate already finished that node"""
+    if not debate_id or not PERSIST_DEBATES:
+        return None
+    try:
+        row = get_connection().execute(
+            "SELECT content FROM debate_nodes WHERE debate_id = ? AND node = ? AND round_number = ?",
+            (debate_id, node, round_number)
+        ).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        logging.error(f"Debate checkpoint read error: {str(e)}")
+        return None
+
+
+def delete_node(debate_id: Optional[str], node: str, round_number: int = 0):
+    """Forget a persisted node output so it is recomputed"""
+    if not debate_id or not PERSIST_DEBATES:
+        return
+    get_connection().execute(
+        "DELETE FROM debate_nodes WHERE debate_id = ? AND node = ? AND round_number = ?",
+        (debate_id, node, round_number)
+    )
+
+
+def list_debates(since: float = 0.0) -> List[Tuple[str, float]]:
+    """(debate_id, started_at) for every persisted debate started at or after since"""
+    if not PERSIST_DEBATES:
+        return []
+    return get_connection().execute(
+        "SELECT debate_id, MIN(created_at) FROM debate_nodes GROUP BY debate_id HAVING MIN(created_at) >= ? ORDER BY 2",
+        (since,)
+    ).fetchall()
+
+
+def load_debate(debate_id: str) -> Optional[Dict[str, Any]]:
+    """Rebuild a State from persisted node outputs without any API calls"""
+    if not PERSIST_DEBATES:
+        return None
+    rows = get_connection().execute(
+        "SELECT node, round_number, content FROM debate_nodes WHERE debate_id = ? ORDER BY round_number",
+        (debate_id,)
+    ).fetchall()
+    if not rows:
+        return None
+    
+    nodes: Dict[tuple, str] = {(node, round_number): content for node, round_number, content in rows}
+    state: Dict[str, Any] = {
+        "debate_id": debate_id,
+        "topic": [],
+        "rounds": [],
+        "judge": [],
+        "prompt": [],
+        "current_round": 0,
+        "winner": None,
+        "pro_argument": [],
+        "con_argument": [],
+        "processing_state": "ready",
+        "ready_for_next_round": False
+    }
+    for field in ("timings", "budget"):
+        if (field, 0) in nodes:
+            state[field] = json.loads(nodes[(field, 0)])
+    if ("prompt", 0) in nodes:
+        state["prompt"] = [{"role": "user", "content": nodes[("prompt", 0)]}]
+    if ("topic", 0) not in nodes:
+        return None
+    state["topic"] = [{"role": "assistant", "content": nodes[("topic", 0)]}]
+    state["processing_state"] = "topic_ready"
+    
+    names = ["pro", "con"]
+    if ("participants", 0) in nodes:
+        state["participants"] = json.loads(nodes[("participants", 0)])
+        names = [participant["name"] for participant in state["participants"]]
+    
+    round_number = 1
+    while all((name, round_number) in nodes for name in names):
+        arguments = {name: nodes[(name, round_number)] for name in names}
+        round_data: Dict[str, Any] = {"arguments": arguments, "round_number": round_number}
+        for side in ("pro", "con"):
+            if side in arguments:
+                round_data[side] = arguments[side]
+                state[f"{side}_argument"] = [{"role": "assistant", "content": arguments[side]}]
+        state["rounds"].append(round_data)
+        state["arguments"] = arguments
+        state["current_round"] = round_number
+        state["ready_for_next_round"] = True
+        state["processing_state"] = "round_complete"
+        round_number += 1
+    
+    if ("judge", 0) in nodes:
+        state["judge"] = [{"role": "assistant", "content": nodes[("judge", 0)]}]
+        state["winner"] = nodes.get(("winner", 0))
+        state["processing_state"] = "judgment_complete"
+    
+    return state
@@ -0,0 +1,84 @@
+import logging
+from typing import Dict, Any, Callable
+from components.bots import (
+    generate_topic_only,
+    generate_round_arguments,
+    generate_final_judgment,
+    retry_failed_round,
+    regenerate_argument,
+    checkpoint_metrics,
+    get_content,
+    State
+)
+from components import metrics
+from components.profiling import span
+from components.shared_store import enqueue_job, wait_for_job, job_counts
+from config.index import EXECUTION_MODE, JOB_TIMEOUT_SECONDS
+
+MESSAGE_FIELDS = ("topic", "judge", "prompt", "pro_argument", "con_argument")
+
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any]], State]] = {
+    "topic": lambda payload: generate_topic_only(payload["prompt"], payload.get("debate_id"), payload.get("participants")),
+    "round": lambda payload: generate_round_arguments(payload["state"], payload.get("prefetched")),
+    "judgment": lambda payload: generate_final_judgment(payload["state"]),
+    "retry_round": lambda payload: retry_failed_round(payload["state"]),
+    "regenerate": lambda payload: regenerate_argument(payload["state"], payload["participant"], payload["round_number"]),
+}
+
+
+def state_to_dict(state: State) -> Dict[str, Any]:
+    """Convert a State into plain JSON-serializable data"""
+    data: Dict[str, Any] = dict(state)
+    for field in MESSAGE_FIELDS:
+        role = "user" if field == "prompt" else "assistant"
+        data[field] = [{"role": role, "content": get_content(message)} for message in state.get(field, [])]
+    data["rounds"] = [dict(round_data) for round_data in state.get("rounds", [])]
+    return data
+
+
+STEP_STATES = {
+    "topic": "generating_topic",
+    "round": "generating_arguments",
+    "judgment": "generating_judgment",
+    "retry_round": "generating_arguments",
+    "regenerate": "generating_arguments",
+}
+
+metrics.register_collector(
+    "debate_jobs", "Jobs in the shared worker queue by status", "gauge",
+    lambda: [("debate_jobs", {"status": status}, count) for status, count in job_counts().items()]
+)
+
+
+def _debate_id(payload: Dict[str, Any]) -> Any:
+    return payload.get("debate_id") or payload.get("state", {}).get("debate_id")
+
+
+def run_job(kind: str, payload: Dict[str, Any]) -> State:
+    """Execute one debate step in the current process"""
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"Unknown debate job kind: {kind}")
+    metrics.track_debate(_debate_id(payload), STEP_STATES[kind])
+    try:
+        result = handler(payload)
+    except Exception:
+        metrics.debate_steps.inc(kind=kind, outcome="exception")
+        raise
+    checkpoint_metrics(result)
+    metrics.track_debate(result.get("debate_id"), result.get("processing_state", "unknown"))
+    metrics.debate_steps.inc(kind=kind, outcome="error" if result.get("processing_state") == "error" else "ok")
+    return result
+
+
+def run_step(kind: str, payload: Dict[str, Any]) -> State:
+    """Run a debate step inline or, in pool mode, through the worker queue"""
+    with span(f"step:{kind}"):
+        if EXECUTION_MODE != "pool":
+            return run_job(kind, payload)
+        
+        if "state" in payload:
+            payload = {**payload, "state": state_to_dict(payload["state"])}
+        job_id = enqueue_job(kind, payload)
+        logging.info(f"Enqueued {kind} job {job_id}")
+        return wait_for_job(job_id, timeout=JOB_TIMEOUT_SECONDS)
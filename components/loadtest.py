@@ -0,0 +1,207 @@
+"""
+Load test for one debate server, driven through the HTTP API against the OpenAI stub
+
+Each simulated session runs a whole debate (topic, every round, judgment) with
+"wait": true requests, so a step's latency is what a user waits for. Sessions at a
+load level start together. The server runs as its own process, so its CPU and RSS
+are measured apart from the clients and the stub.
+"""
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+from components.openai_stub import StubBackend, serve as serve_stub
+
+STEPS = ("topic", "round", "judgment")
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class ProcessSampler:
+    """CPU seconds and peak RSS of a process, read from /proc (None where /proc is unavailable)"""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def rss_mb(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = self.rss_mb()
+            if rss is not None:
+                self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+
+    def start(self):
+        self.peak_rss_mb = self.rss_mb()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="load_test_sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+async def http_json(host: str, port: int, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+                    timeout: float = 600.0) -> Tuple[int, Dict[str, Any]]:
+    """One request to the debate API on its own connection"""
+    payload = json.dumps(body or {}).encode("utf-8") if method == "POST" else b""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    return status, json.loads(data or b"{}")
+
+
+async def run_session(host: str, port: int, index: int, rounds: int, latencies: Dict[str, List[float]]) -> bool:
+    """Run one debate from topic to judgment, recording each step's latency; returns False if a step failed"""
+    debate_id = f"loadtest-{os.getpid()}-{time.time_ns()}-{index}"
+    requests = [("topic", "/debates", {"prompt": f"Load test debate {debate_id}", "rounds": rounds, "debate_id": debate_id, "wait": True})]
+    requests += [("round", f"/debates/{debate_id}/rounds", {"wait": True})] * rounds
+    requests += [("judgment", f"/debates/{debate_id}/judgment", {"wait": True})]
+    for step, path, body in requests:
+        started = time.perf_counter()
+        try:
+            status, data = await http_json(host, port, "POST", path, body)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            logging.error(f"Session {index} {step} failed: {str(e)}")
+            return False
+        if status != 200 or data.get("processing_state") == "error":
+            logging.error(f"Session {index} {step} failed with {status}: {data.get('error') or data.get('processing_state')}")
+            return False
+        latencies[step].append(time.perf_counter() - started)
+    return True
+
+
+async def run_level(host: str, port: int, sessions: int, rounds: int, sampler: Optional[ProcessSampler]) -> Dict[str, Any]:
+    """Run sessions debates at once and summarize throughput, step latency and server resources"""
+    latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+    cpu_before = sampler.cpu_seconds() if sampler else None
+    if sampler:
+        sampler.start()
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_session(host, port, i, rounds, latencies) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    if sampler:
+        sampler.stop()
+    cpu_after = sampler.cpu_seconds() if sampler else None
+
+    completed = sum(results)
+    return {
+        "sessions": sessions,
+        "completed": completed,
+        "failed": sessions - completed,
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(completed / elapsed, 3) if elapsed else 0.0,
+        "steps": {
+            step: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+            for step, values in latencies.items()
+        },
+        "server_cpu_percent": round(100 * (cpu_after - cpu_before) / elapsed, 1) if cpu_before is not None and cpu_after is not None else None,
+        "server_peak_rss_mb": round(sampler.peak_rss_mb, 1) if sampler and sampler.peak_rss_mb is not None else None,
+    }
+
+
+def wait_until_healthy(host: str, port: int, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            if time.time() > deadline:
+                raise
+        time.sleep(0.2)
+
+
+def start_stub(port: int, latency_mean: float, latency_sigma: float, seed: Optional[int] = None) -> str:
+    """Serve the OpenAI stub from this process and return its base URL"""
+    serve_stub("127.0.0.1", port, StubBackend(latency_mean, latency_sigma, seed=seed))
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def start_server(port: int, stub_url: str, step_workers: int, shared_db: str, env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Start api_server.py as a child process pointed at the stub, and wait until it answers"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server_env = {
+        **os.environ,
+        "OPENAI_BASE_URL": stub_url,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "load-test",
+        "MODEL": os.environ.get("MODEL") or "gpt-4o-mini",
+        "SHARED_DB": shared_db,
+        "EXECUTION_MODE": "inline",
+        **(env or {}),
+    }
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(root, "api_server.py"), "--host", "127.0.0.1", "--port", str(port), "--step-workers", str(step_workers)],
+        cwd=root, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_healthy("127.0.0.1", port)
+    except OSError:
+        server.terminate()
+        raise RuntimeError(f"Debate API did not start on port {port}")
+    return server
+
+
+def run_load_test(levels: List[int], host: str, port: int, rounds: int = 3,
+                  server_pid: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run each load level in turn against a running server and return one summary per level"""
+    sampler = ProcessSampler(server_pid) if server_pid else None
+    reports = []
+    for sessions in levels:
+        logging.info(f"Running {sessions} concurrent sessions")
+        report = asyncio.run(run_level(host, port, sessions, rounds, sampler))
+        logging.info(
+            f"{sessions} sessions: {report['sessions_per_second']} sessions/s, "
+            f"round p95 {report['steps']['round']['p95'] or 0:.2f}s, CPU {report['server_cpu_percent']}%, "
+            f"RSS {report['server_peak_rss_mb']} MB, {report['failed']} failed"
+        )
+        reports.append(report)
+    return reports
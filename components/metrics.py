@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.index import DEBATE_ACTIVE_SECONDS
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 90, 120, 180)
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class _Metric:
+    def __init__(self, name: str, help_text: str, kind: str):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic per-label totals"""
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text, "counter")
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    """Per-label values that go up and down"""
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self.kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        super().__init__(name, help_text, "histogram")
+        self.buckets = buckets
+        self._values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = _labels(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: list(counts) for key, counts in self._values.items()}
+        lines = self.header()
+        for key, counts in sorted(values.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', f'{bound:g}'),))} {count:g}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {counts[-2]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {counts[-1]:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {counts[-2]:g}")
+        return lines
+
+
+openai_inflight = Gauge("debate_openai_inflight_requests", "OpenAI calls currently in flight, by tool function")
+node_latency = Histogram("debate_node_latency_seconds", "Latency of API calls by pipeline node and model tier", LATENCY_BUCKETS)
+tokens = Counter("debate_tokens_total", "Tokens used by pipeline node and direction")
+cost = Counter("debate_cost_usd_total", "Estimated API cost in USD by pipeline node")
+cache_requests = Counter("debate_cache_requests_total", "Research and completion cache lookups by result")
+rate_limit_wait = Histogram("debate_rate_limit_wait_seconds", "Time spent waiting for the shared rate limiter by endpoint", WAIT_BUCKETS)
+debate_steps = Counter("debate_steps_total", "Finished debate steps by kind and outcome")
+duplicates_avoided = Counter("debate_duplicates_avoided_total", "Duplicate node runs avoided by idempotency keys, by node and reason")
+
+_METRICS: List[Any] = [openai_inflight, node_latency, tokens, cost, cache_requests, rate_limit_wait, debate_steps, duplicates_avoided]
+_collectors: List[Tuple[str, str, str, Callable[[], List[Sample]]]] = []
+
+_debates: Dict[str, Tuple[str, float]] = {}
+_debates_lock = threading.Lock()
+
+
+@contextmanager
+def track_inflight(function: str) -> Iterator[None]:
+    """Count an OpenAI call as in flight for the duration of the block"""
+    openai_inflight.inc(function=function)
+    try:
+        yield
+    finally:
+        openai_inflight.dec(function=function)
+
+
+def track_debate(debate_id: Optional[str], processing_state: str):
+    """Record the latest processing_state of a debate for the active-debates gauge"""
+    if not debate_id:
+        return
+    now = time.time()
+    with _debates_lock:
+        _debates[debate_id] = (processing_state, now)
+        for idle_id in [key for key, entry in _debates.items() if now - entry[1] > DEBATE_ACTIVE_SECONDS]:
+            del _debates[idle_id]
+
+
+def _active_debates() -> List[Sample]:
+    now = time.time()
+    states: Dict[str, int] = {}
+    with _debates_lock:
+        for processing_state, updated_at in _debates.values():
+            if now - updated_at <= DEBATE_ACTIVE_SECONDS:
+                states[processing_state] = states.get(processing_state, 0) + 1
+    return [("debate_active_debates", {"processing_state": state}, count) for state, count in sorted(states.items())]
+
+
+def register_collector(name: str, help_text: str, kind: str, collect: Callable[[], List[Sample]]):
+    """Add a metric whose samples are computed at scrape time"""
+    _collectors.append((name, help_text, kind, collect))
+
+
+register_collector("debate_active_debates", "Debates updated recently, by processing_state", "gauge", _active_debates)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines += metric.render()
+    for name, help_text, kind, collect in _collectors:
+        try:
+            samples = collect()
+        except Exception as e:
+            logging.error(f"Metrics collector {name} error: {str(e)}")
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f"{sample_name}{_format_labels(_labels(labels))} {value:g}" for sample_name, labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread; returns None if the port is unavailable"""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logging.error(f"Metrics server could not bind port {port}: {str(e)}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics_server", daemon=True).start()
+    logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,391 @@
+"""
+Local stand-in for the OpenAI endpoints this app uses, for offline runs and load tests
+
+Implements chat completions and responses (both plain and streamed), files and batches with
+canned content, configurable latency and injectable error responses (fail_next). Point the app at it with
+OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY.
+
+    python -m components.openai_stub --port 8787 --latency-mean 0.5
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+
+
+class StubBackend:
+    """In-memory state and canned behaviour shared by all stub request handlers"""
+
+    def __init__(self, latency_mean: float = 0.0, latency_sigma: float = 0.5, batch_delay: float = 1.0, seed: Optional[int] = None):
+        self.latency_mean = latency_mean
+        self.latency_sigma = latency_sigma
+        self.batch_delay = batch_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.failures: Dict[str, list] = {}
+
+    def sleep(self):
+        """Wait for a lognormally distributed latency with the configured mean"""
+        if self.latency_mean <= 0:
+            return
+        mu = math.log(self.latency_mean) - self.latency_sigma ** 2 / 2
+        with self.lock:
+            delay = self.random.lognormvariate(mu, self.latency_sigma)
+        time.sleep(delay)
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+
+    def fail_next(self, endpoint: str, status: int = 429, times: int = 1):
+        """Answer the next requests to an endpoint ("chat" or "responses") with an error status"""
+        with self.lock:
+            self.failures.setdefault(endpoint, []).extend([status] * times)
+
+    def take_failure(self, endpoint: str) -> Optional[int]:
+        with self.lock:
+            pending = self.failures.get(endpoint)
+            return pending.pop(0) if pending else None
+
+    def chat_completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        prompt = " ".join(str(message.get("content", "")) for message in messages)
+        if "Judge" in prompt or "judge" in prompt:
+            with self.lock:
+                side = self.random.choice(["PRO", "CON"])
+            content = f"**Fact-Check Summary**: Stub verification.\n\n**Final Verdict**: WINNER: {side}"
+        elif "Topic Generation Bot" in prompt:
+            # Distinct per prompt, so concurrent stub debates do not share research
+            content = f"Stub debate topic {zlib.crc32(prompt.encode('utf-8')):08x}: governments should regulate frontier AI systems by 2026"
+        else:
+            content = "Stub argument citing a 2025 study with 42% improvement and expert consensus."
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "stub-model",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def response(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        query = str(body.get("input", ""))[:120].replace("\n", " ")
+        text = (
+            f"## Research findings\n\nStub research for: {query}\n\n"
+            "- Statistic: 61% of surveyed experts expect significant change by 2026 (Stub Institute, 2025)\n"
+            "- Case study: a 2024 pilot reported 18% cost savings\n\n"
+            "## Counterpoints\n\nCritics cite implementation risks and uneven evidence quality."
+        )
+        input_tokens = max(1, len(str(body.get("input", ""))) // 4)
+        output_tokens = max(1, len(text) // 4)
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:12]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model") or "stub-model",
+            "status": "completed",
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": body.get("tools", []),
+            "output": [
+                {"id": f"ws_{uuid.uuid4().hex[:8]}", "type": "web_search_call", "status": "completed"},
+                {
+                    "id": f"msg_{uuid.uuid4().hex[:8]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{
+                        "type": "output_text",
+                        "text": text,
+                        "annotations": [{
+                            "type": "url_citation",
+                            "url": "https://example.org/stub-source",
+                            "title": "Stub Source",
+                            "start_index": 0,
+                            "end_index": 10
+                        }]
+                    }]
+                }
+            ],
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        }
+
+    def stream_events(self, response: Dict[str, Any]):
+        """Yield (event, data) pairs for a streamed Responses API call"""
+        sequence = 0
+
+        def event(name: str, **data):
+            nonlocal sequence
+            sequence += 1
+            return name, {"type": name, "sequence_number": sequence, **data}
+
+        in_progress = {**response, "status": "in_progress", "output": []}
+        yield event("response.created", response=in_progress)
+        yield event("response.web_search_call.in_progress", output_index=0, item_id=response["output"][0]["id"])
+        yield event("response.web_search_call.completed", output_index=0, item_id=response["output"][0]["id"])
+        message = response["output"][1]
+        text = message["content"][0]["text"]
+        for start in range(0, len(text), 40):
+            yield event("response.output_text.delta", item_id=message["id"], output_index=1, content_index=0, delta=text[start:start + 40])
+        yield event(
+            "response.output_text.annotation.added",
+            item_id=message["id"], output_index=1, content_index=0, annotation_index=0,
+            annotation=message["content"][0]["annotations"][0]
+        )
+        yield event("response.output_text.done", item_id=message["id"], output_index=1, content_index=0, text=text)
+        yield event("response.completed", response=response)
+
+    def chat_stream_chunks(self, completion: Dict[str, Any], include_usage: bool):
+        """Yield (event, data) pairs for a streamed chat completion; chat chunks have no event name"""
+        base = {key: completion[key] for key in ("id", "created", "model")}
+        base["object"] = "chat.completion.chunk"
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None):
+            return None, {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        content = completion["choices"][0]["message"]["content"]
+        yield chunk({"role": "assistant", "content": ""})
+        for start in range(0, len(content), 20):
+            yield chunk({"content": content[start:start + 20]})
+        yield chunk({}, "stop")
+        if include_usage:
+            yield None, {**base, "choices": [], "usage": completion["usage"]}
+        yield None, "[DONE]"
+
+    def add_file(self, filename: str, purpose: str, content: bytes) -> Dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:16]}"
+        record = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed"
+        }
+        with self.lock:
+            self.files[file_id] = {**record, "content": content}
+        return record
+
+    def create_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "metadata": body.get("metadata"),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0}
+        }
+        with self.lock:
+            self.batches[batch_id] = batch
+        threading.Thread(target=self._run_batch, args=(batch_id,), daemon=True).start()
+        return dict(batch)
+
+    def _run_batch(self, batch_id: str):
+        time.sleep(self.batch_delay)
+        with self.lock:
+            batch = self.batches[batch_id]
+            batch["status"] = "in_progress"
+            lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        outputs, errors = [], []
+        for line in lines:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            if request["url"] == "/v1/chat/completions":
+                body = self.chat_completion(request["body"])
+            elif request["url"] == "/v1/responses":
+                body = self.response(request["body"])
+            else:
+                errors.append({"custom_id": request["custom_id"], "error": {"message": f"Unsupported url {request['url']}"}})
+                continue
+            outputs.append({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": body},
+                "error": None
+            })
+        time.sleep(self.batch_delay)
+        output_file = self.add_file(f"{batch_id}_output.jsonl", "batch_output",
+                                    "\n".join(json.dumps(output) for output in outputs).encode("utf-8"))
+        error_file = self.add_file(f"{batch_id}_errors.jsonl", "batch_output",
+                                   "\n".join(json.dumps(error) for error in errors).encode("utf-8")) if errors else None
+        with self.lock:
+            batch.update({
+                "status": "completed",
+                "output_file_id": output_file["id"],
+                "error_file_id": error_file["id"] if error_file else None,
+                "completed_at": int(time.time()),
+                "request_counts": {"total": len(outputs) + len(errors), "completed": len(outputs), "failed": len(errors)}
+            })
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    backend: StubBackend = StubBackend()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args):
+        logging.debug(format % args)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, events):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for name, data in events:
+            head = f"event: {name}\n" if name else ""
+            payload = data if isinstance(data, str) else json.dumps(data)
+            self.wfile.write(f"{head}data: {payload}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _parse_multipart(self, body: bytes) -> Tuple[Dict[str, str], Tuple[str, bytes]]:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        fields: Dict[str, str] = {}
+        upload = ("upload.jsonl", b"")
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            filename = part.get_filename()
+            payload = part.get_payload(decode=True) or b""
+            if filename:
+                upload = (filename, payload)
+            elif name:
+                fields[name] = payload.decode("utf-8")
+        return fields, upload
+
+    def do_POST(self):
+        body = self._read_body()
+        path = self.path.split("?")[0].rstrip("/")
+        endpoint = "chat" if path.endswith("/chat/completions") else "responses" if path.endswith("/responses") else None
+        status = self.backend.take_failure(endpoint) if endpoint else None
+        if status is not None:
+            self.backend.count(endpoint)
+            self._send_json({"error": {"message": f"Stub {status} error", "type": "stub_error", "code": None}}, status=status)
+            return
+        if path.endswith("/chat/completions"):
+            self.backend.count("chat")
+            request = json.loads(body or b"{}")
+            self.backend.sleep()
+            completion = self.backend.chat_completion(request)
+            if request.get("stream"):
+                self._send_stream(self.backend.chat_stream_chunks(completion, bool((request.get("stream_options") or {}).get("include_usage"))))
+            else:
+                self._send_json(completion)
+        elif path.endswith("/responses"):
+            self.backend.count("responses")
+            request = json.loads(body or b"{}")
+            self.backend.sleep()
+            response = self.backend.response(request)
+            if request.get("stream"):
+                self._send_stream(self.backend.stream_events(response))
+            else:
+                self._send_json(response)
+        elif path.endswith("/files"):
+            self.backend.count("files")
+            fields, (filename, content) = self._parse_multipart(body)
+            self._send_json(self.backend.add_file(filename, fields.get("purpose", "batch"), content))
+        elif path.endswith("/batches"):
+            self.backend.count("batches")
+            self._send_json(self.backend.create_batch(json.loads(body or b"{}")))
+        else:
+            self._send_json({"error": {"message": f"Unknown endpoint {path}"}}, status=404)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        parts = path.split("/")
+        if "batches" in parts and parts[-1] != "batches":
+            batch = self.backend.batches.get(parts[-1])
+            if batch:
+                self._send_json(dict(batch))
+                return
+        elif "files" in parts and parts[-1] == "content":
+            stored = self.backend.files.get(parts[-2])
+            if stored:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(stored["content"])))
+                self.end_headers()
+                self.wfile.write(stored["content"])
+                return
+        elif path.endswith("/stats"):
+            self._send_json({"requests": dict(self.backend.request_counts)})
+            return
+        self._send_json({"error": {"message": f"Not found: {path}"}}, status=404)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8787, backend: Optional[StubBackend] = None) -> ThreadingHTTPServer:
+    """Start the stub on a background thread and return the server"""
+    handler = type("BoundStubHandler", (StubHandler,), {"backend": backend or StubBackend()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-mean", type=float, default=0.0, help="Mean seconds per API call (lognormal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma of call latency")
+    parser.add_argument("--batch-delay", type=float, default=1.0, help="Seconds a batch spends in each phase")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = serve(args.host, args.port, StubBackend(args.latency_mean, args.latency_sigma, args.batch_delay))
+    logging.info(f"OpenAI stub listening on http://{args.host}:{args.port}/v1")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import datetime
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+from components.bots import topic_generation_bot, new_debate_state, prefetch_round, get_content
+from components.shared_store import put_prewarmed_topic, get_prewarmed_topic
+from components.tools import normalize_query, is_failed_response, is_failed_research
+from components.usage import track_calls
+from config.index import PREWARM_WINDOW, PREWARM_COST_LIMIT
+
+
+def parse_window(window: str) -> Tuple[datetime.time, datetime.time]:
+    """Start and end of an "HH:MM-HH:MM" window; the end may be past midnight"""
+    start, _, end = window.partition("-")
+    return datetime.time.fromisoformat(start.strip()), datetime.time.fromisoformat(end.strip())
+
+
+def in_window(window: str, now: datetime.datetime) -> bool:
+    start, end = parse_window(window)
+    current = now.time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def seconds_until_window(window: str, now: datetime.datetime) -> float:
+    """Seconds until the window next opens, 0 while it is open"""
+    if in_window(window, now):
+        return 0.0
+    opening = datetime.datetime.combine(now.date(), parse_window(window)[0])
+    if opening <= now:
+        opening += datetime.timedelta(days=1)
+    return (opening - now).total_seconds()
+
+
+def prewarm_topic(prompt: str) -> Tuple[bool, float]:
+    """
+    Generate a prompt's topic statement and first-round research and store them for users
+
+    First-round research covers PRO and, because CON's searches answer PRO's opening
+    argument, that argument and CON's research too. Returns whether the topic was
+    stored and what it cost in USD.
+    """
+    with track_calls() as calls:
+        state = topic_generation_bot(new_debate_state(prompt, None, None))
+        # The topic bot stores the failure text of a failed call as the topic
+        failed = state["processing_state"] == "error" or is_failed_response(get_content(state["topic"][-1]))
+        prefetched = prefetch_round(state, include_pro=True) if not failed else None
+    cost = sum(call["cost"] for call in calls)
+    if prefetched is None:
+        logging.error(f"Prewarm topic generation failed for: {prompt[:80]}")
+        return False, cost
+
+    # prefetch_round already leaves out failed arguments and research written against them
+    prefetched.pop("calls", None)
+    prefetched["research"] = {
+        name: research for name, research in prefetched["research"].items()
+        if research and not is_failed_research(research)
+    }
+    put_prewarmed_topic(normalize_query(prompt), prompt, get_content(state["topic"][-1]), prefetched)
+    return True, cost
+
+
+def prewarm_topics(prompts: List[str], cost_limit: float = PREWARM_COST_LIMIT, window: str = PREWARM_WINDOW,
+                   refresh: bool = False) -> Dict[str, Any]:
+    """
+    Prewarm topics in order, waiting for the off-peak window to open
+
+    Stops when the window closes or when the next topic, at the average cost so far,
+    would exceed cost_limit USD. Topics still prewarmed are skipped unless refresh.
+    """
+    if window:
+        delay = seconds_until_window(window, datetime.datetime.now())
+        if delay:
+            logging.info(f"Waiting {delay / 3600:.1f}h for the prewarm window {window}")
+            time.sleep(delay)
+
+    summary: Dict[str, Any] = {"prewarmed": 0, "skipped": 0, "failed": 0, "cost": 0.0, "stopped": None}
+    for prompt in prompts:
+        if window and not in_window(window, datetime.datetime.now()):
+            summary["stopped"] = "window closed"
+            break
+        attempted = summary["prewarmed"] + summary["failed"]
+        average = summary["cost"] / attempted if attempted else 0.0
+        if cost_limit > 0 and summary["cost"] + average > cost_limit:
+            summary["stopped"] = "spend limit"
+            break
+        if not refresh and get_prewarmed_topic(normalize_query(prompt)):
+            summary["skipped"] += 1
+            continue
+
+        started = time.perf_counter()
+        stored, cost = prewarm_topic(prompt)
+        summary["cost"] += cost
+        summary["prewarmed" if stored else "failed"] += 1
+        logging.info(f"Prewarmed in {time.perf_counter() - started:.1f}s for ${cost:.4f} (${summary['cost']:.4f} total): {prompt[:80]}")
+
+    if summary["stopped"]:
+        logging.warning(f"Prewarm stopped early ({summary['stopped']})")
+    return summary
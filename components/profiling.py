@@ -0,0 +1,199 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config.index import PROFILE_DIR, PROFILE_INTERVAL_MS
+
+IDLE_STOP_SECONDS = 1800
+
+_active_profile: ContextVar[Optional["DebateProfile"]] = ContextVar("active_profile", default=None)
+
+
+def _category(stack: List[tuple]) -> str:
+    """Where a sampled stack spends its time, judged from the innermost frames outwards"""
+    filename, function = stack[-1]
+    if function in ("wait", "_wait_for_tstate_lock", "get") and filename.endswith(("threading.py", "queue.py", "_base.py")):
+        return "waiting"
+    for filename, function in reversed(stack):
+        path = filename.replace("\\", "/")
+        if any(part in path for part in ("/openai/", "/httpx/", "/httpcore/")) or path.endswith(("/ssl.py", "/socket.py")):
+            return "api"
+        if function.endswith("_messages") or function == "get_debate_history":
+            return "prompt_formatting"
+        if function in ("compact_state", "expand_state", "state_to_dict", "charge_budget"):
+            return "state_copy"
+        if "sqlite3" in path or path.endswith(("/shared_store.py", "/debate_store.py")):
+            return "store"
+        if "/streamlit/" in path:
+            return "streamlit"
+    return "python"
+
+
+class DebateProfile:
+    """
+    Sampling profile plus wall-clock spans for one session's debate
+
+    Only threads doing this debate's work are sampled: the script thread during a
+    rerun and pool threads while they are inside a span.
+    """
+
+    def __init__(self, name: str, directory: str = PROFILE_DIR, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.name = name
+        self.directory = directory
+        self.interval = interval
+        self.folded: Dict[str, int] = {}
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.script: Optional[str] = None
+        self._stacks: Dict[int, List[str]] = {}
+        self._rerun: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._last_active = time.time()
+
+    def _node(self, name: str) -> Dict[str, Any]:
+        return self.nodes.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "samples": {}})
+
+    def _record_span(self, name: str, seconds: float):
+        node = self._node(name)
+        node["count"] += 1
+        node["total_seconds"] += seconds
+        node["max_seconds"] = max(node["max_seconds"], seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a block and attribute this thread's samples inside it to name"""
+        ident = threading.get_ident()
+        with self._lock:
+            self._stacks.setdefault(ident, []).append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                stack = self._stacks.get(ident, [])
+                if stack:
+                    stack.pop()
+                if not stack:
+                    self._stacks.pop(ident, None)
+                self._record_span(name, seconds)
+
+    def begin_rerun(self, script: str):
+        """Start profiling a Streamlit rerun on this thread, closing one that ended in st.rerun() or st.stop()"""
+        self.end_rerun()
+        self.script = script
+        self._last_active = time.time()
+        with self._lock:
+            self._rerun = (threading.get_ident(), time.perf_counter())
+            self._stacks.setdefault(self._rerun[0], []).insert(0, "rerun")
+        if self._sampler is None or not self._sampler.is_alive():
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="debate_profiler", daemon=True)
+            self._sampler.start()
+
+    def end_rerun(self):
+        """Finish the current rerun's span and write the profile"""
+        with self._lock:
+            if self._rerun is None:
+                return
+            ident, started = self._rerun
+            self._rerun = None
+            stack = self._stacks.get(ident, [])
+            if stack and stack[0] == "rerun":
+                stack.pop(0)
+            if not stack:
+                self._stacks.pop(ident, None)
+            self._record_span("rerun", time.perf_counter() - started)
+        self.write()
+
+    def stop(self):
+        self.end_rerun()
+        self._stop.set()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            if time.time() - self._last_active > IDLE_STOP_SECONDS:
+                logging.info(f"Profiler for {self.name} stopped after being idle")
+                return
+            frames = sys._current_frames()
+            with self._lock:
+                threads = {ident: stack[-1] for ident, stack in self._stacks.items() if stack}
+                rerun_thread = self._rerun[0] if self._rerun else None
+            for ident, node in threads.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append((frame.f_code.co_filename, frame.f_code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                if not stack:
+                    continue
+                # Between reruns the script thread idles inside Streamlit; only count it inside the script
+                if ident == rerun_thread and node == "rerun" and not any(filename == self.script for filename, _ in stack):
+                    continue
+                key = ";".join([node] + [f"{os.path.basename(filename)}:{function}" for filename, function in stack])
+                category = _category(stack)
+                with self._lock:
+                    self.folded[key] = self.folded.get(key, 0) + 1
+                    samples = self._node(node)["samples"]
+                    samples[category] = samples.get(category, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Wall time per span and sampled time per category, by node"""
+        with self._lock:
+            nodes = {name: {**node, "samples": dict(node["samples"])} for name, node in self.nodes.items()}
+        for node in nodes.values():
+            node["total_seconds"] = round(node["total_seconds"], 4)
+            node["max_seconds"] = round(node["max_seconds"], 4)
+            node["sampled_seconds"] = {category: round(count * self.interval, 3) for category, count in node.pop("samples").items()}
+        return {"name": self.name, "interval_ms": self.interval * 1000, "nodes": nodes}
+
+    def write(self):
+        """Write <name>.folded (flamegraph.pl, speedscope) and <name>.summary.json to the profile directory"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with self._lock:
+                folded = dict(self.folded)
+            base = os.path.join(self.directory, self.name)
+            with open(f"{base}.folded", "w", encoding="utf-8") as folded_file:
+                folded_file.writelines(f"{key} {count}\n" for key, count in sorted(folded.items()))
+            with open(f"{base}.summary.json", "w", encoding="utf-8") as summary_file:
+                json.dump(self.summary(), summary_file, indent=2)
+        except OSError as e:
+            logging.error(f"Profile write error: {str(e)}")
+
+
+def activate_profile(profile: Optional[DebateProfile]):
+    """Make profile the active one for this thread's context and the pool work it starts"""
+    _active_profile.set(profile)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block in the active profile; costs one context lookup when profiling is off"""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.span(name):
+        yield
+
+
+def profiled(name: str):
+    """Decorator form of span()"""
+    def decorator(function: Callable):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active_profile.get() is None:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
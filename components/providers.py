@@ -0,0 +1,30 @@
+import threading
+from typing import Dict
+from openai import OpenAI
+from config.index import PROVIDERS
+
+_clients: Dict[str, OpenAI] = {}
+_lock = threading.Lock()
+
+
+def get_client(provider: str = "openai") -> OpenAI:
+    """
+    The shared client for an OpenAI-compatible provider from config.index.PROVIDERS
+    
+    The SDK does not retry: components.tools retries through the adaptive concurrency
+    limits, so they see each 429 and timeout as it happens.
+    """
+    with _lock:
+        if provider not in _clients:
+            settings = PROVIDERS[provider]
+            _clients[provider] = OpenAI(base_url=settings["base_url"], api_key=settings["api_key"], max_retries=0)
+        return _clients[provider]
+
+
+def supports_web_search(provider: str) -> bool:
+    return PROVIDERS[provider]["web_search"]
+
+
+def provider_endpoint(provider: str, endpoint: str) -> str:
+    """Rate and concurrency limit name for an endpoint ("chat" or "web_search") of a provider"""
+    return endpoint if provider == "openai" else f"{provider}_{endpoint}"
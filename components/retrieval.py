@@ -0,0 +1,150 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from components.shared_store import list_cached_research
+from config.index import RETRIEVAL_DIR
+
+DOCUMENT_EXTENSIONS = (".txt", ".md")
+CHUNK_CHARS = 1200
+REFRESH_SECONDS = 60
+# Research produced from retrieval is cached under this prefix and never indexed again
+RETRIEVAL_KEY_PREFIX = "retrieval|"
+
+_TOKEN = re.compile(r"[a-z0-9]{3,}")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def chunk_text(text: str, chunk_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split text on blank lines into chunks of about chunk_chars"""
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class LocalRetriever:
+    """
+    BM25 search over local documents and previously cached web research
+
+    Used in place of web search for research nodes whose provider has none. The
+    index covers the .txt and .md files under directory and the research cache in
+    SHARED_DB, and is rebuilt at most every REFRESH_SECONDS when either changes.
+    Paragraphs of web searches still in progress are added with add_live() and kept
+    until their finished research is in the cache.
+    """
+
+    def __init__(self, directory: str = RETRIEVAL_DIR, k1: float = 1.5, b: float = 0.75):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._signature: Tuple = ()
+        self._checked = 0.0
+        self._chunks: List[Tuple[str, str]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._average_length = 0.0
+        self._live: Dict[str, List[Tuple[str, str]]] = {}
+
+    def _documents(self) -> Tuple[Tuple, List[Tuple[str, str]]]:
+        files = []
+        if os.path.isdir(self.directory):
+            for root, _, names in os.walk(self.directory):
+                files += [os.path.join(root, name) for name in sorted(names) if name.endswith(DOCUMENT_EXTENSIONS)]
+        research = [(key, value) for key, value in list_cached_research() if not key.startswith(RETRIEVAL_KEY_PREFIX)]
+        signature = (tuple((path, os.path.getmtime(path)) for path in files), tuple(key for key, _ in research))
+        if signature == self._signature:
+            return signature, []
+
+        documents = []
+        for path in files:
+            try:
+                with open(path, encoding="utf-8", errors="replace") as document:
+                    documents.append((os.path.relpath(path, self.directory), document.read()))
+            except OSError as e:
+                logging.error(f"Retrieval document read error: {str(e)}")
+        documents += [(f"cached research: {key.split('|', 1)[-1][:80]}", value) for key, value in research]
+        return signature, documents
+
+    def _index(self, source: str, chunk: str):
+        tokens = tokenize(chunk)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        i = len(self._chunks)
+        self._chunks.append((source, chunk))
+        self._lengths.append(len(tokens))
+        for token, count in counts.items():
+            self._postings.setdefault(token, []).append((i, count))
+        self._total_length += len(tokens)
+        self._average_length = self._total_length / len(self._lengths)
+
+    def refresh(self):
+        """Rebuild the index if the documents or the research cache changed"""
+        with self._lock:
+            if time.time() - self._checked < REFRESH_SECONDS and self._checked:
+                return
+            self._checked = time.time()
+            signature, documents = self._documents()
+            if signature == self._signature:
+                return
+            # Live paragraphs are superseded once their search's research is cached
+            cached = set(signature[1])
+            self._live = {key: passages for key, passages in self._live.items() if key not in cached}
+            self._signature, self._chunks, self._postings, self._lengths, self._total_length = signature, [], {}, [], 0
+            self._average_length = 0.0
+            for source, text in documents:
+                for chunk in chunk_text(text):
+                    self._index(source, chunk)
+            for passages in self._live.values():
+                for source, chunk in passages:
+                    self._index(source, chunk)
+            logging.info(f"Retrieval index rebuilt with {len(self._chunks)} passages from {len(documents)} documents")
+
+    def add_live(self, key: str, source: str, paragraph: str):
+        """Index a paragraph of web research that is still being written under research cache key"""
+        with self._lock:
+            self._live.setdefault(key, []).append((source, paragraph))
+            self._index(source, paragraph)
+
+    def drop_live(self, key: str):
+        """Forget the paragraphs of a search that failed, at the next refresh"""
+        with self._lock:
+            if self._live.pop(key, None) is not None:
+                self._signature, self._checked = (), 0.0
+
+    def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        """The k best passages for a query as {"source", "text", "score"}"""
+        self.refresh()
+        with self._lock:
+            chunks, postings, lengths, average_length = self._chunks, self._postings, self._lengths, self._average_length
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            matches = postings.get(token, [])
+            if not matches:
+                continue
+            idf = math.log(1 + (len(chunks) - len(matches) + 0.5) / (len(matches) + 0.5))
+            for i, count in matches:
+                norm = self.k1 * (1 - self.b + self.b * lengths[i] / average_length)
+                scores[i] = scores.get(i, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{"source": chunks[i][0], "text": chunks[i][1], "score": round(score, 3)} for i, score in best]
+
+
+retriever = LocalRetriever()
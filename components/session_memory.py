@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple, Union, cast
+from components.bots import State, get_content
+from components.jobs import MESSAGE_FIELDS
+from components.shared_store import spill_text, load_spilled_text
+from config.index import SESSION_SPILL_CHARS
+
+MISSING_TEXT = "[This text is no longer available.]"
+IDLE_SESSION_SECONDS = 24 * 3600
+
+
+class SpilledText:
+    """Handle to a long string kept in the shared store instead of session memory"""
+    __slots__ = ("key", "length")
+
+    def __init__(self, key: str, length: int):
+        self.key = key
+        self.length = length
+
+
+Text = Union[str, SpilledText]
+
+
+class RoundRecord:
+    """A finished round as plain strings by participant name"""
+    __slots__ = ("round_number", "arguments")
+
+    def __init__(self, round_number: int, arguments: Tuple[Tuple[str, Text], ...]):
+        self.round_number = round_number
+        self.arguments = arguments
+
+
+class CompactState:
+    """
+    A State as kept in st.session_state between reruns
+
+    Message lists become tuples of plain strings, finished rounds become slotted
+    records, and every string longer than SESSION_SPILL_CHARS (arguments, research,
+    judgments) is replaced by a handle into the shared store.
+    """
+    __slots__ = ("fields", "messages", "rounds", "resident_bytes", "spilled_chars")
+
+    def __init__(self, fields: Dict[str, Any], messages: Dict[str, Tuple[Text, ...]], rounds: Tuple[RoundRecord, ...]):
+        self.fields = fields
+        self.messages = messages
+        self.rounds = rounds
+        self.resident_bytes = 0
+        self.spilled_chars = 0
+
+    @property
+    def debate_id(self) -> Optional[str]:
+        return self.fields.get("debate_id")
+
+
+def spill_value(value: Any) -> Any:
+    """Replace every long string in a value with a handle into the shared store; lists become tuples"""
+    if isinstance(value, str):
+        if SESSION_SPILL_CHARS <= 0 or len(value) <= SESSION_SPILL_CHARS:
+            return value
+        key = hashlib.sha256(value.encode("utf-8")).hexdigest()
+        spill_text(key, value)
+        return SpilledText(key, len(value))
+    if isinstance(value, dict):
+        return {key: spill_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return tuple(spill_value(item) for item in value)
+    return value
+
+
+def restore_value(value: Any) -> Any:
+    """Undo spill_value(), reading spilled strings back from the store"""
+    if isinstance(value, SpilledText):
+        try:
+            return load_spilled_text(value.key)
+        except KeyError as e:
+            logging.error(f"Session memory error: {str(e)}")
+            return MISSING_TEXT
+    if isinstance(value, dict):
+        return {key: restore_value(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [restore_value(item) for item in value]
+    return value
+
+
+def _measure(value: Any) -> Tuple[int, int]:
+    """(resident bytes, spilled characters) of a compacted value"""
+    if isinstance(value, SpilledText):
+        return sys.getsizeof(value) + sys.getsizeof(value.key), value.length
+    resident, spilled = sys.getsizeof(value), 0
+    if isinstance(value, dict):
+        items = [item for pair in value.items() for item in pair]
+    elif isinstance(value, (list, tuple)):
+        items = list(value)
+    elif isinstance(value, (RoundRecord, CompactState)):
+        items = [getattr(value, slot) for slot in value.__slots__]
+    else:
+        items = []
+    for item in items:
+        item_resident, item_spilled = _measure(item)
+        resident += item_resident
+        spilled += item_spilled
+    return resident, spilled
+
+
+def compact_state(state: State) -> CompactState:
+    """Convert a State into its compact session form, spilling long strings to the store"""
+    messages = {
+        field: tuple(spill_value(get_content(message)) for message in state.get(field, []))
+        for field in MESSAGE_FIELDS
+    }
+    rounds = tuple(
+        RoundRecord(
+            round_data.get("round_number") or i + 1,
+            tuple(
+                (name, spill_value(argument))
+                for name, argument in (round_data.get("arguments") or {"pro": round_data.get("pro", ""), "con": round_data.get("con", "")}).items()
+            )
+        )
+        for i, round_data in enumerate(state["rounds"])
+    )
+    fields = {
+        key: spill_value(value) for key, value in state.items()
+        if key not in MESSAGE_FIELDS and key != "rounds"
+    }
+    compact = CompactState(fields, messages, rounds)
+    compact.resident_bytes, compact.spilled_chars = _measure(compact)
+    return compact
+
+
+def expand_state(compact: CompactState) -> State:
+    """Rebuild the full State from its compact session form"""
+    state: Dict[str, Any] = {key: restore_value(value) for key, value in compact.fields.items()}
+    for field, texts in compact.messages.items():
+        role = "user" if field == "prompt" else "assistant"
+        state[field] = [{"role": role, "content": restore_value(text)} for text in texts]
+    state["rounds"] = []
+    for record in compact.rounds:
+        arguments = {name: restore_value(argument) for name, argument in record.arguments}
+        round_data: Dict[str, Any] = {"arguments": arguments, "round_number": record.round_number}
+        for side in ("pro", "con"):
+            if side in arguments:
+                round_data[side] = arguments[side]
+        state["rounds"].append(round_data)
+    return cast(State, state)
+
+
+_sessions: Dict[str, Tuple[float, int, int]] = {}
+_sessions_lock = threading.Lock()
+
+
+def track_session(session_id: str, compact: CompactState, extras: Sequence[Any] = ()):
+    """
+    Record a session's current footprint for the process-wide memory report
+    
+    extras are the session's other debate objects, such as a failed round kept for
+    retry, transcript sections or speculative results, and are counted with the state.
+    """
+    now = time.time()
+    resident, spilled = compact.resident_bytes, compact.spilled_chars
+    for extra in extras:
+        extra_resident, extra_spilled = _measure(extra)
+        resident += extra_resident
+        spilled += extra_spilled
+    with _sessions_lock:
+        _sessions[session_id] = (now, resident, spilled)
+        for idle_id in [key for key, entry in _sessions.items() if now - entry[0] > IDLE_SESSION_SECONDS]:
+            del _sessions[idle_id]
+
+
+def session_memory_report() -> Dict[str, Any]:
+    """Resident bytes and spilled characters of debate state across this process's sessions"""
+    with _sessions_lock:
+        entries = list(_sessions.values())
+    return {
+        "sessions": len(entries),
+        "resident_bytes": sum(entry[1] for entry in entries),
+        "spilled_chars": sum(entry[2] for entry in entries),
+        "largest_session_bytes": max((entry[1] for entry in entries), default=0),
+    }
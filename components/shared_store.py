@@ -0,0 +1,375 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from components import metrics
+from config.index import (
+    SHARED_DB,
+    RESEARCH_CACHE_TTL,
+    RATE_LIMITS,
+    RATE_LIMIT_BURST,
+    COMPLETION_CACHE,
+    COMPLETION_CACHE_MAX_MB,
+    SESSION_SPILL_TTL,
+    PREWARM_TTL,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS
+)
+
+_local = threading.local()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS research_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS completion_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completion_cache_used ON completion_cache (used_at);
+CREATE TABLE IF NOT EXISTS spilled_text (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS prewarmed_topics (
+    key TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    prefetched TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS debate_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS debate_jobs_status ON debate_jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS debate_nodes (
+    debate_id TEXT NOT NULL,
+    node TEXT NOT NULL,
+    round_number INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (debate_id, node, round_number)
+);
+"""
+
+
+def get_connection() -> sqlite3.Connection:
+    """Return this thread's connection to the shared SQLite store"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SHARED_DB, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _add_missing_columns(conn)
+        _local.conn = conn
+    return conn
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    """Bring a store created by an older version up to the current schema"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(debate_jobs)")}
+    if "lease_until" not in columns:
+        conn.execute("ALTER TABLE debate_jobs ADD COLUMN lease_until REAL")
+    if "attempts" not in columns:
+        conn.execute("ALTER TABLE debate_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+
+def get_cached_research(key: str, allow_stale: bool = False) -> Optional[str]:
+    """Look up a research result in the shared cache, optionally accepting an expired entry"""
+    if RESEARCH_CACHE_TTL <= 0:
+        return None
+    try:
+        row = get_connection().execute(
+            "SELECT value FROM research_cache WHERE key = ? AND created_at >= ?",
+            (key, 0 if allow_stale else time.time() - RESEARCH_CACHE_TTL)
+        ).fetchone()
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        logging.error(f"Research cache read error: {str(e)}")
+        return None
+
+
+def put_cached_research(key: str, value: str):
+    """Store a research result in the shared cache and drop long-expired entries"""
+    if RESEARCH_CACHE_TTL <= 0:
+        return
+    try:
+        conn = get_connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO research_cache (key, value, created_at) VALUES (?, ?, ?)",
+            (key, value, now)
+        )
+        # Expired entries are kept a while longer as deadline fallbacks
+        conn.execute("DELETE FROM research_cache WHERE created_at < ?", (now - 10 * RESEARCH_CACHE_TTL,))
+    except sqlite3.Error as e:
+        logging.error(f"Research cache write error: {str(e)}")
+
+
+def list_cached_research(limit: int = 5000) -> List[Tuple[str, str]]:
+    """(key, research) for the most recent cached research, stale entries included"""
+    if RESEARCH_CACHE_TTL <= 0:
+        return []
+    try:
+        return get_connection().execute(
+            "SELECT key, value FROM research_cache ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"Research cache read error: {str(e)}")
+        return []
+
+
+def get_cached_completion(key: str) -> Optional[str]:
+    """Look up a chat completion by its request hash, marking it recently used"""
+    if COMPLETION_CACHE == "off":
+        return None
+    try:
+        conn = get_connection()
+        row = conn.execute("SELECT value FROM completion_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE completion_cache SET used_at = ? WHERE key = ?", (time.time(), key))
+        return zlib.decompress(row[0]).decode("utf-8")
+    except (sqlite3.Error, zlib.error) as e:
+        logging.error(f"Completion cache read error: {str(e)}")
+        return None
+
+
+def put_cached_completion(key: str, value: str):
+    """Store a compressed chat completion, evicting least recently used entries over the size limit"""
+    if COMPLETION_CACHE == "off":
+        return
+    try:
+        conn = get_connection()
+        data = zlib.compress(value.encode("utf-8"))
+        conn.execute(
+            "INSERT OR REPLACE INTO completion_cache (key, value, size, used_at) VALUES (?, ?, ?, ?)",
+            (key, data, len(data), time.time())
+        )
+        limit = COMPLETION_CACHE_MAX_MB * 1024 * 1024
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completion_cache").fetchone()[0]
+        if total <= limit:
+            return
+        # Evict down to 90% of the limit so eviction does not run on every write
+        evict, evicted = total - 0.9 * limit, 0
+        for old_key, size in conn.execute("SELECT key, size FROM completion_cache ORDER BY used_at").fetchall():
+            if evicted >= evict:
+                break
+            conn.execute("DELETE FROM completion_cache WHERE key = ?", (old_key,))
+            evicted += size
+        logging.info(f"Completion cache evicted {evicted / 1024:.0f} KB")
+    except sqlite3.Error as e:
+        logging.error(f"Completion cache write error: {str(e)}")
+
+
+def spill_text(key: str, value: str):
+    """Keep a long session string in the store under its content hash, dropping long-unused ones"""
+    conn = get_connection()
+    now = time.time()
+    updated = conn.execute("UPDATE spilled_text SET used_at = ? WHERE key = ?", (now, key)).rowcount
+    if not updated:
+        conn.execute(
+            "INSERT OR REPLACE INTO spilled_text (key, value, used_at) VALUES (?, ?, ?)",
+            (key, zlib.compress(value.encode("utf-8")), now)
+        )
+        conn.execute("DELETE FROM spilled_text WHERE used_at < ?", (now - SESSION_SPILL_TTL,))
+
+
+def load_spilled_text(key: str) -> str:
+    """Read back a string stored with spill_text()"""
+    row = get_connection().execute("SELECT value FROM spilled_text WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        raise KeyError(f"Spilled text {key} is no longer in the store")
+    return zlib.decompress(row[0]).decode("utf-8")
+
+
+def put_prewarmed_topic(key: str, prompt: str, topic: str, prefetched: Dict[str, Any]):
+    """Store a prewarmed topic statement and its first-round research, dropping expired ones"""
+    conn = get_connection()
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO prewarmed_topics (key, prompt, topic, prefetched, created_at) VALUES (?, ?, ?, ?, ?)",
+        (key, prompt, topic, json.dumps(prefetched), now)
+    )
+    conn.execute("DELETE FROM prewarmed_topics WHERE created_at < ?", (now - PREWARM_TTL,))
+
+
+def get_prewarmed_topic(key: str) -> Optional[Dict[str, Any]]:
+    """Return an unexpired prewarmed topic ("prompt", "topic" and "prefetched") by its normalized prompt"""
+    row = get_connection().execute(
+        "SELECT prompt, topic, prefetched FROM prewarmed_topics WHERE key = ? AND created_at >= ?",
+        (key, time.time() - PREWARM_TTL)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"prompt": row[0], "topic": row[1], "prefetched": json.loads(row[2])}
+
+
+def list_prewarmed_prompts() -> List[str]:
+    """Prompts with an unexpired prewarmed topic, newest first"""
+    rows = get_connection().execute(
+        "SELECT prompt FROM prewarmed_topics WHERE created_at >= ? ORDER BY created_at DESC",
+        (time.time() - PREWARM_TTL,)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def acquire_rate_limit(name: str) -> float:
+    """
+    Block until the shared token bucket for an endpoint admits one call
+    
+    Args:
+        name: Endpoint name from config.index.RATE_LIMITS ("web_search" or "chat")
+    
+    Returns:
+        Seconds spent waiting
+    """
+    per_minute = RATE_LIMITS.get(name, 0)
+    if per_minute <= 0:
+        return 0.0
+    
+    refill_per_second = per_minute / 60
+    waited = 0.0
+    while True:
+        conn = get_connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (name,)).fetchone()
+            tokens = RATE_LIMIT_BURST if row is None else min(RATE_LIMIT_BURST, row[0] + (now - row[1]) * refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                delay = 0.0
+            else:
+                delay = (1 - tokens) / refill_per_second
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, tokens, now)
+            )
+        finally:
+            conn.execute("COMMIT")
+        
+        if delay == 0.0:
+            if waited:
+                logging.info(f"Rate limiter: waited {waited:.2f}s for {name}")
+            metrics.rate_limit_wait.observe(waited, endpoint=name)
+            return waited
+        time.sleep(delay)
+        waited += delay
+
+
+def enqueue_job(kind: str, payload: Dict[str, Any]) -> str:
+    """Add a debate step to the shared queue and return its job ID"""
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    get_connection().execute(
+        "INSERT INTO debate_jobs (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+        (job_id, kind, json.dumps(payload), now, now)
+    )
+    return job_id
+
+
+def claim_job(worker: str) -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the oldest queued job for a worker
+    
+    A running job whose lease has expired belonged to a worker that died, so it is
+    taken again, or failed once it has been attempted JOB_MAX_ATTEMPTS times. Steps
+    are idempotent per debate node, so a rerun reuses whatever the lost worker saved.
+    """
+    conn = get_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        now = time.time()
+        conn.execute(
+            "UPDATE debate_jobs SET status = 'failed', error = ?, updated_at = ? "
+            "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+            (f"Worker lost {JOB_MAX_ATTEMPTS} times while running the job", now, now, JOB_MAX_ATTEMPTS)
+        )
+        row = conn.execute(
+            "SELECT id, kind, payload, status, worker FROM debate_jobs "
+            "WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+            (now,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[3] == "running":
+            logging.warning(f"Reclaiming debate job {row[0]} from {row[4]}, whose lease expired")
+        conn.execute(
+            "UPDATE debate_jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (worker, now + JOB_LEASE_SECONDS, now, row[0])
+        )
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2])}
+    finally:
+        conn.execute("COMMIT")
+
+
+def renew_job_lease(job_id: str, worker: str) -> bool:
+    """Extend a running job's lease; False if the worker no longer holds it"""
+    now = time.time()
+    return get_connection().execute(
+        "UPDATE debate_jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+        (now + JOB_LEASE_SECONDS, now, job_id, worker)
+    ).rowcount > 0
+
+
+def finish_job(job_id: str, worker: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> bool:
+    """Record a job's result, or its error; False if the worker no longer holds the job"""
+    return get_connection().execute(
+        "UPDATE debate_jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+        ("failed" if error else "done", json.dumps(result) if result is not None else None, error, time.time(), job_id, worker)
+    ).rowcount > 0
+
+
+def job_counts() -> Dict[str, int]:
+    """Number of jobs in the shared queue by status"""
+    rows = get_connection().execute("SELECT status, COUNT(*) FROM debate_jobs GROUP BY status").fetchall()
+    return {status: count for status, count in rows}
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return a job's status, result and error"""
+    row = get_connection().execute(
+        "SELECT status, result, error FROM debate_jobs WHERE id = ?", (job_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"id": job_id, "status": row[0], "result": json.loads(row[1]) if row[1] else None, "error": row[2]}
+
+
+def wait_for_job(job_id: str, timeout: float, poll_interval: float = 0.5) -> Dict[str, Any]:
+    """Poll the queue until a job finishes, raising on failure or timeout"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = get_job(job_id)
+        if job and job["status"] == "done":
+            return job["result"]
+        if job and job["status"] == "failed":
+            raise RuntimeError(job["error"])
+        time.sleep(poll_interval)
+    raise TimeoutError(f"Debate job {job_id} did not finish within {timeout:.0f}s")
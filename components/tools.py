@@ -1,10 +1,611 @@
-from openai import OpenAI
+import hashlib
+import json
 import logging
-from config.index import MODEL
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import openai
+from config.index import (
+    get_node_config,
+    SINGLEFLIGHT_DB,
+    SINGLEFLIGHT_LEASE_SECONDS,
+    HEDGE_REQUESTS,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    COMPLETION_CACHE,
+    RESEARCH_CACHE_TTL,
+    ADAPTIVE_CONCURRENCY,
+    ADAPTIVE_INITIAL_CONCURRENCY,
+    ADAPTIVE_MIN_CONCURRENCY,
+    ADAPTIVE_MAX_CONCURRENCY,
+    ADAPTIVE_BACKOFF,
+    ADAPTIVE_LATENCY_SPIKE,
+    API_MAX_RETRIES,
+    API_RETRY_BACKOFF_SECONDS,
+    PROVIDERS,
+    RETRIEVAL_TOP_K
+)
+from components import metrics
+from components.profiling import profiled, span
+from components.providers import get_client, supports_web_search, provider_endpoint
+from components.retrieval import retriever, RETRIEVAL_KEY_PREFIX
+from components.usage import record_call, get_token_counts
+from components.shared_store import (
+    get_cached_research,
+    put_cached_research,
+    get_cached_completion,
+    put_cached_completion,
+    acquire_rate_limit
+)
 
-client = OpenAI()
+client = get_client("openai")
 
-def openai_web_search(query: str, perspective: str = "", context: str = "") -> str:
+ResearchListener = Callable[[Dict[str, Any]], None]
+
+_research_listener: ContextVar[Optional[ResearchListener]] = ContextVar("research_listener", default=None)
+_fresh_completions: ContextVar[bool] = ContextVar("fresh_completions", default=False)
+_stream_tokens: ContextVar[bool] = ContextVar("stream_tokens", default=False)
+
+
+@contextmanager
+def research_progress(listener: Optional[ResearchListener]) -> Iterator[None]:
+    """
+    Stream web-search progress events to a listener for every search in this context
+    
+    Events are dicts with a "type" of "search_started", "source_found" (with "url" and
+    "title"), "text_delta" (with "text"), "cache_hit" or "completed", plus the "node".
+    Inside stream_tokens(), chat completions also send "token" events (with "text").
+    """
+    token = _research_listener.set(listener)
+    try:
+        yield
+    finally:
+        _research_listener.reset(token)
+
+
+@contextmanager
+def stream_tokens() -> Iterator[None]:
+    """Stream chat completions in this context, sending their text to the research listener as "token" events"""
+    token = _stream_tokens.set(True)
+    try:
+        yield
+    finally:
+        _stream_tokens.reset(token)
+
+
+def chunk_research_stream(on_chunk: Callable[[str], None], listener: Optional[ResearchListener] = None) -> ResearchListener:
+    """Wrap a listener so each finished paragraph of partial research reaches on_chunk early"""
+    # Deltas of the unfinished paragraph; they are joined only when a paragraph ends
+    parts: List[str] = []
+    
+    def handle(event: Dict[str, Any]):
+        if listener:
+            listener(event)
+        if event["type"] == "text_delta":
+            delta = event["text"]
+            if "\n\n" not in (parts[-1][-1:] if parts else "") + delta:
+                parts.append(delta)
+                return
+            *paragraphs, rest = "".join(parts + [delta]).split("\n\n")
+            parts[:] = [rest] if rest else []
+            for paragraph in paragraphs:
+                if paragraph.strip():
+                    on_chunk(paragraph)
+        elif event["type"] == "completed" and parts:
+            rest = "".join(parts)
+            parts.clear()
+            if rest.strip():
+                on_chunk(rest)
+    
+    return handle
+
+
+def _emit(listener: Optional[ResearchListener], event: Dict[str, Any]):
+    if listener is None:
+        return
+    try:
+        listener(event)
+    except Exception as e:
+        logging.error(f"Research listener error: {str(e)}")
+
+
+def research_relay() -> Tuple[Optional[ResearchListener], Callable[[], None]]:
+    """
+    Prepare this context's research listener for searches made on pool threads
+    
+    Returns a listener to install on the pool threads with research_progress(), which
+    only queues events, and a drain function that delivers the queued events to the
+    original listener. Call drain from this thread while waiting on the pool.
+    """
+    listener = _research_listener.get()
+    if listener is None:
+        return None, lambda: None
+    relay: queue.Queue = queue.Queue()
+    
+    def drain():
+        while not relay.empty():
+            _emit(listener, relay.get_nowait())
+    
+    return relay.put, drain
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent calls so that all callers share one in-flight result
+    
+    Within a process, callers with the same key wait on the first caller's thread.
+    When lease_db is set, processes additionally coordinate through a SQLite lease:
+    one process runs the call and publishes the JSON-encoded result, the others poll for it.
+    """
+    
+    def __init__(self, lease_db: Optional[str] = None, lease_seconds: float = 180.0,
+                 poll_interval: float = 0.25, result_ttl: float = 60.0):
+        self.lease_db = lease_db
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"calls": 0, "shared_in_process": 0, "shared_cross_process": 0}
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key at a time and hand its result to every concurrent caller"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+        
+        if not leader:
+            flight.done.wait()
+            with self._lock:
+                self.stats["shared_in_process"] += 1
+            logging.info(f"Single-flight: joined in-flight call for {key[:80]}")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = self._run_leased(key, fn) if self.lease_db else self._run(fn)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+    
+    def _run(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats["calls"] += 1
+        return fn()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.lease_db, timeout=30, isolation_level=None)
+        conn.execute("CREATE TABLE IF NOT EXISTS flight_leases (key TEXT PRIMARY KEY, owner TEXT, expires_at REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS flight_results (key TEXT PRIMARY KEY, value TEXT, created_at REAL)")
+        return conn
+    
+    def _try_acquire(self, conn: sqlite3.Connection, key: str) -> bool:
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT expires_at FROM flight_leases WHERE key = ?", (key,)).fetchone()
+            if row and row[0] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO flight_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + self.lease_seconds)
+            )
+            return True
+        finally:
+            conn.execute("COMMIT")
+    
+    def _shared_result(self, conn: sqlite3.Connection, key: str, since: float) -> Optional[tuple]:
+        """(result,) if another process finished the call since the given time, else None"""
+        row = conn.execute(
+            "SELECT value FROM flight_results WHERE key = ? AND created_at >= ?",
+            (key, since)
+        ).fetchone()
+        if not row:
+            return None
+        with self._lock:
+            self.stats["shared_cross_process"] += 1
+        logging.info(f"Single-flight: shared result from another process for {key[:80]}")
+        return (json.loads(row[0]),)
+    
+    def _run_leased(self, key: str, fn: Callable[[], Any]) -> Any:
+        conn = self._connect()
+        try:
+            waiting_since = time.time()
+            while not self._try_acquire(conn, key):
+                time.sleep(self.poll_interval)
+                shared = self._shared_result(conn, key, waiting_since)
+                if shared:
+                    return shared[0]
+            
+            try:
+                # The leader may have finished and released the lease since the last poll
+                shared = self._shared_result(conn, key, waiting_since)
+                if shared:
+                    return shared[0]
+                result = self._run(fn)
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO flight_results (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), now)
+                )
+                conn.execute("DELETE FROM flight_results WHERE created_at < ?", (now - self.result_ttl,))
+                return result
+            finally:
+                conn.execute("DELETE FROM flight_leases WHERE key = ? AND owner = ?", (key, self._owner))
+        finally:
+            conn.close()
+
+
+research_flight = SingleFlight(lease_db=SINGLEFLIGHT_DB, lease_seconds=SINGLEFLIGHT_LEASE_SECONDS)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a node's API call does not finish before its deadline"""
+
+
+class LatencyTracker:
+    """Recent per-node latencies plus hedging and deadline counters"""
+    
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+    
+    def observe(self, node: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(node, deque(maxlen=self.window)).append(seconds)
+    
+    def percentile(self, node: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(node, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+    
+    def count(self, node: str, field: str, amount: float = 1):
+        with self._lock:
+            stats = self._stats.setdefault(node, {
+                "calls": 0, "hedged": 0, "hedge_wins": 0, "saved_seconds": 0.0, "deadline_exceeded": 0
+            })
+            stats[field] += amount
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Hedge rate, tail-latency savings and latency percentiles per node"""
+        with self._lock:
+            nodes = {node: dict(stats) for node, stats in self._stats.items()}
+        for node, stats in nodes.items():
+            stats["hedge_rate"] = round(stats["hedged"] / stats["calls"], 3) if stats["calls"] else 0.0
+            stats["saved_seconds"] = round(stats["saved_seconds"], 2)
+            for pct in (50, 95, 99):
+                value = self.percentile(node, pct)
+                stats[f"p{pct}"] = round(value, 2) if value is not None else None
+        return nodes
+
+
+latency_tracker = LatencyTracker()
+metrics.register_collector(
+    "debate_hedge_events_total", "Hedged calls, hedge wins and deadline fallbacks by pipeline node", "counter",
+    lambda: [
+        ("debate_hedge_events_total", {"node": node, "event": event}, stats[event])
+        for node, stats in latency_tracker.report().items()
+        for event in ("hedged", "hedge_wins", "deadline_exceeded")
+    ]
+)
+def _start_attempt(work: Callable[[], Any]) -> Future:
+    """Run work on its own thread right away, so a queue never eats into the call's deadline"""
+    future: Future = Future()
+    
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(work())
+            except BaseException as e:
+                future.set_exception(e)
+    
+    threading.Thread(target=run, name="hedged_call", daemon=True).start()
+    return future
+
+
+def hedged_call(node: str, fn: Callable[[], Any], deadline: Optional[float] = None,
+                on_result: Optional[Callable[[Any, float], None]] = None) -> Any:
+    """
+    Run an API call under a deadline, hedging it with a duplicate when it runs slow
+    
+    Args:
+        node: Pipeline node, used for its latency history and counters
+        fn: The call to make; it must be safe to issue twice
+        deadline: Seconds from the first attempt's start before giving up with DeadlineExceeded (None waits indefinitely)
+        on_result: Called with the result and its seconds for every attempt that completes,
+            including one that loses the hedge or finishes after the deadline, so each is paid for
+    
+    Returns:
+        The result of whichever attempt finished first
+    """
+    hedge_after = latency_tracker.percentile(node, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES) if HEDGE_REQUESTS else None
+    latency_tracker.count(node, "calls")
+    
+    if deadline is None and hedge_after is None:
+        started = time.perf_counter()
+        with span(f"api:{node}"):
+            result = fn()
+        seconds = time.perf_counter() - started
+        latency_tracker.observe(node, seconds)
+        if on_result is not None:
+            on_result(result, seconds)
+        return result
+    
+    # Attempts run on their own threads, so research events are relayed back to this thread
+    relay, drain = research_relay()
+    started_at: List[float] = []
+    
+    def submit(attempt: int) -> Future:
+        def run():
+            attempt_started = time.perf_counter()
+            if attempt == 0:
+                started_at.append(attempt_started)
+            _research_listener.set(relay if attempt == 0 else None)
+            with span(f"api:{node}"):
+                result = fn()
+            if on_result is not None:
+                on_result(result, time.perf_counter() - attempt_started)
+            return result
+        context = copy_context()
+        return _start_attempt(lambda: context.run(run))
+    
+    attempts = [submit(0)]
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        # The clock starts once the first attempt is running
+        started = started_at[0] if started_at else time.perf_counter()
+        elapsed = time.perf_counter() - started
+        if deadline is not None and elapsed >= deadline:
+            latency_tracker.count(node, "deadline_exceeded")
+            drain()
+            raise DeadlineExceeded(f"{node} call exceeded its {deadline:g}s deadline")
+        if hedge_after is not None and len(attempts) == 1 and elapsed >= hedge_after:
+            logging.info(f"Hedging {node} call after {elapsed:.1f}s (p{HEDGE_PERCENTILE:.0f} is {hedge_after:.1f}s)")
+            latency_tracker.count(node, "hedged")
+            attempts.append(submit(1))
+            pending.add(attempts[1])
+        
+        timeout = 0.1
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - elapsed))
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        drain()
+        for future in done:
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            finished = time.perf_counter() - started
+            latency_tracker.observe(node, finished)
+            if len(attempts) > 1 and future is attempts[1]:
+                latency_tracker.count(node, "hedge_wins")
+                attempts[0].add_done_callback(
+                    lambda _: latency_tracker.count(node, "saved_seconds", time.perf_counter() - started - finished)
+                )
+            return future.result()
+    
+    raise error if error else RuntimeError(f"{node} call failed")
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Check whether an API error is a 429 Too Many Requests"""
+    return getattr(error, "status_code", None) == 429
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Check whether an API call timed out, in the SDK or at its node's deadline"""
+    return isinstance(error, (openai.APITimeoutError, DeadlineExceeded))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check whether a failed API call is worth retrying: 408, 409, 429, 5xx, timeouts and connection errors"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    status = getattr(error, "status_code", None)
+    return isinstance(error, openai.APIConnectionError) or status in (408, 409, 429) or (status is not None and status >= 500)
+
+
+def retry_delay(error: BaseException, attempt: int) -> float:
+    """Seconds to wait before retry number attempt (from 0): the server's Retry-After, or jittered exponential backoff"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        retry_after = float(headers.get("retry-after", ""))
+        if 0 < retry_after <= 60:
+            return retry_after
+    except ValueError:
+        pass
+    return API_RETRY_BACKOFF_SECONDS * 2 ** attempt * random.uniform(0.75, 1.25)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one OpenAI endpoint
+    
+    Calls wait for a slot while the limit is reached. Once a full window of calls
+    (as many as the limit) has finished at the limit without a 429 or latency spike,
+    the limit grows by one; a 429, a timeout, or a call slower than ADAPTIVE_LATENCY_SPIKE
+    times its node's median latency, multiplies it by ADAPTIVE_BACKOFF. Calls started before
+    a decrease cannot trigger another one, so a burst of 429s backs off only once.
+    """
+    
+    def __init__(self, name: str, initial: int = ADAPTIVE_INITIAL_CONCURRENCY, minimum: int = ADAPTIVE_MIN_CONCURRENCY,
+                 maximum: int = ADAPTIVE_MAX_CONCURRENCY, backoff: float = ADAPTIVE_BACKOFF,
+                 spike_ratio: float = ADAPTIVE_LATENCY_SPIKE, history: int = 200):
+        self.name = name
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.backoff = backoff
+        self.spike_ratio = spike_ratio
+        self.inflight = 0
+        self.history: deque = deque([(time.time(), int(self.limit), "initial")], maxlen=history)
+        self.stats = {"calls": 0, "increases": 0, "rate_limited": 0, "timeouts": 0, "latency_spikes": 0, "wait_seconds": 0.0}
+        self._cond = threading.Condition()
+        self._epoch = 0
+        self._window = 0
+        self._saturated = False
+    
+    @contextmanager
+    def slot(self, node: str) -> Iterator[None]:
+        """Hold one unit of concurrency for an API call made for node"""
+        waited = time.perf_counter()
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._saturated = True
+                self._cond.wait()
+            self.inflight += 1
+            if self.inflight >= int(self.limit):
+                self._saturated = True
+            epoch = self._epoch
+            self.stats["calls"] += 1
+            self.stats["wait_seconds"] += time.perf_counter() - waited
+        
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self._release(node, epoch, None, "rate_limited" if is_rate_limited(e) else "timeouts" if is_timeout(e) else None)
+            raise
+        self._release(node, epoch, time.perf_counter() - started, None)
+    
+    def _release(self, node: str, epoch: int, latency: Optional[float], overload: Optional[str]):
+        """Free a slot; overload is the stats counter ("rate_limited" or "timeouts") of a failure that backs off"""
+        median = latency_tracker.percentile(node, 50, HEDGE_MIN_SAMPLES) if latency is not None else None
+        if median is not None and latency is not None and latency > median * self.spike_ratio:
+            overload = "latency_spikes"
+        with self._cond:
+            self.inflight -= 1
+            if overload:
+                if epoch == self._epoch:
+                    self.stats[overload] += 1
+                    reason = {"rate_limited": "429", "timeouts": f"{node} timeout", "latency_spikes": f"{node} latency spike"}[overload]
+                    self._set_limit(max(self.minimum, self.limit * self.backoff), reason)
+            elif latency is not None:
+                self._window += 1
+                if self._window >= int(self.limit) and self._saturated and self.limit < self.maximum:
+                    self.stats["increases"] += 1
+                    self._set_limit(self.limit + 1, "window ok")
+            self._cond.notify_all()
+    
+    def _set_limit(self, limit: float, reason: str):
+        previous = int(self.limit)
+        self.limit = limit
+        self._epoch += 1
+        self._window = 0
+        self._saturated = False
+        self.history.append((time.time(), int(limit), reason))
+        if int(limit) != previous:
+            log = logging.warning if int(limit) < previous else logging.info
+            log(f"Adaptive concurrency: {self.name} limit {previous} -> {int(limit)} ({reason})")
+    
+    def report(self) -> Dict[str, Any]:
+        """Current limit, in-flight calls, counters and the history of limit changes"""
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "inflight": self.inflight,
+                **self.stats,
+                "wait_seconds": round(self.stats["wait_seconds"], 2),
+                "history": [{"at": at, "limit": limit, "reason": reason} for at, limit, reason in self.history],
+            }
+
+
+concurrency_limiters = {
+    name: AdaptiveLimiter(name)
+    for name in [provider_endpoint(provider, "chat") for provider in PROVIDERS]
+    + [provider_endpoint(provider, "web_search") for provider in PROVIDERS if PROVIDERS[provider]["web_search"]]
+}
+
+
+@contextmanager
+def concurrency_slot(endpoint: str, node: str) -> Iterator[None]:
+    """Hold a slot of the endpoint's adaptive concurrency limit, unless ADAPTIVE_CONCURRENCY is off"""
+    if not ADAPTIVE_CONCURRENCY:
+        yield
+        return
+    with concurrency_limiters[endpoint].slot(node):
+        yield
+
+
+def with_retries(endpoint: str, node: str, call: Callable[[], Any]) -> Any:
+    """
+    Make an API call within the endpoint's rate and concurrency limits, retrying retryable failures
+    
+    Each attempt waits for the rate limit and takes its own concurrency slot, so the
+    adaptive limit backs off on a 429 or timeout before the retry is sent. Gives up
+    after API_MAX_RETRIES retries.
+    """
+    attempt = 0
+    while True:
+        acquire_rate_limit(endpoint)
+        try:
+            with concurrency_slot(endpoint, node):
+                return call()
+        except Exception as e:
+            if attempt >= API_MAX_RETRIES or not is_retryable(e):
+                raise
+            delay = retry_delay(e, attempt)
+            logging.warning(f"Retrying {node} call on {endpoint} in {delay:.1f}s after {type(e).__name__}: {str(e)}")
+            time.sleep(delay)
+            attempt += 1
+
+
+def concurrency_report() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.report() for name, limiter in concurrency_limiters.items()}
+
+
+metrics.register_collector(
+    "debate_adaptive_concurrency_limit", "Current adaptive concurrency limit by OpenAI endpoint", "gauge",
+    lambda: [
+        ("debate_adaptive_concurrency_limit", {"endpoint": name}, limiter.limit)
+        for name, limiter in concurrency_limiters.items()
+    ] if ADAPTIVE_CONCURRENCY else []
+)
+
+
+# Whether any research node is routed to a provider without web search
+_LOCAL_RETRIEVAL = any(not supports_web_search(get_node_config(node)["provider"]) for node in ("research", "fact_check"))
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a research query for deduplication (case and whitespace insensitive)"""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+@profiled("web_search")
+def openai_web_search(query: str, perspective: str = "", context: str = "", node: str = "research",
+                      on_event: Optional[ResearchListener] = None, fallback: Optional[str] = None) -> str:
     """
     Conduct web search using OpenAI's web_search_preview tool
     
@@ -12,23 +613,81 @@ def openai_web_search(query: str, perspective: str = "", context: str = "") -> s
         query: The main search query
         perspective: Additional perspective to add to search (e.g., "PRO benefits advantages")
         context: Additional context for the search (e.g., "round 1 evidence statistics")
+        node: Pipeline node the search runs for, selects model routing in config.index
+        on_event: Progress listener; defaults to the one installed with research_progress().
+            When a listener is present the response is streamed.
+        fallback: Research to use if the node's deadline passes and nothing is cached,
+            e.g. the previous round's research
     
     Returns:
         Formatted research findings as a string
     """
+    listener = on_event or _research_listener.get()
+    flight_key = None
     try:
-        full_query = f"{query}"
-        if perspective:
-            full_query += f" {perspective}"
-        if context:
-            full_query += f" {context}"
-        
-        full_query += " 2024 2025 latest research statistics current"
+        node_config = get_node_config(node)
+        full_query, request = build_research_request(query, perspective, context, node_config)
         
-        response = client.responses.create(
-            model=MODEL,
-            tools=[{"type": "web_search_preview"}],
-            input=f"""Research this topic thoroughly: {full_query}
+        flight_key = f"{node_config['model']}|{normalize_query(full_query)}"
+        if not supports_web_search(node_config["provider"]):
+            flight_key = RETRIEVAL_KEY_PREFIX + flight_key
+        result = research_flight.do(
+            flight_key, lambda: _cached_web_search(flight_key, node_config, full_query, request, listener)
+        )
+        _emit(listener, {"type": "completed", "node": node, "chars": len(result)})
+        return result
+    
+    except DeadlineExceeded as e:
+        stale = get_cached_research(flight_key, allow_stale=True) if flight_key else None
+        if stale or fallback:
+            logging.warning(f"{str(e)}; using {'cached' if stale else 'previous'} research instead")
+            return stale or fallback
+        logging.error(f"Web search error: {str(e)}")
+        return f"Web search temporarily unavailable. Proceeding with available knowledge. Error: {str(e)}"
+            
+    except Exception as e:
+        logging.error(f"Web search error: {str(e)}")
+        return f"Web search temporarily unavailable. Proceeding with available knowledge. Error: {str(e)}"
+
+def _cached_web_search(key: str, node_config: dict, query: str, request: dict,
+                       listener: Optional[ResearchListener] = None) -> str:
+    """Serve a research request from the shared cache, searching on a miss"""
+    cached = get_cached_research(key)
+    if RESEARCH_CACHE_TTL > 0:
+        metrics.cache_requests.inc(cache="research", result="miss" if cached is None else "hit")
+    if cached is not None:
+        logging.info(f"Research cache hit for {key[:80]}")
+        _emit(listener, {"type": "cache_hit", "node": node_config["node"]})
+        return cached
+    if supports_web_search(node_config["provider"]):
+        if _LOCAL_RETRIEVAL and RESEARCH_CACHE_TTL > 0:
+            # Nodes researching through retrieval can use this search's paragraphs before it finishes
+            source = f"research in progress: {query[:80]}"
+            listener = chunk_research_stream(lambda paragraph: retriever.add_live(key, source, paragraph), listener)
+        try:
+            result = _run_web_search(node_config, request, listener)
+        except Exception:
+            retriever.drop_live(key)
+            raise
+    else:
+        result = _run_local_research(node_config, query, listener)
+    put_cached_research(key, result)
+    return result
+
+def build_research_request(query: str, perspective: str, context: str, node_config: dict) -> tuple:
+    """Build the full search query and the Responses API request body for a web search"""
+    full_query = f"{query}"
+    if perspective:
+        full_query += f" {perspective}"
+    if context:
+        full_query += f" {context}"
+    
+    full_query += " 2024 2025 latest research statistics current"
+    
+    request = dict(
+        model=node_config["model"],
+        tools=[{"type": "web_search_preview"}],
+        input=f"""Research this topic thoroughly: {full_query}
 
 Please provide comprehensive, current information including:
 - Current statistics and data points
@@ -38,37 +697,203 @@ Please provide comprehensive, current information including:
 - Evidence-based insights
 
 Format your response as structured research findings with clear sections and specific data points."""
-        )
-        
-        if hasattr(response, 'output_text') and response.output_text:
-            return response.output_text
-        elif hasattr(response, 'content'):
-            return str(response.content)
-        else:
-            return "Research completed but no specific data retrieved."
-            
-    except Exception as e:
-        logging.error(f"Web search error: {str(e)}")
-        return f"Web search temporarily unavailable. Proceeding with available knowledge. Error: {str(e)}"
+    )
+    if node_config["max_tokens"]:
+        request["max_output_tokens"] = node_config["max_tokens"]
+    if node_config["temperature"] is not None:
+        request["temperature"] = node_config["temperature"]
+    return full_query, request
+
+def _run_web_search(node_config: dict, request: dict,
+                    listener: Optional[ResearchListener] = None) -> str:
+    """Issue one web_search_preview request, streaming it when a listener is present, and record its usage"""
+    request = dict(request)
+    deadline = node_config["deadline"]
+    if deadline:
+        request["timeout"] = deadline
+    
+    def record(result: tuple, seconds: float):
+        prompt_tokens, completion_tokens = get_token_counts(result[1])
+        record_call(node_config["node"], node_config["tier"], node_config["model"], seconds,
+                    prompt_tokens, completion_tokens, web_search_calls=1)
+    
+    def search() -> tuple:
+        with metrics.track_inflight("openai_web_search"):
+            if listener is not None:
+                with research_progress(listener):
+                    return hedged_call(
+                        node_config["node"],
+                        lambda: _stream_web_search(get_client(node_config["provider"]), request, node_config["node"], _research_listener.get()),
+                        deadline, record
+                    )
+            return hedged_call(
+                node_config["node"], lambda: (None, get_client(node_config["provider"]).responses.create(**request)), deadline, record
+            )
+    
+    text, response = with_retries(provider_endpoint(node_config["provider"], "web_search"), node_config["node"], search)
+    
+    if text:
+        return text
+    elif hasattr(response, 'output_text') and response.output_text:
+        return response.output_text
+    elif hasattr(response, 'content'):
+        return str(response.content)
+    else:
+        return "Research completed but no specific data retrieved."
+
+def _stream_web_search(provider_client: Any, request: dict, node: str, listener: ResearchListener) -> tuple:
+    """Consume a streamed Responses API call, forwarding progress events as they arrive"""
+    parts = []
+    final_response = None
+    for event in provider_client.responses.create(**request, stream=True):
+        event_type = getattr(event, "type", "")
+        if event_type == "response.web_search_call.in_progress":
+            _emit(listener, {"type": "search_started", "node": node})
+        elif event_type == "response.output_text.annotation.added":
+            annotation = getattr(event, "annotation", None) or {}
+            get = annotation.get if isinstance(annotation, dict) else lambda name: getattr(annotation, name, None)
+            if get("url"):
+                _emit(listener, {"type": "source_found", "node": node, "url": get("url"), "title": get("title") or get("url")})
+        elif event_type == "response.output_text.delta":
+            parts.append(event.delta)
+            _emit(listener, {"type": "text_delta", "node": node, "text": event.delta})
+        elif event_type == "response.completed":
+            final_response = event.response
+    return "".join(parts), final_response
+
+def _run_local_research(node_config: dict, query: str, listener: Optional[ResearchListener] = None) -> str:
+    """Research for a provider without web search: the best local passages, summarized by the node's model"""
+    passages = retriever.search(query, RETRIEVAL_TOP_K)
+    for passage in passages:
+        _emit(listener, {"type": "source_found", "node": node_config["node"], "url": passage["source"], "title": passage["source"]})
+    if passages:
+        sources = "\n\n".join(f"[{i + 1}] {passage['source']}\n{passage['text']}" for i, passage in enumerate(passages))
+    else:
+        sources = "No local sources matched this topic. Say so, and rely on well-established knowledge only."
+    
+    request = build_chat_request([
+        {"role": "system", "content": "You are a research assistant without web access. Base your findings on the numbered sources provided and cite them by number."},
+        {"role": "user", "content": f"""Research this topic thoroughly: {query}
 
-def get_simple_llm_response(messages: list) -> str:
+Sources:
+{sources}
+
+Format your response as structured research findings with clear sections and specific data points."""}
+    ], node_config)
+    response = _complete(node_config, request)
+    text = response.choices[0].message.content or "Research completed but no specific data retrieved."
+    _emit(listener, {"type": "text_delta", "node": node_config["node"], "text": text})
+    return text
+
+def build_chat_request(messages: list, node_config: dict) -> dict:
+    """Build the Chat Completions request body for a node"""
+    return dict(
+        model=node_config["model"],
+        messages=messages,
+        temperature=node_config["temperature"] if node_config["temperature"] is not None else 0.7,
+        max_tokens=node_config["max_tokens"] or 2000
+    )
+
+def _complete(node_config: dict, request: dict, stream: bool = False) -> Any:
+    """
+    Send a chat request to the node's provider within its rate and concurrency limits, and record its usage
+    
+    With stream, the completion is streamed and its tokens go to the research listener.
+    """
+    node = node_config["node"]
+    request = dict(request)
+    if node_config["deadline"]:
+        request["timeout"] = node_config["deadline"]
+    provider_client = get_client(node_config["provider"])
+    
+    def record(response: Any, seconds: float):
+        prompt_tokens, completion_tokens = get_token_counts(response)
+        record_call(node, node_config["tier"], node_config["model"], seconds, prompt_tokens, completion_tokens)
+    
+    def complete() -> Any:
+        with metrics.track_inflight("get_simple_llm_response"):
+            if stream and _research_listener.get() is not None:
+                return hedged_call(
+                    node, lambda: _stream_chat(provider_client, request, node, _research_listener.get()), node_config["deadline"], record
+                )
+            return hedged_call(node, lambda: provider_client.chat.completions.create(**request), node_config["deadline"], record)
+    
+    return with_retries(provider_endpoint(node_config["provider"], "chat"), node, complete)
+
+def _stream_chat(provider_client: Any, request: dict, node: str, listener: Optional[ResearchListener]) -> Any:
+    """Consume a streamed chat completion, forwarding its tokens, and return it shaped like a non-streamed one"""
+    parts = []
+    usage = None
+    for chunk in provider_client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True}):
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            _emit(listener, {"type": "token", "node": node, "text": chunk.choices[0].delta.content})
+        if getattr(chunk, "usage", None):
+            usage = chunk.usage
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="".join(parts)))], usage=usage)
+
+@contextmanager
+def fresh_completions() -> Iterator[None]:
+    """Skip completion cache lookups in this context, so regenerating a node gives a new completion"""
+    token = _fresh_completions.set(True)
+    try:
+        yield
+    finally:
+        _fresh_completions.reset(token)
+
+def completion_cache_key(request: dict) -> str:
+    """Hash the parts of a chat request that determine its completion"""
+    return hashlib.sha256(json.dumps(
+        [request["model"], request["messages"], request["temperature"], request["max_tokens"]],
+        sort_keys=True, ensure_ascii=False
+    ).encode("utf-8")).hexdigest()
+
+@profiled("chat")
+def get_simple_llm_response(messages: list, node: str = "default", tier: Optional[str] = None,
+                            temperature: Optional[float] = None) -> str:
     """
     Get a simple LLM response without web search for fallback cases
     
     Args:
         messages: List of message dictionaries
+        node: Pipeline node the call runs for, selects model, temperature and max_tokens
+        tier: Force a model tier (e.g. "fast") instead of the node's configured one
+        temperature: Override the node's configured temperature
     
     Returns:
         String response from the model
     """
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000
-        )
-        return response.choices[0].message.content
+        node_config = get_node_config(node, tier)
+        if temperature is not None:
+            node_config["temperature"] = temperature
+        if COMPLETION_CACHE == "deterministic":
+            node_config["temperature"] = 0.0
+        
+        request = build_chat_request(messages, node_config)
+        cache_key = completion_cache_key(request) if COMPLETION_CACHE != "off" else None
+        if cache_key and not _fresh_completions.get():
+            cached = get_cached_completion(cache_key)
+            metrics.cache_requests.inc(cache="completion", result="miss" if cached is None else "hit")
+            if cached is not None:
+                logging.info(f"[{node_config['tier']}] {node} via {node_config['model']}: completion cache hit")
+                if _stream_tokens.get():
+                    _emit(_research_listener.get(), {"type": "token", "node": node, "text": cached})
+                return cached
+        
+        response = _complete(node_config, request, stream=_stream_tokens.get())
+        content = response.choices[0].message.content
+        if cache_key and content:
+            put_cached_completion(cache_key, content)
+        return content
     except Exception as e:
         logging.error(f"LLM response error: {str(e)}")
-        return f"Response generation failed: {str(e)}"
\ No newline at end of file
+        return f"Response generation failed: {str(e)}"
+
+def is_failed_response(content: str) -> bool:
+    """Check whether a get_simple_llm_response result is its failure fallback"""
+    return content.startswith("Response generation failed:")
+
+def is_failed_research(research: str) -> bool:
+    """Check whether an openai_web_search result is its failure fallback"""
+    return research.startswith("Web search temporarily unavailable")
@@ -0,0 +1,220 @@
+import io
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, IO
+from components.bots import get_content, get_participants, round_arguments, State
+from components.session_memory import spill_value, restore_value
+
+FORMATS = {
+    "txt": ("text/plain", "txt"),
+    "md": ("text/markdown", "md"),
+    "json": ("application/json", "json"),
+}
+
+
+class TranscriptExporter:
+    """
+    Builds a debate transcript incrementally as the topic, rounds and judgment arrive
+
+    The section list is the only copy of the transcript that is kept, with long texts
+    spilled to the shared store like the session's debate state, so reruns that call
+    sync() with an unchanged state do no work and hold no rendered exports.
+    Exports are rendered section by section while they are read, through
+    iter_chunks(), write_to() or the file-like open().
+    """
+
+    def __init__(self, debate_id: str = ""):
+        self.debate_id = debate_id
+        self.created_at = datetime.now()
+        self.sections: List[Dict[str, Any]] = []
+        self._rounds_seen = 0
+        self._has_topic = False
+        self._has_judgment = False
+
+    def sync(self, state: State) -> bool:
+        """Append sections for anything new in the state; returns True if something was added"""
+        added = False
+        research = state.get("research", {})
+        timings = state.get("timings", {})
+
+        if not self._has_topic and state["topic"]:
+            self.sections.append(spill_value({
+                "kind": "topic",
+                "topic": get_content(state["topic"][-1]),
+                "research": research.get("topic"),
+                "seconds": timings.get("topic"),
+            }))
+            self._has_topic = added = True
+
+        for round_data in state["rounds"][self._rounds_seen:]:
+            round_number = round_data.get("round_number") or self._rounds_seen + 1
+            arguments = round_arguments(round_data)
+            self.sections.append(spill_value({
+                "kind": "round",
+                "round_number": round_number,
+                "arguments": [
+                    {
+                        "participant": participant["label"],
+                        "argument": arguments.get(participant["name"], ""),
+                        "research": research.get(f"{participant['name']}_{round_number}"),
+                        "seconds": timings.get(f"{participant['name']}_{round_number}"),
+                    }
+                    for participant in get_participants(state)
+                ],
+            }))
+            self._rounds_seen += 1
+            added = True
+
+        if not self._has_judgment and state["judge"]:
+            winner = state.get("winner")
+            self.sections.append(spill_value({
+                "kind": "judgment",
+                "judgment": get_content(state["judge"][-1]),
+                "winner": winner if winner and winner != "ERROR" else None,
+                "research": research.get("judge"),
+                "seconds": timings.get("judge"),
+                "panel": _panel_summary(state.get("judge_panel")),
+            }))
+            self._has_judgment = added = True
+
+        return added
+
+    def file_name(self, fmt: str) -> str:
+        return f"debate_transcript_{self.created_at.strftime('%Y%m%d_%H%M')}.{FORMATS[fmt][1]}"
+
+    def mime(self, fmt: str) -> str:
+        return FORMATS[fmt][0]
+
+    def iter_chunks(self, fmt: str) -> Iterator[str]:
+        """Yield the export one section at a time, rendering each section as it is reached"""
+        render = _RENDERERS[fmt]
+        if fmt == "json":
+            yield json.dumps({"debate_id": self.debate_id, "created_at": self.created_at.isoformat()})[:-1] + ', "sections": ['
+            for i, section in enumerate(self.sections):
+                yield ("," if i else "") + render(restore_value(section))
+            yield "]}"
+            return
+
+        if fmt == "md":
+            yield f"# AI Debate Transcript\n\n_{self.created_at.strftime('%Y-%m-%d %H:%M')}_\n"
+        else:
+            yield f"AI Debate Transcript - {self.created_at.strftime('%Y-%m-%d %H:%M')}\n"
+        for section in self.sections:
+            yield render(restore_value(section))
+
+    def write_to(self, stream: IO[str], fmt: str):
+        """Stream the export into a file-like object without building it in memory"""
+        for chunk in self.iter_chunks(fmt):
+            stream.write(chunk)
+
+    def open(self, fmt: str) -> "TranscriptReader":
+        """A binary file-like view of the export that renders sections only as they are read"""
+        return TranscriptReader(self, fmt)
+
+
+class TranscriptReader(io.RawIOBase):
+    """Read-only UTF-8 byte stream over TranscriptExporter.iter_chunks(); can only be rewound"""
+
+    def __init__(self, exporter: TranscriptExporter, fmt: str):
+        super().__init__()
+        self._exporter = exporter
+        self._fmt = fmt
+        self.seek(0)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if (offset, whence) != (0, io.SEEK_SET):
+            raise io.UnsupportedOperation("Transcript streams can only be rewound")
+        self._chunks = (chunk.encode("utf-8") for chunk in self._exporter.iter_chunks(self._fmt))
+        self._pending = b""
+        self._offset = 0
+        return 0
+
+    def readinto(self, buffer: Any) -> int:
+        while self._offset >= len(self._pending):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending, self._offset = chunk, 0
+        size = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:size] = self._pending[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+
+def _panel_summary(panel: Any) -> Any:
+    if not panel:
+        return None
+    return {
+        "votes": panel["votes"],
+        "agreement": panel["agreement"],
+        "early_exit": panel["early_exit"],
+        "verdicts": [{key: verdict[key] for key in ("judge", "tier", "focus", "winner", "seconds")} for verdict in panel["verdicts"]],
+    }
+
+
+def _votes(panel: Dict[str, Any], separator: str) -> str:
+    return separator.join(f"{label} {count}" for label, count in panel["votes"].items())
+
+
+def _seconds(value: Any) -> str:
+    return f"{value:.1f}s" if isinstance(value, (int, float)) else "n/a"
+
+
+def _render_txt(section: Dict[str, Any]) -> str:
+    if section["kind"] == "topic":
+        text = f"\nTOPIC: {section['topic']}\n"
+        if section["research"]:
+            text += f"\n--- Topic research ({_seconds(section['seconds'])}) ---\n{section['research']}\n"
+        return text
+    if section["kind"] == "round":
+        text = f"\n=== ROUND {section['round_number']} ===\n"
+        for entry in section["arguments"]:
+            text += f"\n{entry['participant']} ({_seconds(entry['seconds'])}):\n{entry['argument']}\n"
+        for entry in section["arguments"]:
+            if entry["research"]:
+                text += f"\n--- {entry['participant']} research ---\n{entry['research']}\n"
+        return text
+    text = f"\n=== JUDGMENT ({_seconds(section['seconds'])}) ===\n{section['judgment']}"
+    if section["winner"]:
+        text += f"\n\nWINNER: {section['winner']}"
+    if section["panel"]:
+        text += f"\nPANEL VOTES: {_votes(section['panel'], ' - ')}"
+    if section["research"]:
+        text += f"\n\n--- Fact-check research ---\n{section['research']}\n"
+    return text
+
+
+def _render_md(section: Dict[str, Any]) -> str:
+    if section["kind"] == "topic":
+        text = f"\n## Topic\n\n**{section['topic']}**\n"
+        if section["research"]:
+            text += f"\n<details><summary>Topic research ({_seconds(section['seconds'])})</summary>\n\n{section['research']}\n\n</details>\n"
+        return text
+    if section["kind"] == "round":
+        text = f"\n## Round {section['round_number']}\n"
+        for entry in section["arguments"]:
+            text += f"\n### {entry['participant']} ({_seconds(entry['seconds'])})\n\n{entry['argument']}\n"
+            if entry["research"]:
+                text += f"\n<details><summary>{entry['participant']} research</summary>\n\n{entry['research']}\n\n</details>\n"
+        return text
+    text = f"\n## Judgment ({_seconds(section['seconds'])})\n\n{section['judgment']}\n"
+    if section["winner"]:
+        text += f"\n**Winner: {section['winner']}**\n"
+    if section["panel"]:
+        text += f"\nPanel votes: {_votes(section['panel'], ' – ')} ({section['panel']['agreement']:.0%} agreement)\n"
+    if section["research"]:
+        text += f"\n<details><summary>Fact-check research</summary>\n\n{section['research']}\n\n</details>\n"
+    return text
+
+
+def _render_json(section: Dict[str, Any]) -> str:
+    return json.dumps(section, ensure_ascii=False)
+
+
+_RENDERERS = {"txt": _render_txt, "md": _render_md, "json": _render_json}
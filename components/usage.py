@@ -0,0 +1,122 @@
+import threading
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional
+from config.index import MODEL_PRICING, WEB_SEARCH_CALL_COST
+from components import metrics
+
+_lock = threading.Lock()
+_tiers: Dict[str, Dict[str, Any]] = {}
+_call_sinks: ContextVar[tuple] = ContextVar("call_sinks", default=())
+
+
+@contextmanager
+def track_calls() -> Iterator[List[Dict[str, Any]]]:
+    """Collect every API call recorded in this context (on this thread) into a list; contexts nest"""
+    calls: List[Dict[str, Any]] = []
+    token = _call_sinks.set(_call_sinks.get() + (calls,))
+    try:
+        yield calls
+    finally:
+        _call_sinks.reset(token)
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int, web_search_calls: int = 0) -> float:
+    """Estimate the USD cost of a call from the configured price table"""
+    input_price, output_price = MODEL_PRICING.get(model or "", (0.0, 0.0))
+    if (input_price, output_price) == (0.0, 0.0) and model:
+        # Dated snapshots such as gpt-4o-mini-2024-07-18 take the longest matching name's prices
+        matches = [name for name in MODEL_PRICING if model.startswith(name)]
+        if matches:
+            input_price, output_price = MODEL_PRICING[max(matches, key=len)]
+    return (
+        prompt_tokens * input_price / 1_000_000
+        + completion_tokens * output_price / 1_000_000
+        + web_search_calls * WEB_SEARCH_CALL_COST
+    )
+
+
+def get_token_counts(response: Any) -> tuple:
+    """Read (prompt, completion) token counts from a chat or Responses API result"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", 0) or 0
+    return int(prompt_tokens), int(completion_tokens)
+
+
+def record_call(node: str, tier: str, model: Optional[str], latency: float,
+                prompt_tokens: int = 0, completion_tokens: int = 0, web_search_calls: int = 0,
+                price_multiplier: float = 1.0) -> float:
+    """Add one API call to the per-tier accounting and return its estimated cost"""
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, web_search_calls) * price_multiplier
+    with _lock:
+        entry = _tiers.setdefault(tier, {
+            "calls": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "web_search_calls": 0,
+            "cost": 0.0,
+            "models": set(),
+            "nodes": set(),
+        })
+        entry["calls"] += 1
+        entry["latency_total"] += latency
+        entry["latency_max"] = max(entry["latency_max"], latency)
+        entry["prompt_tokens"] += prompt_tokens
+        entry["completion_tokens"] += completion_tokens
+        entry["web_search_calls"] += web_search_calls
+        entry["cost"] += cost
+        entry["models"].add(model or "unknown")
+        entry["nodes"].add(node)
+    call = {
+        "node": node,
+        "tier": tier,
+        "model": model,
+        "latency": latency,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "web_search_calls": web_search_calls,
+        "cost": cost,
+    }
+    for sink in _call_sinks.get():
+        sink.append(call)
+    metrics.node_latency.observe(latency, node=node, tier=tier)
+    metrics.tokens.inc(prompt_tokens, node=node, direction="prompt")
+    metrics.tokens.inc(completion_tokens, node=node, direction="completion")
+    metrics.cost.inc(cost, node=node)
+    logging.info(
+        f"[{tier}] {node} via {model}: {latency:.2f}s, "
+        f"{prompt_tokens}+{completion_tokens} tokens, ${cost:.4f}"
+    )
+    return cost
+
+
+def get_usage_report() -> Dict[str, Dict[str, Any]]:
+    """Return latency, token and cost totals grouped by model tier"""
+    with _lock:
+        report = {}
+        for tier, entry in _tiers.items():
+            calls = entry["calls"] or 1
+            report[tier] = {
+                "calls": entry["calls"],
+                "avg_latency": round(entry["latency_total"] / calls, 3),
+                "max_latency": round(entry["latency_max"], 3),
+                "prompt_tokens": entry["prompt_tokens"],
+                "completion_tokens": entry["completion_tokens"],
+                "web_search_calls": entry["web_search_calls"],
+                "cost": round(entry["cost"], 6),
+                "models": sorted(entry["models"]),
+                "nodes": sorted(entry["nodes"]),
+            }
+        return report
+
+
+def reset_usage():
+    """Clear the accumulated accounting"""
+    with _lock:
+        _tiers.clear()
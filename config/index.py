@@ -1,10 +1,245 @@
 from dotenv import load_dotenv
+from typing import Optional
 import os
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL = os.getenv("MODEL")
+FAST_MODEL = os.getenv("FAST_MODEL") or MODEL
+STRONG_MODEL = os.getenv("STRONG_MODEL") or MODEL
 
 if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in .env file.")
\ No newline at end of file
+    raise ValueError("OPENAI_API_KEY not found in .env file.")
+
+# Speculative next-round work started while the user reads the current round:
+# "off", "research" (next PRO research only) or "pro" (also PRO argument and CON research).
+# In multi-party debates PRO stands for every participant who rebuts no one.
+SPECULATIVE_ROUNDS = os.getenv("SPECULATIVE_ROUNDS", "off").lower()
+
+# Optional SQLite file used to coalesce identical research calls across server
+# processes. Within one process identical calls are always coalesced.
+SINGLEFLIGHT_DB = os.getenv("SINGLEFLIGHT_DB")
+SINGLEFLIGHT_LEASE_SECONDS = float(os.getenv("SINGLEFLIGHT_LEASE_SECONDS", "180"))
+
+# Deployment mode: "inline" runs debate steps inside the Streamlit process,
+# "pool" enqueues them for worker processes started with `python worker.py`.
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "inline").lower()
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 2)))
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "600"))
+# Workers renew a lease on their running job; a job whose lease expires is
+# taken by another worker, up to JOB_MAX_ATTEMPTS times.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+# SQLite file shared by the app and workers for the job queue, research cache,
+# rate limiter and debate checkpoints.
+SHARED_DB = os.getenv("SHARED_DB", "debate_shared.db")
+
+# Persist every finished node so debates survive refreshes and restarts.
+PERSIST_DEBATES = os.getenv("PERSIST_DEBATES", "true").lower() in ("1", "true", "yes")
+
+# Seconds a research result stays in the shared cache (0 disables the cache).
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "0"))
+
+# Exact-match chat completion cache in SHARED_DB: "off", "on", or "deterministic"
+# (also forces temperature 0 so cached replays match what a fresh run would
+# produce). Least recently used entries are evicted above COMPLETION_CACHE_MAX_MB.
+COMPLETION_CACHE = os.getenv("COMPLETION_CACHE", "off").lower()
+COMPLETION_CACHE_MAX_MB = float(os.getenv("COMPLETION_CACHE_MAX_MB", "200"))
+
+# Streamlit sessions keep strings longer than SESSION_SPILL_CHARS (0 disables)
+# in SHARED_DB and only a handle in memory. Spilled text unused for
+# SESSION_SPILL_TTL seconds is deleted.
+SESSION_SPILL_CHARS = int(os.getenv("SESSION_SPILL_CHARS", "1000"))
+SESSION_SPILL_TTL = float(os.getenv("SESSION_SPILL_TTL", str(7 * 24 * 3600)))
+
+# Requests per minute allowed per endpoint across all processes (0 disables).
+RATE_LIMITS = {
+    "web_search": float(os.getenv("WEB_SEARCH_RPM", "0")),
+    "chat": float(os.getenv("CHAT_RPM", "0")),
+}
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "5"))
+
+# Per-debate spend limits (0 disables a limit). As a debate approaches its
+# budget it degrades step by step at the fractions below.
+DEBATE_TOKEN_BUDGET = int(os.getenv("DEBATE_TOKEN_BUDGET", "0"))
+DEBATE_COST_BUDGET = float(os.getenv("DEBATE_COST_BUDGET", "0"))
+BUDGET_DEGRADATION_STEPS = [
+    (float(os.getenv("BUDGET_TRIM_RESEARCH_AT", "0.5")), "trim_research"),
+    (float(os.getenv("BUDGET_COMPACT_HISTORY_AT", "0.65")), "compact_history"),
+    (float(os.getenv("BUDGET_SMALL_MODEL_AT", "0.8")), "small_model"),
+    (float(os.getenv("BUDGET_SKIP_FACT_CHECK_AT", "0.9")), "skip_fact_check"),
+]
+BUDGET_TRIMMED_RESEARCH_CHARS = int(os.getenv("BUDGET_TRIMMED_RESEARCH_CHARS", "3000"))
+
+# Model tiers every node is routed to. Unset tiers fall back to MODEL.
+MODEL_TIERS = {
+    "fast": FAST_MODEL,
+    "default": MODEL,
+    "strong": STRONG_MODEL,
+}
+
+# OpenAI-compatible providers nodes can be routed to, e.g. a self-hosted vLLM or
+# llama.cpp server as "local". A provider's model, when set, replaces the tier
+# models for nodes routed to it. Research nodes on a provider without web search
+# use local retrieval instead: the best-matching passages from RETRIEVAL_DIR and
+# previously cached web research, summarized by the node's model.
+PROVIDERS = {
+    "openai": {
+        "base_url": os.getenv("OPENAI_BASE_URL"),
+        "api_key": OPENAI_API_KEY,
+        "model": None,
+        "web_search": True,
+    },
+    "local": {
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8000/v1"),
+        "api_key": os.getenv("LOCAL_LLM_API_KEY", "local"),
+        "model": os.getenv("LOCAL_LLM_MODEL"),
+        "web_search": os.getenv("LOCAL_LLM_WEB_SEARCH", "false").lower() in ("1", "true", "yes"),
+    },
+}
+DEFAULT_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+RETRIEVAL_DIR = os.getenv("RETRIEVAL_DIR", "research_docs")
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+
+# Per-node routing, sampling settings and deadlines (seconds). Each value can be
+# overridden from the environment with <NODE>_PROVIDER, <NODE>_MODEL, <NODE>_TIER,
+# <NODE>_TEMPERATURE, <NODE>_MAX_TOKENS and <NODE>_DEADLINE, e.g.
+# JUDGE_MODEL=gpt-4o or RESEARCH_DEADLINE=45. <NODE>_MODEL is the model for the
+# node's own tier: a call that forces another tier (a judge panel member, or the
+# budget's small_model step) uses that tier's model instead.
+NODE_CONFIG = {
+    "topic": {"tier": "fast", "temperature": 0.7, "max_tokens": 300, "deadline": 60},
+    "research": {"tier": "default", "temperature": None, "max_tokens": None, "deadline": 90},
+    "pro": {"tier": "default", "temperature": 0.7, "max_tokens": 2000, "deadline": 90},
+    "con": {"tier": "default", "temperature": 0.7, "max_tokens": 2000, "deadline": 90},
+    "participant": {"tier": "default", "temperature": 0.7, "max_tokens": 2000, "deadline": 90},
+    "fact_check": {"tier": "default", "temperature": None, "max_tokens": None, "deadline": 90},
+    "judge": {"tier": "strong", "temperature": 0.3, "max_tokens": 2000, "deadline": 120},
+    "default": {"tier": "default", "temperature": 0.7, "max_tokens": 2000, "deadline": 90},
+}
+
+# Hedged requests: once a node has HEDGE_MIN_SAMPLES recent latencies, a call
+# slower than their HEDGE_PERCENTILE gets a duplicate request and the first
+# result wins.
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+# Adaptive (AIMD) concurrency limits for OpenAI calls, kept per process and per
+# endpoint ("web_search" and "chat") of each provider. The limit grows by one after a full window of
+# calls at the limit without trouble, and is multiplied by ADAPTIVE_BACKOFF after
+# a 429, a timeout, or a call slower than ADAPTIVE_LATENCY_SPIKE times its node's median.
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "true").lower() in ("1", "true", "yes")
+ADAPTIVE_INITIAL_CONCURRENCY = int(os.getenv("ADAPTIVE_INITIAL_CONCURRENCY", "8"))
+ADAPTIVE_MIN_CONCURRENCY = int(os.getenv("ADAPTIVE_MIN_CONCURRENCY", "1"))
+ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "64"))
+ADAPTIVE_BACKOFF = float(os.getenv("ADAPTIVE_BACKOFF", "0.5"))
+ADAPTIVE_LATENCY_SPIKE = float(os.getenv("ADAPTIVE_LATENCY_SPIKE", "2.5"))
+
+# Retries of OpenAI calls that hit a 429, a timeout, a connection error or a 5xx.
+# The SDK's own retries are off, so the adaptive limit sees every failure; a retry
+# waits API_RETRY_BACKOFF_SECONDS doubled per attempt (or the server's Retry-After)
+# and then takes a new slot.
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+API_RETRY_BACKOFF_SECONDS = float(os.getenv("API_RETRY_BACKOFF_SECONDS", "0.5"))
+
+# Judge panel used when JUDGE_PANEL_SIZE > 1. Members run a majority at a time on the
+# same transcript and verification data; each picks a tier, a temperature and a
+# prompt focus from bot_instructions.judge_focus_prompts.
+JUDGE_PANEL = [
+    {"name": "chief", "tier": "strong", "temperature": 0.3, "focus": "standard"},
+    {"name": "evidence", "tier": "default", "temperature": 0.5, "focus": "evidence"},
+    {"name": "logic", "tier": "default", "temperature": 0.5, "focus": "logic"},
+    {"name": "impact", "tier": "fast", "temperature": 0.7, "focus": "impact"},
+    {"name": "second_chief", "tier": "strong", "temperature": 0.9, "focus": "standard"},
+]
+JUDGE_PANEL_SIZE = max(1, min(len(JUDGE_PANEL), int(os.getenv("JUDGE_PANEL_SIZE", "1"))))
+
+# Multi-party debates: each round's participants run concurrently, except where
+# one rebuts another's same-round argument.
+MAX_PARTICIPANTS = int(os.getenv("MAX_PARTICIPANTS", "8"))
+
+# Prometheus-format metrics served on METRICS_PORT (0 disables). Debates count as
+# active while they changed state within DEBATE_ACTIVE_SECONDS.
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+DEBATE_ACTIVE_SECONDS = float(os.getenv("DEBATE_ACTIVE_SECONDS", "1800"))
+
+# Async HTTP API (api_server.py): debate steps run on API_STEP_WORKERS threads,
+# debates idle for API_SESSION_IDLE_SECONDS are dropped from memory and reloaded
+# from SHARED_DB on the next request, and event streams send a keepalive comment
+# every API_SSE_KEEPALIVE_SECONDS.
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8600"))
+API_STEP_WORKERS = int(os.getenv("API_STEP_WORKERS", "32"))
+API_SESSION_IDLE_SECONDS = float(os.getenv("API_SESSION_IDLE_SECONDS", "3600"))
+API_SSE_KEEPALIVE_SECONDS = float(os.getenv("API_SSE_KEEPALIVE_SECONDS", "15"))
+
+# Off-peak prewarming (prewarm.py): topics from a list are generated together with
+# their first-round research inside PREWARM_WINDOW (local time, "HH:MM-HH:MM") until
+# PREWARM_COST_LIMIT USD has been spent. Users are offered prewarmed topics for
+# PREWARM_TTL seconds.
+PREWARM_WINDOW = os.getenv("PREWARM_WINDOW", "01:00-06:00")
+PREWARM_COST_LIMIT = float(os.getenv("PREWARM_COST_LIMIT", "5"))
+PREWARM_TTL = float(os.getenv("PREWARM_TTL", str(36 * 3600)))
+
+# Profiling: PROFILE_DEBATES=true, or opening the app with ?profile=1, samples the
+# session's debate work every PROFILE_INTERVAL_MS and writes folded stacks
+# (flamegraph.pl, speedscope) plus a per-node summary to PROFILE_DIR.
+PROFILE_DEBATES = os.getenv("PROFILE_DEBATES", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# Offline batch runs (batch_run.py): Batch API requests are billed at a discount,
+# each stage is split into batches of at most BATCH_MAX_REQUESTS and polled every
+# BATCH_POLL_SECONDS.
+BATCH_PRICE_MULTIPLIER = float(os.getenv("BATCH_PRICE_MULTIPLIER", "0.5"))
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "50000"))
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+
+# Analytics exports (analytics.py): one date-partitioned Parquet or Arrow dataset
+# per table (debates, arguments, nodes, spend, verdicts) under ANALYTICS_DIR.
+ANALYTICS_DIR = os.getenv("ANALYTICS_DIR", "analytics")
+
+# USD per one million (input, output) tokens, used for cost accounting only.
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Flat per-call surcharge for the web_search_preview tool, in USD.
+WEB_SEARCH_CALL_COST = float(os.getenv("WEB_SEARCH_CALL_COST", "0.025"))
+
+
+def _env_number(name: str, cast, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        return default
+
+
+def get_node_config(node: str, tier: Optional[str] = None) -> dict:
+    """Resolve provider, model, tier, temperature, max_tokens and deadline for a pipeline node, optionally forcing a tier"""
+    base = NODE_CONFIG.get(node, NODE_CONFIG["default"])
+    prefix = node.upper()
+    node_tier = os.getenv(f"{prefix}_TIER") or base["tier"]
+    tier = tier or node_tier
+    provider = os.getenv(f"{prefix}_PROVIDER") or base.get("provider") or DEFAULT_PROVIDER
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider {provider!r} for node {node}, expected one of {', '.join(PROVIDERS)}")
+    return {
+        "node": node,
+        "tier": tier,
+        "provider": provider,
+        "model": (tier == node_tier and os.getenv(f"{prefix}_MODEL")) or PROVIDERS[provider]["model"] or MODEL_TIERS.get(tier) or MODEL,
+        "temperature": _env_number(f"{prefix}_TEMPERATURE", float, base["temperature"]),
+        "max_tokens": _env_number(f"{prefix}_MAX_TOKENS", int, base["max_tokens"]),
+        "deadline": _env_number(f"{prefix}_DEADLINE", float, base["deadline"]) or None,
+    }
@@ -0,0 +1,63 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+from components.loadtest import run_load_test, start_server, start_stub
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def print_reports(reports: list):
+    print("\nsessions  ok  sess/s  topic p50/p95/p99  round p50/p95/p99  judgment p50/p95/p99  cpu%  rss MB")
+    for report in reports:
+        steps = "  ".join(
+            "/".join(f"{report['steps'][step][q]:.2f}" if report["steps"][step][q] is not None else "-" for q in ("p50", "p95", "p99"))
+            for step in ("topic", "round", "judgment")
+        )
+        print(f"{report['sessions']:>8}  {report['completed']:>3}  {report['sessions_per_second']:>6}  {steps}  "
+              f"{report['server_cpu_percent']}  {report['server_peak_rss_mb']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test one debate server with simulated sessions against the OpenAI stub")
+    parser.add_argument("--sessions", default="1,5,10,25,50", help="Comma-separated concurrent session counts, run in turn")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per debate")
+    parser.add_argument("--latency-mean", type=float, default=1.0, help="Mean seconds per stubbed OpenAI call (lognormal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma of stubbed call latency")
+    parser.add_argument("--stub-port", type=int, default=8787, help="Port for the OpenAI stub")
+    parser.add_argument("--port", type=int, default=8610, help="Port for the debate API under test")
+    parser.add_argument("--step-workers", type=int, default=32, help="API_STEP_WORKERS for the server under test")
+    parser.add_argument("--server", help="host:port of an already running debate API to test instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID of that server, for CPU and RSS")
+    parser.add_argument("--out", help="Also write the reports as JSON to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.sessions.split(",") if level.strip()]
+    server = None
+    if args.server:
+        host, port = args.server.rsplit(":", 1)
+        server_pid = args.server_pid
+    else:
+        stub_url = start_stub(args.stub_port, args.latency_mean, args.latency_sigma)
+        shared_db = os.path.join(tempfile.mkdtemp(prefix="debate_load_test_"), "shared.db")
+        server = start_server(args.port, stub_url, args.step_workers, shared_db)
+        host, port, server_pid = "127.0.0.1", str(args.port), server.pid
+        logging.info(f"Debate API pid {server.pid} on port {args.port}, OpenAI stub at {stub_url}")
+
+    try:
+        reports = run_load_test(levels, host, int(port), args.rounds, server_pid)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_reports(reports)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out_file:
+            json.dump(reports, out_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import logging
+from components.prewarm import prewarm_topics
+from config.index import PREWARM_WINDOW, PREWARM_COST_LIMIT, RESEARCH_CACHE_TTL
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prewarm topics and first-round research for a list of debate prompts")
+    parser.add_argument("topics", help="Text file with one debate prompt per line (# starts a comment)")
+    parser.add_argument("--max-cost", type=float, default=PREWARM_COST_LIMIT, help="Spend limit in USD (0 for none)")
+    parser.add_argument("--window", default=PREWARM_WINDOW, help="Off-peak window as HH:MM-HH:MM local time")
+    parser.add_argument("--now", action="store_true", help="Start immediately and ignore the window")
+    parser.add_argument("--refresh", action="store_true", help="Regenerate topics that are still prewarmed")
+    args = parser.parse_args()
+    
+    with open(args.topics, encoding="utf-8") as topics_file:
+        prompts = [line.strip() for line in topics_file if line.strip() and not line.startswith("#")]
+    if RESEARCH_CACHE_TTL <= 0:
+        logging.warning("RESEARCH_CACHE_TTL is 0, so only the stored first-round research will be reused")
+    
+    summary = prewarm_topics(prompts, args.max_cost, "" if args.now else args.window, args.refresh)
+    logging.info(
+        f"Prewarmed {summary['prewarmed']} topics ({summary['skipped']} still fresh, {summary['failed']} failed) "
+        f"for ${summary['cost']:.4f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
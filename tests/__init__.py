@@ -0,0 +1,25 @@
+"""
+Unit tests, run from the repository root with
+
+    python -m unittest discover -s tests -t .
+
+Importing the package starts a local OpenAI stub (components.openai_stub) and points
+the app at it and at a throwaway SHARED_DB, so test modules import it before any
+app module reads the config.
+"""
+import os
+import tempfile
+from components.openai_stub import StubBackend, serve
+
+stub = StubBackend(seed=1)
+_server = serve(port=0, backend=stub)
+scratch = tempfile.mkdtemp(prefix="debate-tests-")
+
+os.environ.update({
+    "OPENAI_API_KEY": "test-key",
+    "OPENAI_BASE_URL": f"http://127.0.0.1:{_server.server_port}/v1",
+    "MODEL": "gpt-4o-mini",
+    "SHARED_DB": os.path.join(scratch, "shared.db"),
+    "RETRIEVAL_DIR": os.path.join(scratch, "research_docs"),
+    "API_RETRY_BACKOFF_SECONDS": "0.01",
+})
@@ -0,0 +1,113 @@
+import unittest
+from unittest import mock
+from contextlib import ExitStack
+import tests  # points the config at the stub before it is read
+from components import tools
+from components.providers import get_client
+from components.tools import AdaptiveLimiter, DeadlineExceeded, with_retries
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    def test_saturated_window_raises_the_limit(self):
+        limiter = AdaptiveLimiter("test", initial=2, minimum=1, maximum=4)
+        with limiter.slot("limiter-test"), limiter.slot("limiter-test"):
+            pass
+        self.assertEqual(limiter.report()["limit"], 3)
+        self.assertEqual(limiter.stats["increases"], 1)
+
+    def test_unsaturated_calls_keep_the_limit(self):
+        limiter = AdaptiveLimiter("test", initial=2, minimum=1, maximum=4)
+        for _ in range(5):
+            with limiter.slot("limiter-test"):
+                pass
+        self.assertEqual(limiter.report()["limit"], 2)
+
+    def test_limit_stays_at_the_maximum(self):
+        limiter = AdaptiveLimiter("test", initial=4, minimum=1, maximum=4)
+        with limiter.slot("limiter-test"), limiter.slot("limiter-test"), limiter.slot("limiter-test"), limiter.slot("limiter-test"):
+            pass
+        self.assertEqual(limiter.report()["limit"], 4)
+
+    def test_burst_of_429s_backs_off_once(self):
+        limiter = AdaptiveLimiter("test", initial=4, minimum=1, maximum=8, backoff=0.5)
+        with self.assertRaises(StatusError):
+            with ExitStack() as stack:
+                for _ in range(3):
+                    stack.enter_context(limiter.slot("limiter-test"))
+                raise StatusError(429)
+        self.assertEqual(limiter.report()["limit"], 2)
+        self.assertEqual(limiter.stats["rate_limited"], 1)
+        self.assertEqual(limiter.inflight, 0)
+
+    def test_timeout_backs_off(self):
+        limiter = AdaptiveLimiter("test", initial=4, minimum=1, maximum=8, backoff=0.5)
+        with self.assertRaises(DeadlineExceeded):
+            with limiter.slot("limiter-test"):
+                raise DeadlineExceeded("late")
+        self.assertEqual(limiter.report()["limit"], 2)
+        self.assertEqual(limiter.stats["timeouts"], 1)
+
+    def test_other_errors_do_not_back_off(self):
+        limiter = AdaptiveLimiter("test", initial=4, minimum=1, maximum=8, backoff=0.5)
+        with self.assertRaises(StatusError):
+            with limiter.slot("limiter-test"):
+                raise StatusError(400)
+        self.assertEqual(limiter.report()["limit"], 4)
+
+    def test_limit_stays_at_the_minimum(self):
+        limiter = AdaptiveLimiter("test", initial=2, minimum=1, maximum=4, backoff=0.5)
+        for _ in range(3):
+            with self.assertRaises(StatusError):
+                with limiter.slot("limiter-test"):
+                    raise StatusError(429)
+        self.assertEqual(limiter.report()["limit"], 1)
+
+
+class WithRetriesTest(unittest.TestCase):
+    def setUp(self):
+        tests.stub.failures.clear()
+        # A fresh chat limiter, so the backoffs here do not slow down other tests
+        limiters = mock.patch.dict(tools.concurrency_limiters, {"chat": AdaptiveLimiter("chat")})
+        limiters.start()
+        self.addCleanup(limiters.stop)
+
+    def chat(self):
+        return get_client().chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Retry test"}]
+        )
+
+    def test_429s_are_retried_through_the_limiter(self):
+        limiter = tools.concurrency_limiters["chat"]
+        rate_limited = limiter.stats["rate_limited"]
+        calls = tests.stub.request_counts.get("chat", 0)
+        tests.stub.fail_next("chat", 429, 2)
+        response = with_retries("chat", "retry-test", self.chat)
+        self.assertTrue(response.choices[0].message.content)
+        self.assertEqual(tests.stub.request_counts["chat"] - calls, 3)
+        self.assertGreater(limiter.stats["rate_limited"], rate_limited)
+
+    def test_client_errors_are_not_retried(self):
+        calls = tests.stub.request_counts.get("chat", 0)
+        tests.stub.fail_next("chat", 400)
+        with self.assertRaises(Exception) as caught:
+            with_retries("chat", "retry-test", self.chat)
+        self.assertEqual(getattr(caught.exception, "status_code", None), 400)
+        self.assertEqual(tests.stub.request_counts["chat"] - calls, 1)
+
+    def test_retries_give_up(self):
+        calls = tests.stub.request_counts.get("chat", 0)
+        tests.stub.fail_next("chat", 500, tools.API_MAX_RETRIES + 1)
+        with self.assertRaises(Exception) as caught:
+            with_retries("chat", "retry-test", self.chat)
+        self.assertEqual(getattr(caught.exception, "status_code", None), 500)
+        self.assertEqual(tests.stub.request_counts["chat"] - calls, tools.API_MAX_RETRIES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
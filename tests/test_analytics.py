@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import tests  # points the config at the stub before it is read
+from components.analytics import SCHEMAS, export_debates, load_table, win_rates
+
+CREATED_AT = datetime(2026, 3, 14, 12).timestamp()
+
+
+def finished_debate(debate_id: str, winner: str, created_at: float = CREATED_AT) -> dict:
+    return {
+        "debate_id": debate_id,
+        "created_at": created_at,
+        "prompt": [{"role": "user", "content": "Pets"}],
+        "topic": [{"role": "assistant", "content": "Cats make better pets"}],
+        "rounds": [{"round_number": 1, "pro": "Cats are calm", "con": "Dogs are loyal"}],
+        "judge": [{"role": "assistant", "content": f"Winner: {winner}"}],
+        "pro_argument": [],
+        "con_argument": [],
+        "current_round": 1,
+        "winner": winner,
+        "processing_state": "complete",
+        "ready_for_next_round": False,
+        "timings": {"topic": 0.5, "pro_1": 1.0, "con_1": 2.0, "judge": 0.25},
+    }
+
+
+class AnalyticsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=tests.scratch)
+
+    def test_missing_table_reads_as_empty(self):
+        table = load_table(os.path.join(self.directory, "nothing"), "nodes")
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(table.schema, SCHEMAS["nodes"])
+
+    def test_node_rows_come_from_timings(self):
+        written = export_debates([finished_debate("d1", "PRO")], self.directory)
+        self.assertEqual(written["nodes"], 4)
+        nodes = load_table(self.directory, "nodes").sort_by("seconds").to_pylist()
+        self.assertEqual([(row["node"], row["round_number"], row["date"]) for row in nodes], [
+            ("judge", 0, "2026-03-14"), ("topic", 0, "2026-03-14"), ("pro", 1, "2026-03-14"), ("con", 1, "2026-03-14"),
+        ])
+
+    def test_reexport_replaces_rows_and_dates_prune(self):
+        states = [finished_debate("d1", "PRO"), finished_debate("d2", "CON", datetime(2026, 3, 20, 12).timestamp())]
+        export_debates(states, self.directory)
+        export_debates(states, self.directory)
+        self.assertEqual(load_table(self.directory, "debates").num_rows, 2)
+        later = load_table(self.directory, "debates", since="2026-03-15", columns=["debate_id"])
+        self.assertEqual(later.column("debate_id").to_pylist(), ["d2"])
+
+    def test_win_rates(self):
+        export_debates([finished_debate("d1", "PRO"), finished_debate("d2", "PRO"), finished_debate("d3", "CON")], self.directory)
+        rows = {row["winner"]: row for row in win_rates(load_table(self.directory, "debates")).to_pylist()}
+        self.assertEqual((rows["PRO"]["wins"], rows["PRO"]["debates"]), (2, 3))
+        self.assertAlmostEqual(rows["CON"]["win_rate"], 1 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
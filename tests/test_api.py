@@ -0,0 +1,47 @@
+import asyncio
+import unittest
+import tests  # points the config at the stub before it is read
+from components.api import ApiError, read_request, MAX_BODY_BYTES
+
+
+def parse(raw: bytes):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await read_request(reader)
+    return asyncio.run(read())
+
+
+class ReadRequestTest(unittest.TestCase):
+    def test_body_and_query_are_read(self):
+        request = parse(b"POST /debates/?wait=1 HTTP/1.1\r\nContent-Length: 13\r\n\r\n{\"rounds\": 2}")
+        self.assertEqual(request["method"], "POST")
+        self.assertEqual(request["path"], "/debates")
+        self.assertEqual(request["query"], {"wait": "1"})
+        self.assertEqual(request["body"], b'{"rounds": 2}')
+        self.assertTrue(request["keep_alive"])
+
+    def test_closed_connection_gives_none(self):
+        self.assertIsNone(parse(b""))
+
+    def test_bad_content_length_is_a_client_error(self):
+        for length in (b"abc", b"-5", b"1.5"):
+            with self.subTest(length=length):
+                with self.assertRaises(ApiError) as caught:
+                    parse(b"POST /debates HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+                self.assertEqual(caught.exception.status, 400)
+
+    def test_oversized_body_is_refused(self):
+        with self.assertRaises(ApiError) as caught:
+            parse(b"POST /debates HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY_BYTES + 1))
+        self.assertEqual(caught.exception.status, 413)
+
+    def test_malformed_request_line(self):
+        with self.assertRaises(ApiError) as caught:
+            parse(b"GARBAGE\r\n\r\n")
+        self.assertEqual(caught.exception.status, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
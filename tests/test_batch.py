@@ -0,0 +1,43 @@
+import json
+import os
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components.batch import run_batch_debates
+
+PROMPTS = ["Cats vs dogs", "Tea vs coffee"]
+
+
+class BatchRunTest(unittest.TestCase):
+    def setUp(self):
+        self.progress = os.path.join(tests.scratch, f"{self.id()}.json")
+        self.faster_batches = mock.patch.object(tests.stub, "batch_delay", 0.02)
+        self.faster_batches.start()
+        self.addCleanup(self.faster_batches.stop)
+
+    def test_debates_finish_with_timings_and_spend(self):
+        states = run_batch_debates(PROMPTS, rounds=1, poll_interval=0.02, progress_path=self.progress)
+        self.assertEqual([state["processing_state"] for state in states], ["judgment_complete"] * 2)
+        for state in states:
+            self.assertEqual(set(state["timings"]), {"topic", "pro_1", "con_1", "judge"})
+            self.assertGreater(state["budget"]["cost"], 0)
+            self.assertEqual(state["budget"]["web_search_calls"], 4)
+
+    def test_finished_progress_is_resumed_without_new_batches(self):
+        states = run_batch_debates(PROMPTS, rounds=1, poll_interval=0.02, progress_path=self.progress)
+        batches = tests.stub.request_counts.get("batches", 0)
+        resumed = run_batch_debates(PROMPTS, rounds=1, poll_interval=0.02, progress_path=self.progress)
+        self.assertEqual([state["debate_id"] for state in resumed], [state["debate_id"] for state in states])
+        self.assertEqual(tests.stub.request_counts.get("batches", 0), batches)
+
+    def test_progress_of_another_run_is_refused(self):
+        with open(self.progress, "w", encoding="utf-8") as progress_file:
+            json.dump({"prompts": ["AI regulation"], "rounds": 1, "stage_index": 0, "pending_batches": [], "states": []}, progress_file)
+        with self.assertRaises(ValueError):
+            run_batch_debates(PROMPTS, rounds=1, poll_interval=0.02, progress_path=self.progress)
+        with self.assertRaises(ValueError):
+            run_batch_debates(["AI regulation"], rounds=2, poll_interval=0.02, progress_path=self.progress)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import time
+import unittest
+import tests  # points the config at the stub before it is read
+from components.tools import hedged_call, latency_tracker, DeadlineExceeded
+from config.index import HEDGE_MIN_SAMPLES
+
+
+class HedgedCallTest(unittest.TestCase):
+    def test_concurrent_calls_do_not_queue_into_their_deadline(self):
+        failures, lock = [], threading.Lock()
+        
+        def call():
+            try:
+                hedged_call("test_concurrent", lambda: time.sleep(0.2), deadline=0.5)
+            except DeadlineExceeded as e:
+                with lock:
+                    failures.append(e)
+        
+        threads = [threading.Thread(target=call) for _ in range(64)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_attempt_finishing_after_the_deadline_is_still_recorded(self):
+        recorded = []
+        with self.assertRaises(DeadlineExceeded):
+            hedged_call("test_deadline", lambda: time.sleep(0.3) or "late", deadline=0.1,
+                        on_result=lambda result, seconds: recorded.append(result))
+        time.sleep(0.4)
+        self.assertEqual(recorded, ["late"])
+
+    def test_slow_call_is_hedged_and_both_attempts_are_recorded(self):
+        for _ in range(HEDGE_MIN_SAMPLES):
+            latency_tracker.observe("test_hedge", 0.02)
+        attempts, recorded = [], []
+        
+        def call():
+            attempts.append(1)
+            attempt = len(attempts)
+            time.sleep(0.5 if attempt == 1 else 0.01)
+            return attempt
+        
+        result = hedged_call("test_hedge", call, deadline=5, on_result=lambda result, seconds: recorded.append(result))
+        self.assertEqual(result, 2)
+        time.sleep(0.6)
+        self.assertEqual(sorted(recorded), [1, 2])
+        self.assertEqual(latency_tracker.report()["test_hedge"]["hedge_wins"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components import bots
+from components.bots import run_judge_panel
+from components.usage import track_calls
+
+MESSAGES = [{"role": "system", "content": "You are the Judge."}, {"role": "user", "content": "Judge this debate."}]
+
+
+def make_panel(size):
+    return [
+        {"name": f"judge{i}", "tier": "default", "temperature": round(0.1 * (i + 1), 1), "focus": "standard"}
+        for i in range(size)
+    ]
+
+
+class JudgePanelTest(unittest.TestCase):
+    def run_panel(self, verdicts):
+        """Run a panel whose i-th judge answers verdicts[i], returning the result and the judges called"""
+        panel = make_panel(len(verdicts))
+        answers = {member["temperature"]: verdict for member, verdict in zip(panel, verdicts)}
+        called, lock = [], threading.Lock()
+        
+        def respond(messages, node, tier=None, temperature=None):
+            with lock:
+                called.append(temperature)
+            return answers[temperature]
+        
+        with mock.patch.object(bots, "get_simple_llm_response", respond):
+            return run_judge_panel(MESSAGES, panel), called
+
+    def test_unanimous_panel_stops_at_a_majority(self):
+        result, called = self.run_panel(["WINNER: PRO"] * 5)
+        self.assertEqual(len(called), 3)
+        self.assertTrue(result["early_exit"])
+        self.assertEqual((result["winner"], result["votes"]["PRO"]), ("PRO", 3))
+
+    def test_split_panel_runs_every_judge(self):
+        result, called = self.run_panel(["WINNER: PRO", "WINNER: CON", "WINNER: CON", "WINNER: PRO", "WINNER: PRO"])
+        self.assertEqual(len(called), 5)
+        self.assertFalse(result["early_exit"])
+        self.assertEqual(result["winner"], "PRO")
+        self.assertEqual(result["agreement"], 0.6)
+
+    def test_failed_judges_do_not_vote(self):
+        result, _ = self.run_panel(["Response generation failed: down", "WINNER: CON", "WINNER: CON"])
+        self.assertEqual(result["winner"], "CON")
+        self.assertEqual(result["votes"], {"PRO": 0, "CON": 2})
+
+    def test_panel_without_verdicts_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.run_panel(["Response generation failed: down"] * 3)
+
+    def test_every_judge_call_is_tracked_against_the_stub(self):
+        with track_calls() as calls:
+            result = run_judge_panel(MESSAGES, make_panel(5))
+        self.assertEqual(len(calls), len(result["verdicts"]))
+        self.assertGreaterEqual(len(calls), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import tests  # points the config at the stub before it is read
+from components.bots import rebuttal_order, make_participants, rebutting_participants
+
+
+def participant(name, rebuts=()):
+    return {"name": name, "label": name.upper(), "stance": "", "rebuts": list(rebuts)}
+
+
+class RebuttalOrderTest(unittest.TestCase):
+    def test_everyone_comes_after_the_participants_they_rebut(self):
+        participants = [participant("d", ["b", "c"]), participant("c", ["a"]), participant("b", ["a"]), participant("a")]
+        order = [p["name"] for p in rebuttal_order(participants)]
+        for p in participants:
+            for rebutted in p["rebuts"]:
+                self.assertLess(order.index(rebutted), order.index(p["name"]))
+
+    def test_independent_participants_keep_their_order(self):
+        participants = [participant("x"), participant("y"), participant("z")]
+        self.assertEqual(rebuttal_order(participants), participants)
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            rebuttal_order([participant("a", ["b"]), participant("b", ["a"])])
+
+    def test_unknown_rebuttal_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            rebuttal_order([participant("a", ["ghost"])])
+
+    def test_rebutting_participants_follow_chains(self):
+        participants = [participant("a"), participant("b", ["a"]), participant("c", ["b"]), participant("d")]
+        self.assertEqual(rebutting_participants(participants, ["a"]), ["a", "b", "c"])
+
+
+class MakeParticipantsTest(unittest.TestCase):
+    def test_labels_and_stances_are_parsed(self):
+        participants = make_participants(["Green: invest in renewables", "nuclear power first"])
+        self.assertEqual([(p["label"], p["stance"]) for p in participants],
+                         [("GREEN", "invest in renewables"), ("POSITION 2", "nuclear power first")])
+
+    def test_duplicate_labels_are_rejected(self):
+        with self.assertRaises(ValueError):
+            make_participants(["A: one", "a: two"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components import retrieval
+from components.retrieval import LocalRetriever, chunk_text
+
+
+class ChunkTextTest(unittest.TestCase):
+    def test_paragraphs_are_grouped_up_to_the_size(self):
+        text = "\n\n".join(["a" * 40, "b" * 40, "c" * 40, "  ", "d" * 40])
+        self.assertEqual(chunk_text(text, chunk_chars=90), ["a" * 40 + "\n\n" + "b" * 40, "c" * 40 + "\n\n" + "d" * 40])
+
+    def test_long_paragraph_stays_whole(self):
+        self.assertEqual(chunk_text("x" * 500, chunk_chars=100), ["x" * 500])
+
+
+class LocalRetrieverTest(unittest.TestCase):
+    def setUp(self):
+        self.cached = []
+        patches = [
+            mock.patch.object(retrieval, "list_cached_research", lambda: list(self.cached)),
+            mock.patch.object(retrieval, "REFRESH_SECONDS", 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.directory = tempfile.mkdtemp(dir=tests.scratch)
+        self.write("solar.md", "Solar panels convert sunlight into electricity.\n\nPanel prices fell sharply.")
+        self.write("notes/nuclear.txt", "Nuclear reactors provide steady baseload electricity without carbon emissions.")
+        self.write("ignored.json", "solar solar solar")
+        self.retriever = LocalRetriever(directory=self.directory)
+
+    def write(self, name: str, text: str):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as document:
+            document.write(text)
+
+    def test_matching_document_ranks_first(self):
+        results = self.retriever.search("nuclear baseload electricity", 2)
+        self.assertEqual(results[0]["source"], os.path.join("notes", "nuclear.txt"))
+        self.assertGreater(results[0]["score"], results[1]["score"])
+        self.assertEqual(self.retriever.search("solar sunlight", 5)[0]["source"], "solar.md")
+
+    def test_unknown_words_find_nothing(self):
+        self.assertEqual(self.retriever.search("zebra", 3), [])
+
+    def test_cached_research_is_searched(self):
+        self.cached = [("web_search|wind turbines", "Offshore wind turbines produce more power.")]
+        results = self.retriever.search("offshore turbines", 1)
+        self.assertTrue(results[0]["source"].startswith("cached research: wind turbines"))
+
+    def test_live_paragraphs_are_searchable_until_cached(self):
+        self.retriever.refresh()
+        self.retriever.add_live("web_search|tidal", "web search: tidal", "Tidal lagoons store energy between tides.")
+        self.assertEqual(self.retriever.search("tidal lagoons", 1)[0]["source"], "web search: tidal")
+        self.cached = [("web_search|tidal", "Tidal lagoons store energy between tides.")]
+        sources = [result["source"] for result in self.retriever.search("tidal lagoons", 5)]
+        self.assertEqual(sources, ["cached research: tidal"])
+
+    def test_dropped_live_paragraphs_are_forgotten(self):
+        self.retriever.refresh()
+        self.retriever.add_live("web_search|geothermal", "web search: geothermal", "Geothermal plants tap underground heat.")
+        self.retriever.drop_live("web_search|geothermal")
+        self.assertEqual(self.retriever.search("geothermal", 3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components import bots
+from components.bots import generate_round_arguments, retry_failed_round
+
+
+def topic_state() -> dict:
+    return {
+        "prompt": [{"role": "user", "content": "Round failure test"}],
+        "topic": [{"role": "assistant", "content": "Cities should ban cars from their centers"}],
+        "rounds": [],
+        "judge": [],
+        "pro_argument": [],
+        "con_argument": [],
+        "current_round": 0,
+        "winner": None,
+        "processing_state": "topic_ready",
+        "ready_for_next_round": True,
+    }
+
+
+class RoundFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.failing = {"pro"}
+        patches = [
+            mock.patch.object(bots, "get_simple_llm_response", self.respond),
+            mock.patch.object(bots, "research_participant", lambda participant, *args, **kwargs: f"Research for {participant['name']}"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def respond(self, messages, node=None, **kwargs):
+        self.calls.append(node)
+        if node in self.failing:
+            return "Response generation failed: down"
+        return f"{node} argument"
+
+    def test_fallback_response_fails_the_round_and_skips_its_rebuttal(self):
+        with self.assertLogs(level="ERROR"):
+            state = generate_round_arguments(topic_state())
+        self.assertEqual(state["processing_state"], "error")
+        self.assertEqual(state["failed_participants"], ["pro", "con"])
+        self.assertEqual(self.calls, ["pro"])
+        self.assertEqual(state["rounds"], [])
+
+    def test_retry_regenerates_only_the_failed_arguments(self):
+        self.failing = {"con"}
+        with self.assertLogs(level="ERROR"):
+            failed = generate_round_arguments(topic_state())
+        self.assertEqual(failed["failed_participants"], ["con"])
+        self.failing = set()
+        self.calls.clear()
+        state = retry_failed_round(failed)
+        self.assertEqual(state["processing_state"], "round_complete")
+        self.assertEqual(self.calls, ["con"])
+        self.assertEqual(bots.round_arguments(state["rounds"][-1]), {"pro": "pro argument", "con": "con argument"})
+        self.assertNotIn("failed_participants", state)
+        self.assertEqual(state["current_round"], 1)
+
+    def test_retry_needs_a_failed_round(self):
+        with self.assertRaises(ValueError):
+            retry_failed_round(topic_state())
+
+
+if __name__ == "__main__":
+    unittest.main()
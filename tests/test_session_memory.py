@@ -0,0 +1,65 @@
+import unittest
+import tests  # points the config at the stub before it is read
+from components import session_memory
+from components.session_memory import SpilledText, compact_state, expand_state, spill_value, restore_value, MISSING_TEXT
+from config.index import SESSION_SPILL_CHARS
+
+LONG = "A long argument. " * (SESSION_SPILL_CHARS // 10)
+
+
+def debate_state():
+    return {
+        "debate_id": "memory-test",
+        "prompt": [{"role": "user", "content": "Cats vs dogs"}],
+        "topic": [{"role": "assistant", "content": "Cats make better pets"}],
+        "rounds": [{"round_number": 1, "arguments": {"pro": LONG, "con": "Short rebuttal"}, "pro": LONG, "con": "Short rebuttal"}],
+        "judge": [],
+        "pro_argument": [{"role": "assistant", "content": LONG}],
+        "con_argument": [{"role": "assistant", "content": "Short rebuttal"}],
+        "current_round": 1,
+        "winner": None,
+        "processing_state": "round_complete",
+        "ready_for_next_round": True,
+        "research": {"pro_1": LONG + "research"},
+        "timings": {"pro_1": 1.5},
+    }
+
+
+class SpillTest(unittest.TestCase):
+    def test_long_strings_spill_and_short_ones_stay(self):
+        spilled = spill_value({"long": LONG, "short": "kept", "items": [LONG, 3]})
+        self.assertIsInstance(spilled["long"], SpilledText)
+        self.assertEqual(spilled["short"], "kept")
+        self.assertIsInstance(spilled["items"], tuple)
+        self.assertEqual(restore_value(spilled), {"long": LONG, "short": "kept", "items": [LONG, 3]})
+
+    def test_identical_text_spills_to_one_key(self):
+        self.assertEqual(spill_value(LONG).key, spill_value(LONG).key)
+
+    def test_missing_spilled_text_is_replaced(self):
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(restore_value(SpilledText("not-in-the-store", 10)), MISSING_TEXT)
+
+
+class CompactStateTest(unittest.TestCase):
+    def test_round_trip_restores_the_state(self):
+        state = debate_state()
+        self.assertEqual(expand_state(compact_state(state)), state)
+
+    def test_compact_state_keeps_long_text_out_of_memory(self):
+        compact = compact_state(debate_state())
+        self.assertGreaterEqual(compact.spilled_chars, 3 * len(LONG))
+        self.assertLess(compact.resident_bytes, 3 * len(LONG))
+
+    def test_tracked_extras_are_counted(self):
+        compact = compact_state(debate_state())
+        session_memory.track_session("memory-test-session", compact)
+        alone = session_memory.session_memory_report()["resident_bytes"]
+        session_memory.track_session("memory-test-session", compact, extras=[spill_value({"extra": LONG, "note": "x" * 100})])
+        report = session_memory.session_memory_report()
+        self.assertGreater(report["resident_bytes"], alone)
+        self.assertGreaterEqual(report["spilled_chars"], compact.spilled_chars + len(LONG))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components import shared_store
+from components.shared_store import enqueue_job, claim_job, renew_job_lease, finish_job, get_job, get_connection
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        get_connection().execute("DELETE FROM debate_jobs")
+
+    def expire_leases(self):
+        """Make every lease granted in this context already expired"""
+        return mock.patch.object(shared_store, "JOB_LEASE_SECONDS", -1)
+
+    def test_jobs_are_claimed_oldest_first_and_once(self):
+        first, second = enqueue_job("topic", {"n": 1}), enqueue_job("topic", {"n": 2})
+        self.assertEqual(claim_job("a"), {"id": first, "kind": "topic", "payload": {"n": 1}})
+        self.assertEqual(claim_job("b")["id"], second)
+        self.assertIsNone(claim_job("c"))
+
+    def test_held_lease_is_not_reclaimed(self):
+        job_id = enqueue_job("round", {})
+        claim_job("a")
+        self.assertTrue(renew_job_lease(job_id, "a"))
+        self.assertIsNone(claim_job("b"))
+
+    def test_expired_lease_is_reclaimed_by_another_worker(self):
+        job_id = enqueue_job("round", {})
+        with self.expire_leases():
+            claim_job("a")
+        self.assertEqual(claim_job("b")["id"], job_id)
+        self.assertFalse(renew_job_lease(job_id, "a"))
+        self.assertTrue(renew_job_lease(job_id, "b"))
+
+    def test_job_fails_after_max_attempts(self):
+        job_id = enqueue_job("round", {})
+        with self.expire_leases(), mock.patch.object(shared_store, "JOB_MAX_ATTEMPTS", 2):
+            self.assertIsNotNone(claim_job("a"))
+            self.assertIsNotNone(claim_job("b"))
+            self.assertIsNone(claim_job("c"))
+        job = get_job(job_id)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("2 times", job["error"])
+
+    def test_only_the_current_owner_records_a_result(self):
+        job_id = enqueue_job("round", {})
+        with self.expire_leases():
+            claim_job("a")
+        claim_job("b")
+        self.assertFalse(finish_job(job_id, "a", result={"by": "a"}))
+        self.assertTrue(finish_job(job_id, "b", result={"by": "b"}))
+        self.assertFalse(finish_job(job_id, "b", error="late"))
+        self.assertEqual(get_job(job_id)["result"], {"by": "b"})
+        self.assertEqual(get_job(job_id)["status"], "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
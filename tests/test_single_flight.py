@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+import unittest
+import tests  # points the config at the stub before it is read
+from components.tools import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight, calls, release = SingleFlight(), [], threading.Event()
+        
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return "shared"
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.stats["calls"] == 0:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ["shared"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats["shared_in_process"], 4)
+
+    def test_error_is_raised_and_not_kept(self):
+        flight = SingleFlight()
+        
+        def fail():
+            raise RuntimeError("boom")
+        
+        with self.assertRaises(RuntimeError):
+            flight.do("key", fail)
+        self.assertEqual(flight.do("key", lambda: "retried"), "retried")
+
+    def test_waiter_that_takes_a_released_lease_reuses_the_published_result(self):
+        lease_db = os.path.join(tests.scratch, "flight_leases.db")
+        leader = SingleFlight(lease_db=lease_db, poll_interval=0.01)
+        waiter = SingleFlight(lease_db=lease_db, poll_interval=0.01)
+        acquire, attempts = waiter._try_acquire, []
+        
+        def try_acquire(conn, key):
+            attempts.append(key)
+            if len(attempts) == 1:
+                return False
+            if len(attempts) == 2:
+                # The leader finishes between the waiter's poll and its next lease attempt
+                leader.do(key, lambda: "leader result")
+            return acquire(conn, key)
+        
+        waiter._try_acquire = try_acquire
+        calls = []
+        self.assertEqual(waiter.do("race", lambda: calls.append(1) or "again"), "leader result")
+        self.assertEqual(calls, [])
+        self.assertEqual(waiter.stats["shared_cross_process"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
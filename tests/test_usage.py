@@ -0,0 +1,40 @@
+import os
+import unittest
+from unittest import mock
+import tests  # points the config at the stub before it is read
+from components.usage import estimate_cost
+from config.index import get_node_config, WEB_SEARCH_CALL_COST
+
+
+class EstimateCostTest(unittest.TestCase):
+    def test_exact_model_name(self):
+        self.assertAlmostEqual(estimate_cost("gpt-4o", 1_000_000, 1_000_000), 12.5)
+
+    def test_dated_snapshot_uses_longest_matching_name(self):
+        self.assertAlmostEqual(estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0), 0.15)
+        self.assertAlmostEqual(estimate_cost("gpt-4.1-mini-2025-04-14", 1_000_000, 0), 0.40)
+        self.assertAlmostEqual(estimate_cost("gpt-4.1-2025-04-14", 1_000_000, 0), 2.00)
+
+    def test_unknown_model_costs_only_web_searches(self):
+        self.assertEqual(estimate_cost("local-llama", 1_000_000, 1_000_000), 0.0)
+        self.assertAlmostEqual(estimate_cost(None, 0, 0, web_search_calls=2), 2 * WEB_SEARCH_CALL_COST)
+
+
+class NodeConfigTest(unittest.TestCase):
+    def test_model_override_applies_on_the_nodes_own_tier(self):
+        with mock.patch.dict(os.environ, {"JUDGE_MODEL": "gpt-4.1"}):
+            self.assertEqual(get_node_config("judge")["model"], "gpt-4.1")
+            self.assertEqual(get_node_config("judge", "strong")["model"], "gpt-4.1")
+
+    def test_forcing_another_tier_uses_that_tiers_model(self):
+        with mock.patch.dict(os.environ, {"JUDGE_MODEL": "gpt-4.1"}), \
+                mock.patch.dict("config.index.MODEL_TIERS", {"fast": "gpt-4.1-nano"}):
+            config = get_node_config("judge", "fast")
+        self.assertEqual((config["tier"], config["model"]), ("fast", "gpt-4.1-nano"))
+
+    def test_unknown_nodes_use_the_default_settings(self):
+        self.assertEqual(get_node_config("summary")["max_tokens"], get_node_config("default")["max_tokens"])
+
+
+if __name__ == "__main__":
+    unittest.main()
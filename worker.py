@@ -0,0 +1,85 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from components.jobs import run_job, state_to_dict
+from components.shared_store import claim_job, finish_job, renew_job_lease
+from components.budget import budget_summary
+from components.metrics import start_metrics_server
+from config.index import WORKER_PROCESSES, RESEARCH_CACHE_TTL, METRICS_PORT, JOB_LEASE_SECONDS
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+
+def keep_lease(job_id: str, worker: str, done: threading.Event):
+    """Renew a job's lease until it finishes, so other workers do not take it over"""
+    while not done.wait(JOB_LEASE_SECONDS / 3):
+        if not renew_job_lease(job_id, worker):
+            logging.warning(f"Lost the lease on debate job {job_id}")
+            return
+
+
+def worker_loop(poll_interval: float = 0.2, metrics_port: int = 0):
+    """Claim queued debate jobs and run them until interrupted"""
+    worker = f"{os.uname().nodename}-{os.getpid()}"
+    if metrics_port > 0:
+        start_metrics_server(metrics_port)
+    logging.info(f"Debate worker {worker} started")
+    while True:
+        job = claim_job(worker)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        
+        started = time.perf_counter()
+        done = threading.Event()
+        threading.Thread(target=keep_lease, args=(job["id"], worker, done), name="job_lease", daemon=True).start()
+        try:
+            result = run_job(job["kind"], job["payload"])
+            if not finish_job(job["id"], worker, result=state_to_dict(result)):
+                logging.warning(f"Dropped the result of {job['kind']} job {job['id']}: another worker took it over")
+                continue
+            logging.info(
+                f"Finished {job['kind']} job {job['id']} in {time.perf_counter() - started:.2f}s "
+                f"({budget_summary(result.get('budget'))})"
+            )
+        except Exception as e:
+            logging.error(f"Debate job {job['id']} error: {str(e)}")
+            if not finish_job(job["id"], worker, error=str(e)):
+                logging.warning(f"Dropped the error of job {job['id']}: another worker took it over")
+        finally:
+            done.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run debate worker processes for EXECUTION_MODE=pool")
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES, help="Number of worker processes")
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="First metrics port; worker i serves /metrics on this port + i (0 disables)")
+    args = parser.parse_args()
+    
+    if RESEARCH_CACHE_TTL <= 0:
+        logging.warning("RESEARCH_CACHE_TTL is 0, so workers will not share research results")
+    
+    processes = [
+        multiprocessing.Process(
+            target=worker_loop,
+            kwargs={"metrics_port": args.metrics_port + i if args.metrics_port > 0 else 0},
+            name=f"debate-worker-{i}",
+            daemon=True
+        )
+        for i in range(max(1, args.processes))
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logging.info("Stopping debate workers")
+
+
+if __name__ == "__main__":
+    main()